@@ -0,0 +1,128 @@
+import json
+import platform
+import statistics
+import tempfile
+import time
+from typing import Dict, Any, List, Callable, Optional, Sequence
+from .cache import SpecCache
+from .config import ConfigParser
+from .utils import validate_response, ResponseValidator
+
+# Benchmarks of APIForge's own hot paths. Results are JSON so CI can store them and compare() a later run
+# against them; every benchmark reports seconds, lower is better.
+RESULTS_VERSION = 1
+ITEM_SCHEMA = {
+    "type": "object",
+    "required": ["id", "title", "userId"],
+    "properties": {"id": {"type": "integer", "example": 1}, "title": {"type": "string", "example": "foo"}, "userId": {"type": "integer", "example": 1}}
+}
+
+def synthetic_spec(paths: int = 10000) -> Dict[str, Any]:
+    # OAS spec with paths operations sharing one schema through $ref, alternating collection reads and item updates
+    spec_paths: Dict[str, Any] = {}
+    item = {"$ref": "#/components/schemas/Item"}
+    for index in range(paths):
+        if index % 2 == 0:
+            spec_paths[f"/resources{index}"] = {"get": {
+                "parameters": [{"name": "page", "in": "query", "schema": {"type": "integer", "example": 1}}],
+                "responses": {"200": {"description": "List", "content": {"application/json": {"schema": {"type": "array", "items": item}}}}}
+            }}
+        else:
+            spec_paths[f"/resources{index}/{{id}}"] = {"put": {
+                "parameters": [{"name": "id", "in": "path", "required": True, "schema": {"type": "integer", "example": 1}}],
+                "requestBody": {"content": {"application/json": {"schema": item}}},
+                "responses": {"200": {"description": "Updated", "content": {"application/json": {"schema": item}}}}
+            }}
+    return {
+        "openapi": "3.0.3",
+        "info": {"title": "Synthetic benchmark API", "version": "1.0.0"},
+        "servers": [{"url": "http://127.0.0.1"}],
+        "components": {"schemas": {"Item": ITEM_SCHEMA}},
+        "paths": spec_paths
+    }
+
+def measure(function: Callable[[], Any], repeat: int = 5, warmup: int = 1, setup: Optional[Callable[[], Any]] = None) -> Dict[str, Any]:
+    # Wall clock of repeat calls after warmup calls, setup runs untimed before each call
+    for _ in range(warmup):
+        if setup: setup()
+        function()
+    times = []
+    for _ in range(repeat):
+        if setup: setup()
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return {"median": statistics.median(times), "min": min(times), "max": max(times), "mean": statistics.fmean(times), "runs": repeat}
+
+def bench_load_config(paths: int = 10000, repeat: int = 3) -> Dict[str, Dict[str, Any]]:
+    spec = synthetic_spec(paths)
+    previous = ConfigParser.cache
+    try:
+        ConfigParser.cache = SpecCache(enabled=False)
+        cold = measure(lambda: ConfigParser.load_config(spec, for_generator=True), repeat, warmup=0)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            ConfigParser.cache = SpecCache(cache_dir=cache_dir, enabled=True)
+            warm = measure(lambda: ConfigParser.load_config(spec, for_generator=True), repeat)
+    finally:
+        ConfigParser.cache = previous
+    return {f"load_config[{paths} paths,cold]": {**cold, "paths": paths}, f"load_config[{paths} paths,cached]": {**warm, "paths": paths}}
+
+def bench_validate_response(items: int = 100000, repeat: int = 5) -> Dict[str, Dict[str, Any]]:
+    data = [{"id": index, "title": f"title {index}", "userId": index % 10} for index in range(items)]
+    keys = [("id", int), ("title", str), ("userId", int)]
+    schema = {"type": "array", "items": ITEM_SCHEMA}
+    validator = ResponseValidator(keys, schema)
+    return {
+        f"validate_response[{items} items]": {**measure(lambda: validate_response(data, keys), repeat), "items": items},
+        f"ResponseValidator.validate[{items} items,schema]": {**measure(lambda: validator.validate(data), repeat), "items": items}
+    }
+
+def bench_run_generated_tests(workers: Sequence[int] = (1, 4, 16), paths: int = 200, repeat: int = 3) -> Dict[str, Dict[str, Any]]:
+    # End to end against the local stub server, so only APIForge and the loopback connection are measured
+    from .core import APIForge
+    from .stub import StubServer
+    spec = synthetic_spec(paths)
+    results: Dict[str, Dict[str, Any]] = {}
+    with StubServer(spec) as stub:
+        for max_workers in workers:
+            forge = APIForge(stub.url, max_workers=max_workers)
+            try:
+                timing = measure(lambda: forge.run_generated_tests(spec), repeat)
+            finally:
+                forge.close()
+            results[f"run_generated_tests[{paths} paths,max_workers={max_workers}]"] = {**timing, "requests_per_second": paths / timing["median"]}
+    return results
+
+def run_benchmarks(paths: int = 10000, items: int = 100000, workers: Sequence[int] = (1, 4, 16), run_paths: int = 200, repeat: int = 3) -> Dict[str, Any]:
+    benchmarks: Dict[str, Dict[str, Any]] = {}
+    benchmarks.update(bench_load_config(paths, repeat))
+    benchmarks.update(bench_validate_response(items, repeat))
+    benchmarks.update(bench_run_generated_tests(workers, run_paths, repeat))
+    return {
+        "version": RESULTS_VERSION,
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "benchmarks": benchmarks
+    }
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.1) -> List[Dict[str, Any]]:
+    # Median of every benchmark present in both, regressed once it is more than threshold (0.1 = 10%) slower
+    comparison = []
+    for name, current in results["benchmarks"].items():
+        previous = baseline.get("benchmarks", {}).get(name)
+        if not previous or not previous.get("median"): continue
+        change = current["median"] / previous["median"] - 1
+        comparison.append({"name": name, "baseline": previous["median"], "current": current["median"], "change": change, "regressed": change > threshold})
+    return comparison
+
+def save_results(results: Dict[str, Any], path: str):
+    with open(path, "w") as f: json.dump(results, f, indent=2)
+
+def load_results(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, "r") as f: results = json.load(f)
+    except (OSError, ValueError) as e:
+        raise RuntimeError(f"Failed to load benchmark results {path}: {e}")
+    if results.get("version") != RESULTS_VERSION: raise RuntimeError(f"{path} holds version {results.get('version')} results, expected {RESULTS_VERSION}")
+    return results
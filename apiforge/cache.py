@@ -0,0 +1,144 @@
+import copy
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Union
+
+# Bump whenever the shape of the compiled endpoint list changes so stale disk entries are ignored
+CACHE_VERSION = 7
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "apiforge")
+
+# Matches the target of a $ref in YAML or JSON, e.g. $ref: 'schemas.yaml#/Post' or "$ref": "common.json"
+_REF_PATTERN = re.compile(r"""["']?\$ref["']?\s*:\s*["']?([^"'\s#}]+)""")
+
+class SpecCache:
+    def __init__(self, cache_dir: Optional[str] = None, max_entries: int = 32, enabled: Optional[bool] = None):
+        self.cache_dir = cache_dir or os.getenv("APIFORGE_CACHE_DIR", DEFAULT_CACHE_DIR)
+        self.max_entries = max_entries
+        self.enabled = enabled if enabled is not None else not os.getenv("APIFORGE_DISABLE_CACHE")
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _file_digests(path: str, digests: Dict[str, str]) -> None:
+        # Hash the spec file and, recursively, every local file it references through $ref
+        path = os.path.abspath(path)
+        if path in digests: return
+        with open(path, "rb") as f: content = f.read()
+        digests[path] = hashlib.sha256(content).hexdigest()
+        for ref in _REF_PATTERN.findall(content.decode("utf-8", errors="ignore")):
+            if ref.startswith(("http://", "https://")): continue
+            ref_path = os.path.join(os.path.dirname(path), ref)
+            if os.path.isfile(ref_path): SpecCache._file_digests(ref_path, digests)
+
+    def key(self, spec: Union[str, Dict[str, Any]], env: str, for_generator: bool) -> Optional[str]:
+        # Remote specs and missing files are never cached
+        if not self.enabled: return None
+        digests: Dict[str, str] = {}
+        if isinstance(spec, dict):
+            source = json.dumps(spec, sort_keys=True, default=str)
+            # Local files the dict refers to resolve against the working directory
+            for ref in _REF_PATTERN.findall(source):
+                if not ref.startswith(("http://", "https://")) and os.path.isfile(ref): self._file_digests(ref, digests)
+            source += json.dumps(sorted(digests.values()))
+        elif isinstance(spec, str) and not spec.startswith("http") and os.path.isfile(spec):
+            self._file_digests(spec, digests)
+            source = json.dumps(sorted(digests.values()))
+        else:
+            return None
+        return hashlib.sha256(f"{CACHE_VERSION}|{env}|{for_generator}|{source}".encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(entry["compiled"])
+        try:
+            with open(self._path(key), "r") as f: entry = json.load(f)
+            if entry.get("version") != CACHE_VERSION: raise ValueError("Stale cache entry")
+        except (OSError, ValueError):
+            with self._lock: self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+            self._remember(key, entry)
+        return copy.deepcopy(entry["compiled"])
+
+    def put(self, key: str, compiled: Dict[str, Any], source: Union[str, Dict[str, Any]], env: str, for_generator: bool) -> None:
+        entry = {
+            "version": CACHE_VERSION,
+            "source": source if isinstance(source, str) else "<dict>",
+            "env": env,
+            "for_generator": for_generator,
+            "created": time.time(),
+            "compiled": copy.deepcopy(compiled)
+        }
+        with self._lock: self._remember(key, entry)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Write then rename so concurrent readers never see a partial file
+            tmp_path = f"{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w") as f: json.dump(entry, f)
+            os.replace(tmp_path, self._path(key))
+        except (OSError, TypeError, ValueError):
+            pass    # The on-disk store is best effort, the in-memory entry is still usable
+
+    def _remember(self, key: str, entry: Dict[str, Any]) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries: self._memory.popitem(last=False)
+
+    def entries(self) -> List[Dict[str, Any]]:
+        entries = []
+        if not os.path.isdir(self.cache_dir): return entries
+        for name in sorted(os.listdir(self.cache_dir)):
+            if not name.endswith(".json"): continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                with open(path, "r") as f: entry = json.load(f)
+            except (OSError, ValueError):
+                continue
+            entries.append({
+                "key": name[:-len(".json")],
+                "source": entry.get("source"),
+                "env": entry.get("env"),
+                "for_generator": entry.get("for_generator"),
+                "created": entry.get("created"),
+                "endpoints": len(entry.get("compiled", {}).get("endpoints", [])),
+                "size": os.path.getsize(path)
+            })
+        return entries
+
+    def info(self) -> Dict[str, Any]:
+        entries = self.entries()
+        return {
+            "enabled": self.enabled,
+            "cache_dir": self.cache_dir,
+            "hits": self.hits,
+            "misses": self.misses,
+            "memory_entries": len(self._memory),
+            "disk_entries": len(entries),
+            "disk_bytes": sum(entry["size"] for entry in entries),
+            "entries": entries
+        }
+
+    def clear(self, memory: bool = True, disk: bool = True) -> None:
+        with self._lock:
+            if memory: self._memory.clear()
+            self.hits = self.misses = 0
+        if disk and os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                if name.endswith((".json", ".tmp")):
+                    try: os.remove(os.path.join(self.cache_dir, name))
+                    except OSError: pass
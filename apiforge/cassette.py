@@ -0,0 +1,194 @@
+import hashlib
+import io
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import httpx
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from typing import Dict, List, Optional, Tuple, Union
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+# Cassette file layout, all integers little endian:
+#   header   magic "APFC", version u16, reserved u16, entry count u32, index offset u64
+#   entries  status u16, headers length u32, body length u32, headers (JSON list of [name, value]), body
+#   index    per entry in recording order: sha1 of the request key (20 bytes), entry offset u64
+# Replay maps the file and only parses the index up front, bodies are sliced out of the map when served.
+MAGIC = b"APFC"
+VERSION = 1
+_HEADER = struct.Struct("<4sHHIQ")
+_ENTRY = struct.Struct("<HII")
+_INDEX = struct.Struct("<20sQ")
+# Describe the recorded connection rather than the body served on replay (which is already decoded)
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive"}
+
+class CassetteMiss(requests.RequestException):
+    # Not a ConnectionError, so a request missing from the cassette fails instead of being retried
+    pass
+
+def request_key(method: str, url: str, body: Union[str, bytes, None]) -> bytes:
+    # Requests match on method, path, query (in any order) and body; scheme and host are ignored so a cassette
+    # recorded against one environment replays against another
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    if isinstance(body, str): body = body.encode()
+    if body:
+        # JSON bodies compare by value, requests and httpx serialise payloads with different separators
+        try: body = json.dumps(json.loads(body), sort_keys=True, separators=(",", ":")).encode()
+        except ValueError: pass
+    return hashlib.sha1(f"{str(method).upper()} {parts.path}?{query}\n".encode() + (body or b"")).digest()
+
+class CassetteWriter:
+    # Appends recorded responses, the index is written on close and the file only appears once complete
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._tmp_path = f"{path}.{os.getpid()}.tmp"
+        self._file = open(self._tmp_path, "wb")
+        self._file.write(_HEADER.pack(MAGIC, VERSION, 0, 0, 0))
+        self._index: List[Tuple[bytes, int]] = []
+        self._lock = threading.Lock()
+
+    def add(self, key: bytes, status: int, headers: Dict[str, str], body: bytes):
+        encoded_headers = json.dumps([[name, value] for name, value in headers.items() if name.lower() not in _DROPPED_HEADERS], separators=(",", ":")).encode()
+        with self._lock:
+            if self._file is None: raise RuntimeError(f"Cassette {self.path} is already closed")
+            self._index.append((key, self._file.tell()))
+            self._file.write(_ENTRY.pack(status, len(encoded_headers), len(body)))
+            self._file.write(encoded_headers)
+            self._file.write(body)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def close(self):
+        with self._lock:
+            if self._file is None: return
+            index_offset = self._file.tell()
+            for key, offset in self._index: self._file.write(_INDEX.pack(key, offset))
+            self._file.seek(0)
+            self._file.write(_HEADER.pack(MAGIC, VERSION, 0, len(self._index), index_offset))
+            self._file.close()
+            self._file = None
+            os.replace(self._tmp_path, self.path)
+
+class Cassette:
+    # Read side of a cassette. A request recorded several times (e.g. a POST per test) is answered with the
+    # recorded responses in order, the last one repeats once they run out.
+    def __init__(self, path: str):
+        self.path = path
+        try:
+            with open(path, "rb") as f: self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise RuntimeError(f"Cannot open cassette {path}: {e}")
+        if len(self._map) < _HEADER.size: raise RuntimeError(f"{path} is not a cassette")
+        magic, version, _, count, index_offset = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION: raise RuntimeError(f"{path} is not a version {VERSION} cassette")
+        self._entries: Dict[bytes, List[int]] = {}
+        for position in range(count):
+            key, offset = _INDEX.unpack_from(self._map, index_offset + position * _INDEX.size)
+            self._entries.setdefault(key, []).append(offset)
+        self._served: Dict[bytes, int] = {}
+        self._lock = threading.Lock()
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _entry(self, offset: int) -> Tuple[int, List[List[str]], bytes]:
+        status, headers_length, body_length = _ENTRY.unpack_from(self._map, offset)
+        start = offset + _ENTRY.size
+        headers = json.loads(self._map[start:start + headers_length])
+        start += headers_length
+        return status, headers, self._map[start:start + body_length]
+
+    def lookup(self, key: bytes) -> Optional[Tuple[int, List[List[str]], bytes]]:
+        offsets = self._entries.get(key)
+        if not offsets: return None
+        with self._lock:
+            served = self._served.get(key, 0)
+            self._served[key] = served + 1
+        return self._entry(offsets[min(served, len(offsets) - 1)])
+
+    def rewind(self):
+        with self._lock: self._served.clear()
+
+    def close(self):
+        self._map.close()
+
+class ReplayAdapter(BaseAdapter):
+    # Answers every request from a cassette without touching the network
+    def __init__(self, cassette: Cassette, counters=None):
+        super().__init__()
+        self.cassette = cassette
+        self.counters = counters
+
+    def send(self, request: requests.PreparedRequest, stream=False, timeout=None, verify=True, cert=None, proxies=None) -> requests.Response:
+        start = time.perf_counter()
+        if self.counters: self.counters.request_sent()
+        entry = self.cassette.lookup(request_key(request.method, request.url, request.body))
+        if entry is None: raise CassetteMiss(f"No recorded response for {request.method} {urlsplit(request.url).path}", request=request)
+        status, headers, body = entry
+        response = requests.Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = io.BytesIO(body)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response.timings = {"connect": 0.0, "ttfb": time.perf_counter() - start, "download": 0.0}
+        return response
+
+    def close(self):
+        self.cassette.close()
+
+def _recorded_body(response: requests.Response) -> bytes:
+    # Reading content keeps the body available to a streaming caller, iter_content then serves it from memory
+    return response.content or b""
+
+def recording_adapter(base: type) -> type:
+    # Subclass of a requests adapter that writes every response it receives to a CassetteWriter
+    class RecordingAdapter(base):
+        def __init__(self, writer: CassetteWriter, *args, **kwargs):
+            self.writer = writer
+            super().__init__(*args, **kwargs)
+
+        def send(self, request, stream=False, **kwargs):
+            response = super().send(request, stream=stream, **kwargs)
+            self.writer.add(request_key(request.method, request.url, request.body), response.status_code, dict(response.headers), _recorded_body(response))
+            return response
+
+        def close(self):
+            super().close()
+            self.writer.close()
+    return RecordingAdapter
+
+class AsyncReplayTransport(httpx.AsyncBaseTransport):
+    def __init__(self, cassette: Cassette):
+        self.cassette = cassette
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        entry = self.cassette.lookup(request_key(request.method, str(request.url), await request.aread()))
+        if entry is None: raise CassetteMiss(f"No recorded response for {request.method} {request.url.path}")
+        status, headers, body = entry
+        return httpx.Response(status, headers=headers, content=body, request=request)
+
+class AsyncRecordingTransport(httpx.AsyncHTTPTransport):
+    def __init__(self, writer: CassetteWriter, **kwargs):
+        super().__init__(**kwargs)
+        self.writer = writer
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await super().handle_async_request(request)
+        body = await response.aread()
+        await response.aclose()
+        self.writer.add(request_key(request.method, str(request.url), request.content), response.status_code, dict(response.headers), body)
+        # The body is returned decoded, so the encoding headers of the original response no longer apply
+        headers = [(name, value) for name, value in response.headers.items() if name.lower() not in _DROPPED_HEADERS]
+        return httpx.Response(response.status_code, headers=headers, content=body, request=request, extensions=response.extensions)
@@ -0,0 +1,189 @@
+import argparse
+import json
+import os
+from typing import List, Optional
+from .config import ConfigParser
+from .core import APIForge
+from .generator import TestGenerator
+from .reporter import Reporter
+from .shard import parse_shard, merge_reports
+from .distributed import Coordinator, run_worker
+from .stub import StubServer, Faults
+from .decoders import DECODERS
+from .metrics import MetricsCollector
+from .slo import Baseline, PerformanceError
+from .benchmark import run_benchmarks, compare, save_results, load_results
+
+def _run(args: argparse.Namespace) -> int:
+    config = ConfigParser.load_config(args.spec, args.env)
+    cassette = {"cassette": args.record, "cassette_mode": "record"} if args.record else {"cassette": args.replay, "cassette_mode": "replay"}
+    forge = APIForge(args.base_url or config["base_url"], config.get("auth"), max_workers=args.max_workers, rate_limit=config.get("rate_limit"),
+                     http_cache=args.http_cache, json_decoder=args.json_decoder, http2=args.http2 or (config.get("transport") or {}).get("http2", False), **cassette)
+    os.makedirs(args.output, exist_ok=True)    # Also for shards without endpoints, so merge finds every directory
+    reporter = Reporter(args.output, junit=args.junit, include_responses=args.include_responses)
+    metrics = MetricsCollector() if args.metrics_file else None
+    if metrics: forge.add_hook(metrics)
+    try:
+        if args.matrix:
+            cases = TestGenerator().expand_tests(args.spec, ranges=dict(args.range or []), max_cases=args.max_cases)
+            for _ in forge.stream_generated_tests(cases, reporter=reporter): pass
+        elif args.processes and args.processes > 1: forge.run_generated_tests_multiprocess(args.spec, processes=args.processes, reporter=reporter)
+        else:
+            baseline = Baseline(args.baseline, threshold=args.regression_threshold, mode="warn" if args.warn_regressions else "fail",
+                                update=args.update_baseline) if args.baseline else None
+            try: forge.run_generated_tests(args.spec, reporter=reporter, shard=args.shard, state_file=args.incremental, force=args.force, baseline=baseline)
+            except PerformanceError: pass    # Printed with the summary from last_performance, exits 1 below
+        summary = reporter.summary()
+    finally:
+        reporter.close()
+        forge.close()
+        if metrics: metrics.write(args.metrics_file)
+    if forge.last_performance: summary["performance"] = forge.last_performance
+    print(json.dumps(summary))
+    return 0 if summary["failed"] == 0 and (forge.last_performance or {}).get("passed", True) else 1
+
+def _range(value: str):
+    # name=first-last, inclusive
+    name, _, bounds = value.partition("=")
+    first, _, last = bounds.partition("-")
+    return name, range(int(first), int(last or first) + 1)
+
+def _merge(args: argparse.Namespace) -> int:
+    summary = merge_reports(args.inputs, args.output, junit=not args.no_junit)
+    print(json.dumps(summary))
+    return 0 if summary["failed"] == 0 else 1
+
+def _coordinate(args: argparse.Namespace) -> int:
+    os.makedirs(args.output, exist_ok=True)
+    reporter = Reporter(args.output, junit=args.junit)
+    try:
+        coordinator = Coordinator(args.spec, env=args.env, host=args.host, port=args.port, expected_workers=args.workers,
+                                  base_url=args.base_url, max_workers=args.max_workers, reporter=reporter)
+        print(f"Coordinating {len(coordinator.endpoints)} endpoints on {coordinator.address[0]}:{coordinator.address[1]}", flush=True)
+        coordinator.run(timeout=args.timeout)
+        summary = reporter.summary()
+    finally:
+        reporter.close()
+    print(json.dumps(summary))
+    return 0 if summary["failed"] == 0 else 1
+
+def _worker(args: argparse.Namespace) -> int:
+    host, _, port = args.address.rpartition(":")
+    units = run_worker((host or "127.0.0.1", int(port)), name=args.name)
+    print(json.dumps({"units": units}))
+    return 0
+
+def _latency(value: str):
+    # "0.05" or a "0.01-0.2" range in seconds
+    low, _, high = value.partition("-")
+    return (float(low), float(high)) if high else float(low)
+
+def _stub(args: argparse.Namespace) -> int:
+    faults = Faults(latency=args.latency, error_rate=args.error_rate, error_status=args.error_status, retry_after=args.retry_after,
+                    fail_first=args.fail_first, seed=args.seed)
+    server = StubServer(args.spec, host=args.host, port=args.port, faults=faults)
+    print(f"Serving {len(server.routes.routes)} paths of {args.spec} on {server.url}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+    print(json.dumps(server.requests))
+    return 0
+
+def _bench(args: argparse.Namespace) -> int:
+    baseline = load_results(args.baseline) if args.baseline else None
+    results = run_benchmarks(paths=args.paths, items=args.items, workers=args.workers, run_paths=args.run_paths, repeat=args.repeat)
+    if args.output: save_results(results, args.output)
+    comparison = compare(results, baseline, args.threshold) if baseline else []
+    print(json.dumps({"benchmarks": results["benchmarks"], "comparison": comparison}, indent=2))
+    return 1 if any(entry["regressed"] for entry in comparison) else 0
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="apiforge", description="Automated API testing")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run the tests generated from an OpenAPI spec")
+    run.add_argument("spec", help="Path or URL of the OpenAPI spec")
+    run.add_argument("--base-url", help="Server to test, defaults to the spec's server for --env")
+    run.add_argument("--env", default="prod")
+    run.add_argument("--max-workers", type=int, default=10)
+    run.add_argument("--shard", type=parse_shard, help="Only run shard i of n, e.g. 2/4 on the second of four CI nodes")
+    run.add_argument("--processes", type=int, help="Split the endpoints across this many worker processes")
+    run.add_argument("--incremental", metavar="STATE_FILE", help="Only run operations that changed or failed since the run that wrote STATE_FILE")
+    run.add_argument("--force", action="store_true", help="With --incremental, run every operation and refresh the state")
+    run.add_argument("--matrix", action="store_true", help="Expand every operation into boundary, enum and optional field cases from its schemas")
+    run.add_argument("--range", type=_range, action="append", help="With --matrix, run every value of a parameter, e.g. id=1-1000")
+    run.add_argument("--max-cases", type=int, help="With --matrix, stop after this many cases")
+    run.add_argument("--http-cache", metavar="CACHE_FILE", help="Revalidate GET responses stored in CACHE_FILE by an earlier run with ETag/Last-Modified")
+    run.add_argument("--http2", action="store_true", help="Multiplex requests over HTTP/2, overrides the transport settings of the config")
+    run.add_argument("--json-decoder", choices=sorted(DECODERS), help="JSON decoder for responses, defaults to orjson when it's installed")
+    cassette = run.add_mutually_exclusive_group()
+    cassette.add_argument("--record", metavar="CASSETTE", help="Save every response to CASSETTE")
+    cassette.add_argument("--replay", metavar="CASSETTE", help="Answer requests from CASSETTE instead of the network")
+    run.add_argument("--baseline", metavar="BASELINE_FILE", help="Fail when an endpoint's p95 latency regressed against the runs stored in BASELINE_FILE")
+    run.add_argument("--regression-threshold", type=float, default=0.2, help="p95 increase counted as a regression, 0.2 = 20%%")
+    run.add_argument("--warn-regressions", action="store_true", help="Only report regressions instead of failing the run")
+    run.add_argument("--update-baseline", action="store_true", help="Add this run's latencies to BASELINE_FILE")
+    run.add_argument("--metrics-file", help="Write per-endpoint counters and latency histograms in the OpenMetrics text format")
+    run.add_argument("--output", default="reports")
+    run.add_argument("--junit", action="store_true")
+    run.add_argument("--include-responses", action="store_true")
+    run.set_defaults(handler=_run)
+
+    merge = commands.add_parser("merge", help="Merge the reports of sharded runs into one")
+    merge.add_argument("inputs", nargs="+", help="Output directories of the shard runs")
+    merge.add_argument("--output", default="reports")
+    merge.add_argument("--no-junit", action="store_true")
+    merge.set_defaults(handler=_merge)
+
+    coordinate = commands.add_parser("coordinate", help="Hand the endpoints of a spec or config out to distributed workers")
+    coordinate.add_argument("spec")
+    coordinate.add_argument("--env", default="prod")
+    coordinate.add_argument("--base-url")
+    coordinate.add_argument("--host", default="127.0.0.1")
+    coordinate.add_argument("--port", type=int, default=7878)
+    coordinate.add_argument("--workers", type=int, default=2, help="Number of workers expected, used to size their initial share")
+    coordinate.add_argument("--max-workers", type=int, default=10, help="Threads per worker")
+    coordinate.add_argument("--timeout", type=float)
+    coordinate.add_argument("--output", default="reports")
+    coordinate.add_argument("--junit", action="store_true")
+    coordinate.set_defaults(handler=_coordinate)
+
+    worker = commands.add_parser("worker", help="Run endpoints handed out by a coordinator")
+    worker.add_argument("address", help="host:port of the coordinator")
+    worker.add_argument("--name")
+    worker.set_defaults(handler=_worker)
+
+    stub = commands.add_parser("stub", help="Serve the examples of an OpenAPI spec locally")
+    stub.add_argument("spec")
+    stub.add_argument("--host", default="127.0.0.1")
+    stub.add_argument("--port", type=int, default=8080)
+    stub.add_argument("--latency", type=_latency, help="Delay in seconds added to every response, or a min-max range")
+    stub.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with --error-status")
+    stub.add_argument("--error-status", type=int, default=503)
+    stub.add_argument("--retry-after", type=float, help="Retry-After sent with injected errors")
+    stub.add_argument("--fail-first", type=int, default=0, help="Fail the first N requests of every operation")
+    stub.add_argument("--seed", type=int, help="Seed for latency ranges and --error-rate")
+    stub.set_defaults(handler=_stub)
+
+    bench = commands.add_parser("bench", help="Benchmark APIForge's own hot paths")
+    bench.add_argument("--paths", type=int, default=10000, help="Paths of the synthetic spec given to load_config")
+    bench.add_argument("--items", type=int, default=100000, help="Items of the list given to validate_response")
+    bench.add_argument("--workers", type=lambda value: [int(part) for part in value.split(",")], default=[1, 4, 16], help="max_workers values, e.g. 1,4,16")
+    bench.add_argument("--run-paths", type=int, default=200, help="Paths of the spec run end to end against the stub server")
+    bench.add_argument("--repeat", type=int, default=3)
+    bench.add_argument("--output", help="Write the results as JSON, e.g. to store a baseline")
+    bench.add_argument("--baseline", help="Results of an earlier run to compare against, exits 1 on a regression")
+    bench.add_argument("--threshold", type=float, default=0.1, help="Slowdown counted as a regression, 0.1 = 10%%")
+    bench.set_defaults(handler=_bench)
+
+    args = parser.parse_args(argv)
+    if args.command == "run" and args.shard and args.processes and args.processes > 1: parser.error("--shard and --processes can't be combined")
+    if args.command == "run" and args.baseline and (args.matrix or (args.processes and args.processes > 1)):
+        parser.error("--baseline can't be combined with --matrix or --processes")
+    if args.command == "run" and args.matrix and (args.shard or args.incremental or (args.processes and args.processes > 1)):
+        parser.error("--matrix can't be combined with --shard, --incremental or --processes")
+    if args.command == "run" and args.incremental and args.processes and args.processes > 1: parser.error("--incremental and --processes can't be combined")
+    return args.handler(args)
@@ -1,41 +1,127 @@
+import itertools
 import yaml
 import os
 from prance import ResolvingParser
-from typing import Dict, Any, Optional, Union
+from typing import Dict, Any, Iterator, Optional, Tuple, Union
+from .cache import SpecCache
+from .ratelimit import resolve_rate_limit
+from .transport import resolve_transport
+from .spec import RefResolver, RemoteReference, YAML_LOADER, load_spec
+
+OAS31_DIALECT = "https://spec.openapis.org/oas/3.1/dialect/base"
 
 class ConfigParser:
+    # Compiled OAS endpoint lists keyed by spec content, env and for_generator
+    cache = SpecCache()
+
+    @staticmethod
+    def cache_info() -> Dict[str, Any]:
+        return ConfigParser.cache.info()
+
+    @staticmethod
+    def clear_cache(memory: bool = True, disk: bool = True) -> None:
+        ConfigParser.cache.clear(memory=memory, disk=disk)
+
     @staticmethod
     def load_yaml(file_path: str) -> Dict[str, Any]:
         try:
-            with open(file_path, 'r') as f: return yaml.safe_load(f)
+            with open(file_path, 'r') as f: return yaml.load(f, Loader=YAML_LOADER)
         except Exception as e:
             raise RuntimeError(f"Failed to load config: {str(e)}")
         
     @staticmethod
-    def load_config(spec: Union[str, Dict[str, Any]], env: str = "prod", for_generator: bool = False) -> Optional[Dict[str, Any]]:
-        # Try parsing as OAS first
-        try: 
-            if isinstance(spec, dict): 
-                spec_string = yaml.safe_dump(spec)
-                parser = ResolvingParser(spec_string=spec_string)
-            elif isinstance(spec, str): parser = ResolvingParser(spec)
+    def parse_oas(spec: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
+        # OAS 3 spec with every $ref resolved
+        parsed, resolver = ConfigParser.open_oas(spec)
+        return resolver.deep(parsed) if resolver else parsed
+
+    @staticmethod
+    def open_oas(spec: Union[str, Dict[str, Any]], full: bool = False) -> Tuple[Dict[str, Any], Optional[RefResolver]]:
+        # Dicts and local files are used as they are, their $refs are resolved lazily by the returned RefResolver
+        # while endpoints are compiled. Remote specs go through prance, which returns them fully resolved.
+        # The fast path only checks the openapi version, it doesn't validate the whole document like prance.
+        # full=True always uses prance, needed for specs with remote $refs.
+        if not full and (isinstance(spec, dict) or (isinstance(spec, str) and not spec.startswith(("http://", "https://")))):
+            parsed, resolver = load_spec(spec)
+        else:
+            parser = ResolvingParser(spec_string=yaml.safe_dump(spec)) if isinstance(spec, dict) else ResolvingParser(spec)
             parser.parse()
-            spec = parser.specification
-            if not spec.get("openapi") or not spec.get("openapi").startswith("3."):
-                raise RuntimeError("Invalid OpenAPI spec")
+            parsed, resolver = parser.specification, None
+        if not str(parsed.get("openapi") or "").startswith("3.") or not isinstance(parsed.get("paths", {}), dict):
+            raise RuntimeError("Invalid OpenAPI spec")
+        return parsed, resolver
+
+    @staticmethod
+    def load_config(spec: Union[str, Dict[str, Any]], env: str = "prod", for_generator: bool = False) -> Optional[Dict[str, Any]]:
+        cache_key = ConfigParser.cache.key(spec, env, for_generator)
+        compiled = ConfigParser.cache.get(cache_key) if cache_key else None
+        if compiled is None:
+            source = spec
+            # Try parsing as OAS first
+            try:
+                spec, resolver = ConfigParser.open_oas(spec)
+            except Exception as e:
+                # Fallback to custom YAML
+                if isinstance(spec, str):
+                    config = ConfigParser.load_yaml(spec)
+                    if config is None:
+                        return None
+                    if not isinstance(config, dict):
+                        raise RuntimeError("Configuration file must parse to a dictionary")
+                    if "environments" in config:
+                        config["base_url"] = config["environments"].get(env, config.get("base_url", ""))
+                    config["rate_limit"] = resolve_rate_limit(config.get("rate_limit"), env)
+                    config["transport"] = resolve_transport(config.get("transport"), env)
+                    return config
+                else: raise RuntimeError(f"Invalid OpenAPI spec: {str(e)}")
+            try:
+                compiled = ConfigParser._compile_spec(spec, env, for_generator, resolver)
+            except RemoteReference:
+                compiled = ConfigParser._compile_spec(ConfigParser.open_oas(source, full=True)[0], env, for_generator)
+            if cache_key: ConfigParser.cache.put(cache_key, compiled, source, env, for_generator)
+
+        # Auth is resolved on every load so tokens from the environment are never cached
+        token = compiled.pop("bearer_token")
+        auth = {"headers": {"Authorization": "Bearer dummy_token"}}  # Default
+        if token is not None:
+            token_value = os.getenv("API_BEARER_TOKEN", token)
+            auth = {"headers": {"Authorization": f"Bearer {token_value}"}}
+        return {
+            "base_url": compiled["base_url"],
+            "auth": auth,
+            "rate_limit": compiled["rate_limit"],
+            "transport": compiled["transport"],
+            "endpoints": compiled["endpoints"]
+        }
+
+    @staticmethod
+    def iter_endpoints(spec: Union[str, Dict[str, Any]], env: str = "prod", for_generator: bool = False, schemas: bool = False) -> Iterator[Dict[str, Any]]:
+        # Endpoints of a spec without building the list: a cached compile is replayed, otherwise every operation is
+        # compiled as it's reached. Nothing is added to the cache, huge specs would have to be held to store them.
+        # schemas adds the resolved parameter and request body schemas (see iter_spec_endpoints), never cached.
+        cache_key = ConfigParser.cache.key(spec, env, for_generator) if not schemas else None
+        compiled = ConfigParser.cache.get(cache_key) if cache_key else None
+        if compiled is not None:
+            yield from compiled["endpoints"]
+            return
+        try:
+            parsed, resolver = ConfigParser.open_oas(spec)
         except Exception as e:
-            # Fallback to custom YAML
-            if isinstance(spec, str):
-                config = ConfigParser.load_yaml(spec)
-                if config is None:
-                    return None
-                if not isinstance(config, dict):
-                    raise RuntimeError("Configuration file must parse to a dictionary")
-                if "environments" in config:
-                    config["base_url"] = config["environments"].get(env, config.get("base_url", ""))
-                return config
-            else: raise RuntimeError(f"Invalid OpenAPI spec: {str(e)}")
+            if not isinstance(spec, str): raise RuntimeError(f"Invalid OpenAPI spec: {str(e)}")
+            config = ConfigParser.load_config(spec, env, for_generator)
+            yield from (config or {}).get("endpoints", [])
+            return
+        yielded = 0
+        try:
+            for endpoint in ConfigParser.iter_spec_endpoints(parsed, resolver, schemas):
+                yielded += 1
+                yield endpoint
+        except RemoteReference:
+            # Continue with the fully resolved spec after the endpoints already handed out
+            yield from itertools.islice(ConfigParser.iter_spec_endpoints(ConfigParser.open_oas(spec, full=True)[0], schemas=schemas), yielded, None)
 
+    @staticmethod
+    def _compile_spec(spec: Dict[str, Any], env: str, for_generator: bool, resolver: Optional[RefResolver] = None) -> Dict[str, Any]:
         # Select server based on env
         if not for_generator:
             server = next(
@@ -46,20 +132,37 @@ class ConfigParser:
         else:
             base_url = ""
 
-        # Extract auth
-        auth = {"headers": {"Authorization": "Bearer dummy_token"}}  # Default
+        # Extract the bearer token fallback, None keeps the default dummy token
+        bearer_token = None
         if spec.get("security"):
             security_scheme = spec.get("components", {}).get("securitySchemes", {}).get("bearerAuth", {})
+            if resolver: security_scheme, _ = resolver.node(security_scheme)
             if security_scheme:
-                token_value = os.getenv("API_BEARER_TOKEN", security_scheme.get("bearerFormat", "dummy_token"))
-                auth = {"headers": {"Authorization": f"Bearer {token_value}"}}
+                bearer_token = security_scheme.get("bearerFormat", "dummy_token")
+
+        return {
+            "base_url": base_url,
+            "bearer_token": bearer_token,
+            "rate_limit": resolve_rate_limit(spec.get("x-apiforge-rate-limit"), env),
+            "transport": resolve_transport(spec.get("x-apiforge-transport"), env),
+            "endpoints": list(ConfigParser.iter_spec_endpoints(spec, resolver))
+        }
 
-        # Build endpoints
-        endpoints = []
+    @staticmethod
+    def iter_spec_endpoints(spec: Dict[str, Any], resolver: Optional[RefResolver] = None, schemas: bool = False) -> Iterator[Dict[str, Any]]:
+        # Endpoints of a parsed OAS spec, one operation at a time. With a resolver only the $refs of the operations
+        # that are compiled get resolved, without one the spec has to be resolved already. schemas adds
+        # "param_schemas" and "payload_schema" for TestGenerator.expand_tests.
+        # node and deep take the file a value came from, refs inside an external file are relative to it
+        node = resolver.node if resolver else lambda value, base=None: (value, base)
+        deep = resolver.deep if resolver else lambda value, base=None: value
         for path, operations in spec.get("paths", {}).items():
+            operations, path_base = node(operations)
             for method, operation in operations.items():
                 if method.lower() not in ["get", "post", "put", "delete", "patch"]:  # Exclude patch
                     continue
+                operation, base = node(operation, path_base)
+                responses, responses_base = node(operation.get("responses", {}), base)
 
                 endpoint = {
                     "method": method.upper(),
@@ -71,20 +174,22 @@ class ConfigParser:
                 }
 
                 # Expected status
-                for code in operation.get("responses", {}).keys():
-                    if code.isdigit() and int(code) < 400:
+                for code in responses.keys():
+                    if str(code).isdigit() and int(code) < 400:
                         endpoint["expected_status"] = int(code)
                         break
 
                 # Parameters (query and path)
                 if "parameters" in operation:
-                    for param in operation["parameters"]:
+                    for param, param_base in (node(param, base) for param in operation["parameters"]):
                         if param.get("in") in ["query", "path"] and "schema" in param:
-                            endpoint["params"][param["name"]] = param["schema"].get("example")
+                            endpoint["params"][param["name"]] = node(param["schema"], param_base)[0].get("example")
+                            if schemas: endpoint.setdefault("param_schemas", {})[param["name"]] = deep(param["schema"], param_base)
 
                 # Payload
                 if "requestBody" in operation:
-                    schema = operation["requestBody"].get("content", {}).get("application/json", {}).get("schema", {})
+                    request_body, body_base = node(operation["requestBody"], base)
+                    schema = deep(request_body.get("content", {}).get("application/json", {}).get("schema", {}), body_base)
                     if "$ref" in schema:
                         schema_ref = schema["$ref"].split("/")[-1]
                         schema_def = spec["components"].get("schemas", {}).get(schema_ref, {})
@@ -99,10 +204,18 @@ class ConfigParser:
                     if method.lower() == "put" and "id" in payload:
                         del payload["id"]
                     endpoint["payload"] = payload if payload else None
+                    if schemas: endpoint["payload_schema"] = schema_def
 
                 # Expected keys
-                response = operation.get("responses", {}).get(str(endpoint["expected_status"]), {})
-                schema = response.get("content", {}).get("application/json", {}).get("schema", {})
+                response, response_base = node(responses.get(str(endpoint["expected_status"]), responses.get(endpoint["expected_status"], {})), responses_base)
+                schema = deep(response.get("content", {}).get("application/json", {}).get("schema", {}), response_base)
+                # The full response schema is kept for jsonschema validation, OAS 3.1 schemas are tagged with
+                # their dialect so the matching validator is picked (see utils.schema_validator)
+                endpoint["response_schema"] = None
+                if schema:
+                    endpoint["response_schema"] = schema
+                    if str(spec.get("openapi", "")).startswith("3.1") and "$schema" not in schema:
+                        endpoint["response_schema"] = {**schema, "$schema": spec.get("jsonSchemaDialect", OAS31_DIALECT)}
                 if schema.get("type") == "object":
                     endpoint["expected_keys"] = schema.get("required", [])
                 elif schema.get("type") == "array":
@@ -116,10 +229,11 @@ class ConfigParser:
                 elif schema.get("$ref") == "#/components/schemas/EmptyResponse":
                     endpoint["expected_keys"] = []
 
-                endpoints.append(endpoint)
+                # Large array responses can opt into streaming validation, see StreamValidator
+                if operation.get("x-apiforge-stream"): endpoint["stream"] = operation["x-apiforge-stream"]
+                # Ordering and captured values for the DependencyGraph, latency SLOs
+                for key in ("id", "depends_on", "capture", "max_latency_ms", "p95_ms"):
+                    extension = operation.get(f"x-apiforge-{key.replace('_', '-')}")
+                    if extension: endpoint[key] = extension
 
-        return {
-            "base_url": base_url,
-            "auth": auth,
-            "endpoints": endpoints
-        }
+                yield endpoint
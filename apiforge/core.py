@@ -1,43 +1,271 @@
+import asyncio
+import copy
+import heapq
+import os
+from collections import deque
+import httpx
 import requests
 import time
-from concurrent.futures import ThreadPoolExecutor
-from tenacity import retry, stop_after_attempt, wait_fixed, stop_after_delay, retry_if_exception_type, RetryError
-from typing import Dict, Any, Optional, List, Union, Tuple
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, as_completed, FIRST_COMPLETED
+from typing import Dict, Any, Callable, Optional, Iterable, Iterator, List, Union, Tuple
+from urllib.parse import urlparse
 from .config import ConfigParser
 from .reporter import Reporter
-from .utils import validate_response
-from .generator import TestGenerator
+from .utils import ResponseValidator
+from .generator import TestGenerator, RunState
+from .transport import Transport, expect_status
+from .httpcache import ResponseCache, CacheEntry
+from .decoders import ERROR_BODY_LIMIT, get_decoder, read_capped, read_capped_async, truncate_body
+from .slo import Baseline, LatencyRecorder, PerformanceError, check_slos, request_latency_ms
+from .load import LoadRunner
+from .ratelimit import RateLimiter
+from .hooks import Hook, TIMING_KEYS
+from .stream import StreamValidator, STREAM_CHUNK_SIZE
+from .scheduler import DependencyGraph, DependencyTracker, StreamTracker
+from .shard import shard_indexes, run_shard
+from .retry import RetryPolicy, RetryState, RetryLater, RetriesExhausted, UnexpectedStatus, parse_retry_after
 
 class APIForge:
-    def __init__(self, base_url: str, auth: Optional[Dict[str, Any]] = None, max_workers: int = 10):
+    def __init__(self, base_url: str, auth: Optional[Dict[str, Any]] = None, max_workers: int = 10, max_concurrency: int = 100,
+                 connect_timeout: Optional[float] = 10.0, read_timeout: Optional[float] = 60.0, retry_policy: Optional[RetryPolicy] = None,
+                 rate_limit: Optional[Dict[str, Any]] = None, hooks: Optional[List[Hook]] = None, order_resources: bool = True,
+                 cassette: Optional[str] = None, cassette_mode: str = "replay", http_cache: Union[bool, str, ResponseCache, None] = None,
+                 json_decoder: Union[str, Callable[[bytes], Any], None] = None, error_body_limit: Optional[int] = ERROR_BODY_LIMIT,
+                 http2: Union[bool, str] = False):
         self.base_url = base_url.rstrip('/')
         self.auth = auth or {}
-        self._session = requests.Session()
         self.max_workers = max_workers
+        self.max_concurrency = max_concurrency   # Upper bound of in-flight requests for the async engine
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.cassette = cassette
+        self.cassette_mode = cassette_mode
+        self.http2 = http2
+        self.transport = Transport(pool_size=max_workers, connect_timeout=connect_timeout, read_timeout=read_timeout, cassette=cassette, cassette_mode=cassette_mode,
+                                   http2=http2)
+        self.last_connection_stats: Dict[str, int] = {}
+        self.last_performance: Optional[Dict[str, Any]] = None    # SLO and baseline outcome of the last run_generated_tests
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.rate_limiter = RateLimiter(rate_limit, max_workers=max_workers) if rate_limit else None
+        self.hooks: List[Hook] = list(hooks or [])
+        self.order_resources = order_resources   # Serialise writes per collection, see DependencyGraph
+        self.json_decoder = json_decoder
+        self.decode = get_decoder(json_decoder)  # Response bytes to JSON, see decoders.DECODERS
+        self.error_body_limit = error_body_limit # Bytes of an unexpected response in its error message, None keeps all
+        # Conditional GETs, True keeps the cache in memory and a path persists it between runs (see ResponseCache)
+        if isinstance(http_cache, ResponseCache): self.http_cache = http_cache
+        else: self.http_cache = ResponseCache(http_cache if isinstance(http_cache, str) else None) if http_cache else None
+
+    @property
+    def _session(self) -> requests.Session:
+        # Session of the calling thread, every worker shares the transport's sized connection pools
+        return self.transport.session
+
+    def connection_stats(self) -> Dict[str, int]:
+        return self.transport.stats()
+
+    def close(self):
+        self.transport.close()
+        if self.http_cache: self.http_cache.save()
 
     @classmethod
     def from_config(cls, config: Union[str, Dict[str, Any]], env: str = "Prod") -> 'APIForge':
         config_data = ConfigParser.load_config(config, env)
-        return cls(config_data.get("base_url", ""), config_data.get("auth"))
+        return cls(config_data.get("base_url", ""), config_data.get("auth"), rate_limit=config_data.get("rate_limit"),
+                   http2=(config_data.get("transport") or {}).get("http2", False))
     
-    # Retry 3 times, with a 2 second delay in between and stop execution after 15 seconds with no response 
-    @retry(
-    stop=stop_after_delay(15) | stop_after_attempt(3),
-    wait=wait_fixed(2),
-    retry=(retry_if_exception_type(requests.ConnectionError) | retry_if_exception_type(requests.Timeout))
-    )
-    def send_request(self, url: str, method: str, params: Dict[str, Any] = {}, expected_status: int = 200, **kwargs) -> Dict[str, Any]:
+    def add_hook(self, hook: Hook):
+        self.hooks.append(hook)
+
+    def _call_hooks(self, name: str, *args):
+        for hook in self.hooks: getattr(hook, name)(*args)
+
+    def _start_attempt(self, state: RetryState, host: str, context: Dict[str, Any]):
+        self.retry_policy.start_attempt(state, host)
+        context["attempt"] = state.attempt
+
+    def _raise_for_retry(self, error: Exception, state: RetryState, host: str, context: Dict[str, Any]):
+        try:
+            self.retry_policy.raise_for_retry(error, state, host)
+        except RetryLater as retry:
+            if self.hooks: self._call_hooks("on_retry", context, state.attempt, retry.delay, error)
+            raise
+
+    def _conditional(self, method: str, url: str, params: Dict[str, Any], kwargs: Dict[str, Any], validator: Optional[StreamValidator]
+                     ) -> Tuple[Optional[str], Optional[CacheEntry], Dict[str, Any]]:
+        # Request arguments with auth merged in, plus the cache key and entry of a cacheable GET. A cached entry adds
+        # If-None-Match/If-Modified-Since, streamed responses are never cached.
+        request_kwargs = {**self.auth, **kwargs}
+        if self.http_cache is None or method != "GET" or validator is not None: return None, None, request_kwargs
+        headers = {**self.auth.get("headers", {}), **(kwargs.get("headers") or {})}
+        key = self.http_cache.key(url, params, headers)
+        entry = self.http_cache.get(key)
+        if entry: request_kwargs["headers"] = {**headers, **entry.conditional_headers()}
+        return key, entry, request_kwargs
+
+    def _cache_response(self, key: Optional[str], entry: Optional[CacheEntry], response: Union[requests.Response, httpx.Response],
+                        context: Dict[str, Any]) -> Optional[CacheEntry]:
+        # The cached entry when the server answered 304, otherwise None and the response is parsed as usual.
+        # Callers get a copy of its body, changing a result mustn't change what later hits return.
+        if key is None: return None
+        hit = response.status_code == 304 and entry is not None
+        self.http_cache.record(hit)
+        context["cache"] = "hit" if hit else "miss"
+        if hit: context["cache_entry"] = entry
+        return entry if hit else None
+
+    def _send_once(self, url: str, method: str, params: Dict[str, Any], expected_status: int, state: RetryState, timings: Optional[Dict[str, float]] = None,
+                   context: Optional[Dict[str, Any]] = None, validator: Optional[StreamValidator] = None, **kwargs) -> Dict[str, Any]:
+        # One attempt, retryable failures surface as RetryLater so the caller decides how to wait
         method = str.upper(method)
-        response = self._session.request(method, url, params=params, **self.auth, **kwargs)
-        if response.status_code == 404: raise ValueError(f"Endpoint not found: {response.status_code}")
-        if response.status_code != expected_status: raise AssertionError(f"Expected {expected_status}, got {response.status_code}: {response.text}")
+        host = urlparse(url).netloc
+        timings = timings if timings is not None else {}
+        context = context if context is not None else {"method": method, "endpoint": url, "url": url, "params": params}
+        self._start_attempt(state, host, context)
+        limiter = self.rate_limiter.host(host) if self.rate_limiter else None
+        held = latency = status_code = retry_after = None
         try:
-            result = response.json()
-        except ValueError as e:
-            raise ValueError(f"Failed to parse JSON response: {e}")
-        return result
+            # Acquire inside the try so a raising before_request hook still gives the slot back
+            if limiter:
+                throttle_start = time.perf_counter()
+                limiter.acquire()
+                held = limiter
+                timings["throttle"] = time.perf_counter() - throttle_start
+            if self.hooks: self._call_hooks("before_request", context)
+            started = time.perf_counter()
+            if validator is not None: kwargs["stream"] = True
+            else: expect_status(expected_status, self.error_body_limit)
+            cache_key, cache_entry, request_kwargs = self._conditional(method, url, params, kwargs, validator)
+            response = self._session.request(method, url, params=params, **request_kwargs)
+            # The transport attaches connect/ttfb/download, anything else only gives the round trip
+            transport_timings = getattr(response, "timings", None)
+            if isinstance(transport_timings, dict): timings.update(transport_timings)
+            else: timings["ttfb"] = time.perf_counter() - started
+            status_code = response.status_code
+            if validator is not None:
+                try:
+                    if response.status_code != expected_status: self._check_status(response, expected_status, read_capped(response.iter_content(STREAM_CHUNK_SIZE), self.error_body_limit))
+                    download_start = time.perf_counter()
+                    for chunk in response.iter_content(STREAM_CHUNK_SIZE):
+                        if validator.feed(chunk): break
+                    else: validator.feed(b"", final=True)
+                    self._stream_timings(validator, timings, time.perf_counter() - download_start)
+                finally: response.close()
+                latency = time.perf_counter() - started
+                return validator.summary()
+            latency = time.perf_counter() - started
+            cached = self._cache_response(cache_key, cache_entry, response, context)
+            if cached: return copy.deepcopy(cached.body)
+            result = self._parse_response(response, expected_status, timings)
+            if cache_key: context["cache_entry"] = self.http_cache.store(cache_key, response.headers, result)
+            return result
+        except (requests.RequestException, UnexpectedStatus) as e:
+            retry_after = getattr(e, "retry_after", None)
+            self._raise_for_retry(e, state, host, context)
+            raise
+        finally:
+            # A request that failed before the adapter read the body must not leave its expectation to the next one
+            expect_status(None, None)
+            if held: held.release(latency, status_code, retry_after)
 
-    def run_test(self, method: str, endpoint: str, params: Dict[str, Any] = {}, expected_status: int = 200, expected_keys: Optional[Union[List[str], Tuple[str]]] = None,  **kwargs) -> Dict[str, Any]:
+    async def _send_once_async(self, client: httpx.AsyncClient, url: str, method: str, params: Dict[str, Any], expected_status: int, state: RetryState,
+                               timings: Optional[Dict[str, float]] = None, context: Optional[Dict[str, Any]] = None, validator: Optional[StreamValidator] = None,
+                               **kwargs) -> Dict[str, Any]:
+        method = str.upper(method)
+        host = urlparse(url).netloc
+        timings = timings if timings is not None else {}
+        context = context if context is not None else {"method": method, "endpoint": url, "url": url, "params": params}
+        self._start_attempt(state, host, context)
+        limiter = self.rate_limiter.host(host) if self.rate_limiter else None
+        marks: Dict[str, float] = {}
+
+        async def trace(event_name: str, info: Dict[str, Any]):
+            if event_name == "connection.connect_tcp.started": marks["connect_start"] = time.perf_counter()
+            elif event_name in ("connection.connect_tcp.complete", "connection.start_tls.complete"): marks["connect_end"] = time.perf_counter()
+
+        held = latency = status_code = retry_after = None
+        try:
+            throttle_start = time.perf_counter()
+            while limiter:
+                wait = limiter.try_acquire()
+                if not wait: break
+                await asyncio.sleep(wait)
+            if limiter:
+                held = limiter
+                timings["throttle"] = time.perf_counter() - throttle_start
+            if self.hooks: self._call_hooks("before_request", context)
+            cache_key, cache_entry, request_kwargs = self._conditional(method, url, params, kwargs, validator)
+            auth = request_kwargs.pop("auth", httpx.USE_CLIENT_DEFAULT)
+            request = client.build_request(method, url, params=params, extensions={"trace": trace}, **request_kwargs)
+            started = time.perf_counter()
+            response = await client.send(request, auth=auth, stream=True)
+            ttfb = time.perf_counter() - started
+            status_code = response.status_code
+            error_body = None
+            streaming = validator is not None and self._stream_status(status_code, expected_status)
+            try:
+                if streaming:
+                    async for chunk in response.aiter_bytes(STREAM_CHUNK_SIZE):
+                        if validator.feed(chunk): break
+                    else: validator.feed(b"", final=True)
+                elif status_code != expected_status and self.error_body_limit is not None:
+                    # Only the start of an error body is read, it's only used for the message
+                    error_body = await read_capped_async(response.aiter_bytes(STREAM_CHUNK_SIZE), self.error_body_limit)
+                else: await response.aread()
+            finally: await response.aclose()
+            latency = time.perf_counter() - started
+            connect = marks["connect_end"] - marks["connect_start"] if "connect_end" in marks and "connect_start" in marks else 0.0
+            timings.update({"connect": connect, "ttfb": ttfb, "download": latency - ttfb})
+            if validator is None:
+                cached = self._cache_response(cache_key, cache_entry, response, context)
+                if cached: return copy.deepcopy(cached.body)
+                result = self._parse_response(response, expected_status, timings, error_body)
+                if cache_key: context["cache_entry"] = self.http_cache.store(cache_key, response.headers, result)
+                return result
+            self._check_status(response, expected_status, error_body)
+            self._stream_timings(validator, timings, latency - ttfb)
+            return validator.summary()
+        except (httpx.HTTPError, UnexpectedStatus) as e:
+            retry_after = getattr(e, "retry_after", None)
+            self._raise_for_retry(e, state, host, context)
+            raise
+        finally:
+            if held: held.release(latency, status_code, retry_after)
+
+    def send_request(self, url: str, method: str, params: Dict[str, Any] = {}, expected_status: int = 200, **kwargs) -> Dict[str, Any]:
+        state = RetryState()
+        while True:
+            try: return self._send_once(url, method, params, expected_status, state, **kwargs)
+            except RetryLater as retry: time.sleep(retry.delay)
+
+    async def send_request_async(self, client: httpx.AsyncClient, url: str, method: str, params: Dict[str, Any] = {}, expected_status: int = 200, **kwargs) -> Dict[str, Any]:
+        state = RetryState()
+        while True:
+            try: return await self._send_once_async(client, url, method, params, expected_status, state, **kwargs)
+            except RetryLater as retry: await asyncio.sleep(retry.delay)
+
+    async def run_test_async(self, client: httpx.AsyncClient, method: str, endpoint: str, params: Dict[str, Any] = {}, expected_status: int = 200, expected_keys: Optional[Union[List[str], Tuple[str]]] = None, **kwargs) -> Dict[str, Any]:
+        state = RetryState()
+        while True:
+            try: return await self._run_test_attempt_async(client, state, method, endpoint, params, expected_status, expected_keys, **kwargs)
+            except RetryLater as retry: await asyncio.sleep(retry.delay)
+
+    async def _run_test_attempt_async(self, client: httpx.AsyncClient, state: RetryState, method: str, endpoint: str, params: Dict[str, Any] = {}, expected_status: int = 200, expected_keys: Optional[Union[List[str], Tuple[str]]] = None, **kwargs) -> Dict[str, Any]:
+        formatted_endpoint, url, params = self._prepare_request(method, endpoint, params)
+        reporter = kwargs.pop("reporter", None)
+        # Endpoints from configs carry a validator compiled at load time, direct calls compile one here
+        validator = kwargs.pop("validator", None) or ResponseValidator(expected_keys)
+        stream = StreamValidator.from_options(kwargs.pop("stream", None), validator)
+        max_latency_ms = kwargs.pop("max_latency_ms", None)
+        context, timings, started = self._attempt_context(state, method, endpoint, url, params)
+        try:
+            result = await self._send_once_async(client, url, method, params, expected_status, state, timings=timings, context=context, validator=stream, **kwargs)
+            if max_latency_ms is not None: self._check_latency(timings, max_latency_ms)
+            return self._complete_attempt(result, validator, reporter, {"method": method, "endpoint": endpoint, "params": params}, context, timings, started, stream)
+        except (RetriesExhausted, httpx.HTTPError, ValueError, AssertionError) as e:
+            raise self._fail_attempt(e, reporter, {"method": method, "endpoint": formatted_endpoint, "params": params}, context, timings, started) from e
+
+    def _prepare_request(self, method: str, endpoint: str, params: Dict[str, Any]) -> Tuple[str, str, Dict[str, Any]]:
         params = params.copy()
         formatted_endpoint = endpoint
         for param_name in list(params.keys()):
@@ -49,112 +277,489 @@ class APIForge:
         valid_methods = ["PUT", "DELETE", "GET", "POST", "PATCH"]
         if not isinstance(method, str): raise TypeError("Expected method to be a str")
         if str.upper(method) not in valid_methods: raise ValueError(f"Invalid HTTP method passed. Recieved {method} but accepted HTTP methods are {valid_methods}")
-        reporter = kwargs.pop("reporter", None)
+        return formatted_endpoint, url, params
+
+    @staticmethod
+    def _stream_status(status_code: int, expected_status: int) -> bool:
+        # Only bodies of the expected status are streamed, error bodies are read up to error_body_limit for the message
+        return status_code != 404 and status_code == expected_status
+
+    def _check_status(self, response: Union[requests.Response, httpx.Response], expected_status: int, body: Optional[bytes] = None):
+        # body is the (capped) start of a streamed response, otherwise the whole body was read
+        if response.status_code == 404: raise ValueError(f"Endpoint not found: {response.status_code}")
+        if response.status_code != expected_status:
+            text = truncate_body(response.content if body is None else body, self.error_body_limit)
+            raise UnexpectedStatus(f"Expected {expected_status}, got {response.status_code}: {text}", response.status_code, parse_retry_after(response.headers.get("Retry-After")))
+
+    @staticmethod
+    def _check_latency(timings: Dict[str, float], max_latency_ms: float):
+        # Response fully received within max_latency_ms, see slo.request_latency_ms
+        latency_ms = request_latency_ms(timings)
+        if latency_ms > max_latency_ms: raise AssertionError(f"Latency {latency_ms:.1f}ms exceeded max_latency_ms {max_latency_ms}")
+
+    @staticmethod
+    def _stream_timings(validator: StreamValidator, timings: Dict[str, float], elapsed: float):
+        # Reading, decoding and validating a stream interleave, download is what is left of the elapsed time
+        timings["decode"] = validator.decode_time
+        timings["validate"] = validator.validate_time
+        timings["download"] = max(elapsed - validator.decode_time - validator.validate_time, 0.0)
+
+    def _parse_response(self, response: Union[requests.Response, httpx.Response], expected_status: int, timings: Optional[Dict[str, float]] = None,
+                        body: Optional[bytes] = None) -> Dict[str, Any]:
+        self._check_status(response, expected_status, body)
+        decode_start = time.perf_counter()
         try:
-            result = self.send_request(url=url, method=method, params=params, expected_status=expected_status, **kwargs)
-            if expected_keys is not None and not validate_response(result, expected_keys): raise AssertionError("Response validation failed: missing expected keys")
-            if reporter:
-                test_config = {"method": method, "endpoint": endpoint, "params": params}
-                reporter.log_api_result(test=test_config, result=result, success=True)
-            return result
-        except RetryError as e:
-            # Wrap tenacity.RetryError in RuntimeError
-            original_exception = e.last_attempt.exception() if e.last_attempt else e
-            if reporter: reporter.log_api_result(test={"method": method, "endpoint": formatted_endpoint, "params": params}, result=original_exception, success=False)
-            raise RuntimeError(f"API request failed after retries: {str(original_exception)}") from e 
-        except requests.RequestException as e:
-            if reporter: reporter.log_api_result(test={"method": method, "endpoint": formatted_endpoint, "params": params}, result=e, success=False)
-            raise RuntimeError(f"API request failed after retries: {str(e)}")
+            result = self.decode(response.content)
         except ValueError as e:
-            if reporter: reporter.log_api_result(test={"method": method, "endpoint": formatted_endpoint, "params": params}, result=e, success=False)
-            raise RuntimeError(f"API error: {str(e)}")
-        except AssertionError as e:
-            if reporter: reporter.log_api_result(test={"method": method, "endpoint": formatted_endpoint, "params": params}, result=e, success=False)
-            raise RuntimeError(f"API test failed: {str(e)}")
-        
-    def run_config_tests(self, config: Union[str, Dict[str, Any]], env: str = "prod", reporter: Optional[Reporter] = None) -> list[Dict[str, Any]]:
-        config_data = ConfigParser.load_config(config, env)
-        results = []
-        for endpoint in config_data["endpoints"]:
-            try:
-                result = self.run_test(
-                    method=endpoint["method"],
-                    endpoint=endpoint["path"],
-                    params=endpoint.get("params", {}),
-                    expected_status=endpoint["expected_status"],
-                    json=endpoint.get("payload"),
-                    reporter=reporter,
-                    expected_keys=endpoint.get("expected_keys")
-                )
-                results.append(result)
-            except RuntimeError as e:
-                if reporter:
-                    test_config = {
-                        "method": endpoint["method"],
-                        "endpoint": endpoint["path"],
-                        "params": endpoint.get("params", {})
-                    }
-                    reporter.log_api_result(test_config, None, False, str(e))
-                results.append({"error": str(e)})
-        return results
+            raise ValueError(f"Failed to parse JSON response: {e}")
+        if timings is not None: timings["decode"] = time.perf_counter() - decode_start
+        return result
+
+    def _wrap_error(self, error: Exception, reporter: Optional[Reporter], test: Dict[str, Any], timings: Optional[Dict[str, float]] = None) -> RuntimeError:
+        # Map the sync (requests) and async (httpx) failure modes onto the same RuntimeError messages
+        timings = dict(timings) if timings is not None else None
+        if isinstance(error, RetriesExhausted):
+            original_exception = error.last_exception
+            if reporter: reporter.log_api_result(test=test, result=original_exception, success=False, timings=timings)
+            return RuntimeError(f"API request failed after retries: {str(original_exception)}")
+        if reporter: reporter.log_api_result(test=test, result=error, success=False, timings=timings)
+        if isinstance(error, (requests.RequestException, httpx.HTTPError)): return RuntimeError(f"API request failed after retries: {str(error)}")
+        if isinstance(error, ValueError): return RuntimeError(f"API error: {str(error)}")
+        return RuntimeError(f"API test failed: {str(error)}")
+
+    @staticmethod
+    def _attempt_context(state: RetryState, method: str, endpoint: str, url: str, params: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, float], float]:
+        timings = {key: 0.0 for key in TIMING_KEYS}
+        started = time.perf_counter()
+        if state.queued_at is not None:
+            timings["queue_wait"] = started - state.queued_at
+            state.queued_at = None
+        context = {"method": str.upper(method), "endpoint": endpoint, "url": url, "params": params, "attempt": state.attempt + 1}
+        return context, timings, started
+
+    def _complete_attempt(self, result: Any, validator: ResponseValidator, reporter: Optional[Reporter], test: Dict[str, Any], context: Dict[str, Any], timings: Dict[str, float], started: float,
+                          stream: Optional[StreamValidator] = None, recorder: Optional[LatencyRecorder] = None) -> Any:
+        cache_entry = context.pop("cache_entry", None)
+        if stream is not None:
+            stream.raise_for_invalid()    # Validated while the body was streamed
+        elif cache_entry is None or validator.fingerprint not in cache_entry.valid:
+            validate_start = time.perf_counter()
+            try: validator.validate(result)
+            finally: timings["validate"] = time.perf_counter() - validate_start
+            if cache_entry is not None: self.http_cache.mark_valid(cache_entry, validator.fingerprint)
+        if reporter:
+            reporter_start = time.perf_counter()
+            timings["total"] = reporter_start - started
+            reporter.log_api_result(test=test, result=result, success=True, timings=dict(timings))
+            timings["reporter"] = time.perf_counter() - reporter_start
+        timings["total"] = time.perf_counter() - started
+        if self.hooks: self._call_hooks("after_response", context, result, None, timings)
+        if recorder: recorder.after_response(context, result, None, timings)
+        return result
 
-    def _run_test_task(self, endpoint, reporter):
-        test_config = {
+    def _fail_attempt(self, error: Exception, reporter: Optional[Reporter], test: Dict[str, Any], context: Dict[str, Any], timings: Dict[str, float], started: float,
+                      recorder: Optional[LatencyRecorder] = None) -> RuntimeError:
+        context.pop("cache_entry", None)
+        reporter_start = time.perf_counter()
+        timings["total"] = reporter_start - started
+        wrapped = self._wrap_error(error, reporter, test, timings)
+        if reporter: timings["reporter"] = time.perf_counter() - reporter_start
+        timings["total"] = time.perf_counter() - started
+        if self.hooks: self._call_hooks("after_response", context, None, error, timings)
+        if recorder: recorder.after_response(context, None, error, timings)
+        return wrapped
+
+    def run_test(self, method: str, endpoint: str, params: Dict[str, Any] = {}, expected_status: int = 200, expected_keys: Optional[Union[List[str], Tuple[str]]] = None,  **kwargs) -> Dict[str, Any]:
+        state = RetryState()
+        while True:
+            try: return self._run_test_attempt(state, method, endpoint, params, expected_status, expected_keys, **kwargs)
+            except RetryLater as retry: time.sleep(retry.delay)
+
+    def _run_test_attempt(self, state: RetryState, method: str, endpoint: str, params: Dict[str, Any] = {}, expected_status: int = 200, expected_keys: Optional[Union[List[str], Tuple[str]]] = None,  **kwargs) -> Dict[str, Any]:
+        formatted_endpoint, url, params = self._prepare_request(method, endpoint, params)
+        reporter = kwargs.pop("reporter", None)
+        # Endpoints from configs carry a validator compiled at load time, direct calls compile one here
+        validator = kwargs.pop("validator", None) or ResponseValidator(expected_keys)
+        stream = StreamValidator.from_options(kwargs.pop("stream", None), validator)
+        max_latency_ms = kwargs.pop("max_latency_ms", None)
+        # The LatencyRecorder of the run_generated_tests call this attempt belongs to
+        recorder = kwargs.pop("recorder", None)
+        context, timings, started = self._attempt_context(state, method, endpoint, url, params)
+        try:
+            result = self._send_once(url, method, params, expected_status, state, timings=timings, context=context, validator=stream, **kwargs)
+            if max_latency_ms is not None: self._check_latency(timings, max_latency_ms)
+            return self._complete_attempt(result, validator, reporter, {"method": method, "endpoint": endpoint, "params": params}, context, timings, started, stream, recorder)
+        except (RetriesExhausted, requests.RequestException, ValueError, AssertionError) as e:
+            raise self._fail_attempt(e, reporter, {"method": method, "endpoint": formatted_endpoint, "params": params}, context, timings, started, recorder) from e
+
+    @staticmethod
+    def _test_kwargs(endpoint: Dict[str, Any]) -> Dict[str, Any]:
+        # Translate an endpoint dict from ConfigParser.load_config into run_test/run_test_async arguments
+        return {
             "method": endpoint["method"],
             "endpoint": endpoint["path"],
             "params": endpoint.get("params", {}),
             "expected_status": endpoint["expected_status"],
-            "expected_keys": endpoint.get("expected_keys", [])
+            "expected_keys": endpoint.get("expected_keys"),
+            "json": endpoint.get("payload"),
+            "stream": endpoint.get("stream"),
+            "validator": endpoint.get("validator"),
+            "max_latency_ms": endpoint.get("max_latency_ms")
         }
+
+    @staticmethod
+    def _compile_validators(endpoints: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Compile each endpoint's expected_keys and response schema once, reused by every request and worker
+        for endpoint in endpoints:
+            if "validator" not in endpoint: endpoint["validator"] = ResponseValidator(endpoint.get("expected_keys"), endpoint.get("response_schema"))
+        return endpoints
+
+    def run_config_tests(self, config: Union[str, Dict[str, Any]], env: str = "prod", reporter: Optional[Reporter] = None) -> list[Dict[str, Any]]:
+        config_data = ConfigParser.load_config(config, env)
+        # run_test already reports failures, so only the error result is recorded here
+        results, _ = self._execute(self._compile_validators(config_data["endpoints"]), reporter)
+        return results
+
+    def _run_test_task(self, endpoint, reporter, state=None, recorder=None):
+        # With a RetryState only one attempt is made and RetryLater propagates so the caller can reschedule it
         try:
-            result = self.run_test(
-                method=endpoint["method"],
-                endpoint=endpoint["path"],
-                params=endpoint.get("params", {}),
-                expected_status=endpoint["expected_status"],
-                expected_keys=endpoint.get("expected_keys"),
-                json=endpoint.get("payload"),
-                reporter=reporter
-            )
+            if state is None: result = self.run_test(**self._test_kwargs(endpoint), reporter=reporter, recorder=recorder)
+            else: result = self._run_test_attempt(state, **self._test_kwargs(endpoint), reporter=reporter, recorder=recorder)
             return result, True
         except RuntimeError as e:
             return {"error": str(e)}, False
-    
-    def run_generated_tests(self, spec: Union[str, Dict[str, Any]], reporter: Optional[Reporter] = None) -> List[Dict[str, Any]]:
+
+    async def _run_test_task_async(self, client, semaphore, endpoint, reporter):
+        state = RetryState()
+        while True:
+            state.queued_at = time.perf_counter()
+            async with semaphore:
+                try:
+                    result = await self._run_test_attempt_async(client, state, **self._test_kwargs(endpoint), reporter=reporter)
+                    return result, True
+                except RuntimeError as e:
+                    return {"error": str(e)}, False
+                except RetryLater as retry:
+                    delay = retry.delay
+            # Back off outside the semaphore so a waiting retry doesn't hold a concurrency slot
+            await asyncio.sleep(delay)
+
+    def _skip(self, endpoint: Dict[str, Any], reporter: Optional[Reporter], dependency: str) -> Dict[str, Any]:
+        error = f"Skipped: dependency {dependency} failed"
+        if reporter: reporter.log_api_result(test={"method": endpoint["method"], "endpoint": endpoint["path"], "params": endpoint.get("params", {})}, result=RuntimeError(error), success=False)
+        return {"error": error}
+
+    def _execute(self, endpoints: List[Dict[str, Any]], reporter: Optional[Reporter], recorder: Optional[LatencyRecorder] = None) -> Tuple[List[Dict[str, Any]], List[bool]]:
+        # Workers make a single attempt, attempts waiting on a retry sit in a heap ordered by due time and are
+        # resubmitted once due, so backoff never holds a worker thread. Endpoints are only submitted once their
+        # dependencies finished, everything else runs in parallel.
+        tracker = DependencyTracker(DependencyGraph(endpoints, self.order_resources))
+        results: List[Dict[str, Any]] = [None] * len(endpoints)
+        bound: List[Dict[str, Any]] = list(endpoints)
+        successes = [False] * len(endpoints)
+        pending = {}
+        delayed = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            def submit(index: int, state: RetryState):
+                state.queued_at = time.perf_counter()
+                pending[executor.submit(self._run_test_task, bound[index], reporter, state, recorder)] = (index, state)
+
+            def schedule(ready: List[int]):
+                queue = deque(ready)
+                while queue:
+                    index = queue.popleft()
+                    blocker = tracker.blocked_by(index)
+                    if blocker is None:
+                        bound[index] = tracker.bind(index)
+                        submit(index, RetryState())
+                    else:
+                        results[index] = self._skip(endpoints[index], reporter, blocker)
+                        queue.extend(tracker.complete(index, results[index], False))
+
+            schedule(tracker.graph.roots())
+            while pending or delayed:
+                timeout = max(delayed[0][0] - time.monotonic(), 0) if delayed else None
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, state = pending.pop(future)
+                    try:
+                        results[index], successes[index] = future.result()
+                        schedule(tracker.complete(index, results[index], successes[index]))
+                    except RetryLater as retry:
+                        heapq.heappush(delayed, (time.monotonic() + retry.delay, index, state))
+                while delayed and delayed[0][0] <= time.monotonic():
+                    _, index, state = heapq.heappop(delayed)
+                    submit(index, state)
+        return results, successes
+
+    def stream_generated_tests(self, spec: Union[str, Dict[str, Any], Iterable[Dict[str, Any]]], reporter: Optional[Reporter] = None,
+                               max_in_flight: Optional[int] = None) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any], bool]]:
+        # Generator version of run_generated_tests for huge or programmatically expanded test sets: endpoints are pulled
+        # from the spec (or any iterable of endpoints) only while fewer than max_in_flight (default 2 * max_workers)
+        # are admitted and unfinished, and (endpoint, result, success) is yielded as each one finishes. Memory stays
+        # flat and the first requests go out while the rest of the spec is still being compiled.
+        method = "APIForge::stream_generated_tests"
+        window = max(max_in_flight or 2 * self.max_workers, 1)
+        source = TestGenerator().iter_tests(spec)
+        tracker = StreamTracker(self.order_resources)
+        pending = {}
+        delayed = []
+        finished: deque = deque()
+        exhausted = False
+        start_time = time.time()
+        total = success_count = 0
+        if reporter: reporter.log_generic_output(output=f"Streaming generated tests from: {spec if isinstance(spec, (str, dict)) else type(spec).__name__}", method=method)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            def submit(seq: int, endpoint: Dict[str, Any], state: RetryState):
+                state.queued_at = time.perf_counter()
+                pending[executor.submit(self._run_test_task, endpoint, reporter, state)] = (seq, endpoint, state)
+
+            def start(seq: int) -> List[int]:
+                # Submits a ready endpoint, or skips it behind a failed dependency and returns what that unblocked
+                blocker = tracker.blocked_by(seq)
+                if blocker is None:
+                    submit(seq, tracker.bind(seq), RetryState())
+                    return []
+                endpoint = tracker.endpoints[seq]
+                result = self._skip(endpoint, reporter, blocker)
+                finished.append((endpoint, result, False))
+                return tracker.complete(seq, result, False)
+
+            def complete(seq: int, result: Dict[str, Any], success: bool):
+                finished.append((tracker.endpoints[seq], result, success))
+                queue = deque(tracker.complete(seq, result, success))
+                while queue: queue.extend(start(queue.popleft()))
+
+            while True:
+                # Backpressure: the next endpoint is only generated once one of the window finished
+                while not exhausted and len(tracker.endpoints) < window:
+                    try:
+                        endpoint = next(source)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    seq, ready = tracker.admit(self._compile_validators([endpoint])[0])
+                    if ready:
+                        queue = deque(start(seq))
+                        while queue: queue.extend(start(queue.popleft()))
+                if not tracker.endpoints and not finished: break
+                if not finished:
+                    timeout = max(delayed[0][0] - time.monotonic(), 0) if delayed else None
+                    done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        seq, endpoint, state = pending.pop(future)
+                        try:
+                            complete(seq, *future.result())
+                        except RetryLater as retry:
+                            heapq.heappush(delayed, (time.monotonic() + retry.delay, seq, endpoint, state))
+                    while delayed and delayed[0][0] <= time.monotonic():
+                        _, seq, endpoint, state = heapq.heappop(delayed)
+                        submit(seq, endpoint, state)
+                while finished:
+                    outcome = finished.popleft()
+                    total += 1
+                    success_count += outcome[2]
+                    yield outcome
+        self._log_summary(reporter, total, success_count, start_time, method)
+        if reporter: reporter.flush()
+
+    def _generate_endpoints(self, spec: Union[str, Dict[str, Any]], reporter: Optional[Reporter], method: str) -> List[Dict[str, Any]]:
         generator = TestGenerator()
-        if reporter: reporter.log_generic_output(output=f"Starting generated tests with spec: {spec}", method="APIForge::run_generated_tests")
+        if reporter: reporter.log_generic_output(output=f"Starting generated tests with spec: {spec}", method=method)
         try:
-            endpoints = generator.generate_tests(spec)
-            if reporter: reporter.log_generic_output(output=f"Generated {len(endpoints)} test endpoints", method="APIForge::run_generated_tests")
+            endpoints = self._compile_validators(generator.generate_tests(spec))
+            if reporter: reporter.log_generic_output(output=f"Generated {len(endpoints)} test endpoints", method=method)
+            return endpoints
         except RuntimeError as e:
-            if reporter: reporter.log_error(method="APIForge::run_generated_tests", error=e)
+            if reporter: reporter.log_error(method=method, error=e)
             raise RuntimeError(f"Failed to generate tests: {str(e)}")
-        
-        results = []
-        success_count = 0
+
+    def _log_summary(self, reporter: Optional[Reporter], total: int, success_count: int, start_time: float, method: str):
+        if reporter:
+            elapsed_time = time.time() - start_time
+            reporter.log_generic_output(
+                        output=
+                        f"Completed {total} tests: {success_count} passed, "
+                        f"{total - success_count} failed in {elapsed_time:.2f} seconds",
+                        method=method
+                    )
+            if self.rate_limiter:
+                for host, limits in self.rate_limiter.snapshot().items():
+                    reporter.log_generic_output(output=f"Rate limit for {host}: {limits}", method=method)
+
+    def _select_shard(self, endpoints: List[Dict[str, Any]], shard: Optional[Tuple[int, int]], reporter: Optional[Reporter], method: str) -> List[Dict[str, Any]]:
+        if not shard: return endpoints
+        selected = [endpoints[index] for index in shard_indexes(endpoints, shard[0], shard[1], self.order_resources)]
+        if reporter: reporter.log_generic_output(output=f"Shard {shard[0]}/{shard[1]}: running {len(selected)} of {len(endpoints)} endpoints", method=method)
+        return selected
+
+    def _log_connections(self, reporter: Optional[Reporter], method: str):
+        if reporter:
+            reporter.log_generic_output(
+                        output=
+                        f"Connections: {self.last_connection_stats['connections_opened']} opened, "
+                        f"{self.last_connection_stats['connections_reused']} reused for {self.last_connection_stats['requests']} requests",
+                        method=method
+                    )
+            reporter.flush()
+
+    def _select_changed(self, endpoints: List[Dict[str, Any]], state: RunState, force: bool, reporter: Optional[Reporter], method: str) -> List[Dict[str, Any]]:
+        selected = [endpoints[index] for index in TestGenerator.select_changed(endpoints, state, force)]
+        if reporter: reporter.log_generic_output(output=f"Incremental: running {len(selected)} of {len(endpoints)} operations", method=method)
+        return selected
+
+    def run_generated_tests(self, spec: Union[str, Dict[str, Any]], reporter: Optional[Reporter] = None, shard: Optional[Tuple[int, int]] = None,
+                            state_file: Optional[str] = None, force: bool = False, baseline: Optional[Baseline] = None) -> List[Dict[str, Any]]:
+        # shard=(i, n) only runs the i-th of n deterministic partitions of the endpoints, see shard_indexes.
+        # With state_file only operations that changed since the last run or failed in it are run (plus what they
+        # depend on), force runs everything and refreshes the state. Endpoint p95_ms SLOs and the baseline are
+        # checked once the run finished, the outcome is kept in last_performance and a failed check raises
+        # PerformanceError (a regression against a baseline in warn mode doesn't).
+        method = "APIForge::run_generated_tests"
+        all_endpoints = self._generate_endpoints(spec, reporter, method)
+        endpoints = self._select_shard(all_endpoints, shard, reporter, method)
+        state = RunState(state_file) if state_file else None
+        if state: endpoints = self._select_changed(endpoints, state, force, reporter, method)
         start_time = time.time()
+        stats_before = self.transport.stats()
+        recorder = LatencyRecorder() if baseline or any(endpoint.get("p95_ms") is not None for endpoint in endpoints) else None
+        results, successes = self._execute(endpoints, reporter, recorder)
+        success_count = sum(successes)
+        self.last_performance = self._check_performance(endpoints, recorder, baseline, reporter, method) if recorder else None
 
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                futures = [executor.submit(self._run_test_task, endpoint, reporter) for endpoint in endpoints]
-                for future in futures:
-                    result, success = future.result()
-                    results.append(result)
-                    if success: success_count += 1
+        if state:
+            state.record(endpoints, successes, all_endpoints)
+            state.save()
+        self.last_connection_stats = Transport.stats_delta(stats_before, self.transport.stats())
+        self._log_summary(reporter, len(endpoints), success_count, start_time, method)
+        self._log_connections(reporter, method)
+        if self.last_performance and not self.last_performance["passed"]: raise PerformanceError(self.last_performance, results)
+        return results
 
+    def _check_performance(self, endpoints: List[Dict[str, Any]], recorder: LatencyRecorder, baseline: Optional[Baseline], reporter: Optional[Reporter],
+                           method: str) -> Dict[str, Any]:
+        violations = check_slos(endpoints, recorder)
+        regressions = baseline.compare(recorder) if baseline else []
+        if reporter:
+            for violation in violations:
+                reporter.log_error(method=method, error=f"SLO violated: {violation['endpoint']} p95 {violation['p95_ms']:.1f}ms > p95_ms {violation['limit_ms']}")
+            for regression in regressions:
+                message = f"{regression['endpoint']} p95 {regression['p95_ms']:.1f}ms is {regression['change']:.0%} above the baseline {regression['baseline_ms']:.1f}ms"
+                if baseline.mode == "fail": reporter.log_error(method=method, error=f"Performance regression: {message}")
+                else: reporter.log_generic_output(output=f"Performance regression (warning): {message}", method=method)
+        if baseline and baseline.update:
+            baseline.record(recorder)
+            baseline.save()
+        passed = not violations and not (regressions and baseline.mode == "fail")
+        return {"passed": passed, "slo_violations": violations, "regressions": regressions}
+
+    def _process_settings(self, processes: int) -> Dict[str, Any]:
+        # Constructor arguments for shard worker processes, the request rate is split between them
+        rate_limit = dict(self.rate_limiter.settings) if self.rate_limiter else None
+        for key in ("rps", "burst"):
+            if rate_limit and rate_limit.get(key): rate_limit[key] = rate_limit[key] / processes
+        # Every process can replay the same cassette, but they can't all write one
+        if self.cassette and self.cassette_mode == "record": raise RuntimeError("Recording a cassette needs a single process")
+        # The HTTP cache isn't passed on, worker processes would overwrite each other's cache file
+        return {
+            "base_url": self.base_url,
+            "auth": self.auth,
+            "max_workers": self.max_workers,
+            "max_concurrency": self.max_concurrency,
+            "connect_timeout": self.connect_timeout,
+            "read_timeout": self.read_timeout,
+            "retry_policy": self.retry_policy,
+            "rate_limit": rate_limit,
+            "order_resources": self.order_resources,
+            "cassette": self.cassette,
+            "cassette_mode": self.cassette_mode,
+            "json_decoder": self.json_decoder if not callable(self.json_decoder) else None,    # Functions may not pickle
+            "error_body_limit": self.error_body_limit,
+            "http2": self.http2
+        }
+
+    def run_generated_tests_multiprocess(self, spec: Union[str, Dict[str, Any]], processes: Optional[int] = None, reporter: Optional[Reporter] = None) -> List[Dict[str, Any]]:
+        # One shard per process, each with its own APIForge, session and max_workers threads, so JSON decoding and
+        # validation use every core. Results and timings come back to this process and go into one report.
+        # Hooks are not run in the worker processes.
+        method = "APIForge::run_generated_tests_multiprocess"
+        processes = processes or os.cpu_count() or 1
+        endpoints = self._generate_endpoints(spec, reporter, method)
+        start_time = time.time()
+        results: List[Dict[str, Any]] = [None] * len(endpoints)
+        success_count = 0
+        connection_stats: Dict[str, int] = {}
+        settings = self._process_settings(processes)
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            futures = [executor.submit(run_shard, settings, spec, (index, processes)) for index in range(1, processes + 1)]
+            for future in as_completed(futures):
+                shard = future.result()
+                for index, result in zip(shard["indexes"], shard["results"]): results[index] = result
+                success_count += shard["success_count"]
+                for key, value in shard["connection_stats"].items(): connection_stats[key] = connection_stats.get(key, 0) + value
+                if reporter:
+                    for record in shard["records"]: reporter.log_record(record)
+
+        self.last_connection_stats = connection_stats
+        self._log_summary(reporter, len(endpoints), success_count, start_time, method)
+        self._log_connections(reporter, method)
+        return results
+
+    def run_load(self, spec: Union[str, Dict[str, Any]], rps: float, duration: float, ramp: float = 0.0, reporter: Optional[Reporter] = None) -> Dict[str, Any]:
+        endpoints = self._generate_endpoints(spec, reporter, "APIForge::run_load")
+        summary = LoadRunner(self).run(endpoints, rps=rps, duration=duration, ramp=ramp)
         if reporter:
-            elapsed_time = time.time() - start_time
             reporter.log_generic_output(
                         output=
-                        f"Completed {len(endpoints)} tests: {success_count} passed, "
-                        f"{len(endpoints) - success_count} failed in {elapsed_time:.2f} seconds",
-                        method="APIForge::run_generated_tests"
+                        f"Sent {summary['requests']} requests in {summary['elapsed']:.2f} seconds "
+                        f"({summary['achieved_rps']:.1f}/{rps} rps), error rate {summary['error_rate']:.2%}",
+                        method="APIForge::run_load"
                     )
-        
+            for name, stats in summary["endpoints"].items():
+                latency = stats["latency"]
+                reporter.log_generic_output(
+                            output=
+                            f"{name}: {stats['requests']} requests, p50 {latency['p50_ms']:.1f}ms, p90 {latency['p90_ms']:.1f}ms, "
+                            f"p99 {latency['p99_ms']:.1f}ms, max {latency['max_ms']:.1f}ms, errors {stats['errors']}",
+                            method="APIForge::run_load"
+                        )
+            reporter.flush()
+        return summary
+
+    async def _run_endpoints_async(self, endpoints: List[Dict[str, Any]], reporter: Optional[Reporter], concurrency: Optional[int]) -> Tuple[List[Dict[str, Any]], int]:
+        # One event loop drives every request, the semaphore bounds how many are in flight at once
+        concurrency = concurrency or self.max_concurrency
+        semaphore = asyncio.Semaphore(concurrency)
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        timeout = httpx.Timeout(self.read_timeout, connect=self.connect_timeout)
+        tracker = DependencyTracker(DependencyGraph(endpoints, self.order_resources))
+        finished = [asyncio.Event() for _ in endpoints]
+
+        async def run(client: httpx.AsyncClient, index: int) -> Tuple[Dict[str, Any], bool]:
+            for dependency in tracker.graph.dependencies[index]: await finished[dependency].wait()
+            blocker = tracker.blocked_by(index)
+            if blocker is None: outcome = await self._run_test_task_async(client, semaphore, tracker.bind(index), reporter)
+            else: outcome = self._skip(endpoints[index], reporter, blocker), False
+            tracker.complete(index, *outcome)
+            finished[index].set()
+            return outcome
+
+        async with httpx.AsyncClient(limits=limits, timeout=timeout, transport=self.transport.async_transport(limits)) as client:
+            outcomes = await asyncio.gather(*(run(client, index) for index in range(len(endpoints))))
+        results = [result for result, _ in outcomes]
+        return results, sum(1 for _, success in outcomes if success)
+
+    async def run_config_tests_async(self, config: Union[str, Dict[str, Any]], env: str = "prod", reporter: Optional[Reporter] = None, concurrency: Optional[int] = None) -> List[Dict[str, Any]]:
+        config_data = ConfigParser.load_config(config, env)
+        results, _ = await self._run_endpoints_async(self._compile_validators(config_data["endpoints"]), reporter, concurrency)
+        return results
+
+    async def run_generated_tests_async(self, spec: Union[str, Dict[str, Any]], reporter: Optional[Reporter] = None, concurrency: Optional[int] = None,
+                                        shard: Optional[Tuple[int, int]] = None) -> List[Dict[str, Any]]:
+        endpoints = self._generate_endpoints(spec, reporter, "APIForge::run_generated_tests_async")
+        endpoints = self._select_shard(endpoints, shard, reporter, "APIForge::run_generated_tests_async")
+        start_time = time.time()
+        results, success_count = await self._run_endpoints_async(endpoints, reporter, concurrency)
+        self._log_summary(reporter, len(endpoints), success_count, start_time, "APIForge::run_generated_tests_async")
+        if reporter: reporter.flush()
         return results
-    
-    # @contextmanager
-    # def get_session(self):
-    #     with self._lock:
-    #         session = self._session
-    #         try: yield session
-    #         finally: session.close()
\ No newline at end of file
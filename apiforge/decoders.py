@@ -0,0 +1,47 @@
+import json
+import os
+from typing import Any, AsyncIterable, Callable, Dict, Iterable, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# JSON decoders by name, each takes the raw body bytes so there's no str copy of the body. orjson is the default
+# when it's installed, APIFORGE_JSON_DECODER or APIForge(json_decoder=...) pick another one.
+DECODERS: Dict[str, Callable[[bytes], Any]] = {"json": json.loads}
+if orjson: DECODERS["orjson"] = orjson.loads
+DEFAULT_DECODER = "orjson" if orjson else "json"
+# Bytes of an unexpected response kept for the error message, large error pages would bloat logs and reports
+ERROR_BODY_LIMIT = 4096
+
+def register_decoder(name: str, decoder: Callable[[bytes], Any]):
+    # decoder must raise ValueError for invalid JSON
+    DECODERS[name] = decoder
+
+def get_decoder(decoder: Union[str, Callable[[bytes], Any], None] = None) -> Callable[[bytes], Any]:
+    if callable(decoder): return decoder
+    name = decoder or os.getenv("APIFORGE_JSON_DECODER") or DEFAULT_DECODER
+    if name not in DECODERS: raise RuntimeError(f"Unknown JSON decoder '{name}', expected one of {', '.join(DECODERS)}")
+    return DECODERS[name]
+
+def read_capped(chunks: Iterable[bytes], limit: Optional[int]) -> bytes:
+    # The start of a streamed body, reading stops after the chunk that takes it past limit. That's up to one chunk
+    # more than limit, truncate_body cuts it and the extra bytes tell it there was more
+    body = b""
+    for chunk in chunks:
+        body += chunk
+        if limit is not None and len(body) > limit: break
+    return body
+
+async def read_capped_async(chunks: AsyncIterable[bytes], limit: Optional[int]) -> bytes:
+    # read_capped for the async engine
+    body = b""
+    async for chunk in chunks:
+        body += chunk
+        if limit is not None and len(body) > limit: break
+    return body
+
+def truncate_body(body: bytes, limit: Optional[int]) -> str:
+    if limit is None or len(body) <= limit: return body.decode("utf-8", errors="replace")
+    return body[:limit].decode("utf-8", errors="ignore") + "... [truncated]"
@@ -0,0 +1,222 @@
+import json
+import math
+import os
+import socket
+import socketserver
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, List, Optional, Tuple, Union
+from .config import ConfigParser
+from .reporter import Reporter
+from .scheduler import DependencyGraph
+from .shard import ShardRecorder, components
+
+# Coordinator and workers talk newline delimited JSON over TCP:
+#   worker -> {"type": "hello", "worker": name}          coordinator -> {"type": "config", ...APIForge arguments}
+#   worker -> {"type": "next"}                           coordinator -> {"type": "batch", "units": [...]} | {"type": "wait", "delay": s} | {"type": "done"}
+#   worker -> {"type": "results", "units": [...], ...}   coordinator -> {"type": "ack"}
+# A unit is one dependency component of the endpoint list, so chains and captured values never cross workers.
+
+def _send(stream, message: Dict[str, Any]):
+    stream.write(json.dumps(message, default=str).encode() + b"\n")
+    stream.flush()
+
+def _receive(stream) -> Optional[Dict[str, Any]]:
+    line = stream.readline()
+    return json.loads(line) if line else None
+
+class WorkQueue:
+    # Units waiting to be handed out. A worker first gets its share of the unassigned units, then pulls small
+    # batches from its own deque; once both are empty it steals half of the largest other deque from the tail,
+    # so a worker stuck on slow endpoints gives up the work it hasn't started yet.
+    def __init__(self, units: List[int], expected_workers: int = 2, batch_size: int = 1):
+        self.unassigned = deque(units)
+        self.expected_workers = max(expected_workers, 1)
+        self.batch_size = max(batch_size, 1)
+        self.queues: Dict[str, deque] = {}
+        self.in_flight: Dict[str, set] = {}
+        self.remaining = len(units)
+        self.shares = 0     # Workers that took a share of the unassigned units so far
+        self.steals = 0
+        self._lock = threading.Lock()
+
+    def register(self, worker: str):
+        with self._lock:
+            self.queues.setdefault(worker, deque())
+            self.in_flight.setdefault(worker, set())
+
+    def next_batch(self, worker: str) -> Optional[List[int]]:
+        # Units to run next, [] while other workers still have units in flight, None once everything finished
+        with self._lock:
+            if self.remaining == 0: return None
+            queue = self.queues[worker]
+            if not queue and self.unassigned:
+                share = math.ceil(len(self.unassigned) / max(self.expected_workers - self.shares, 1))
+                self.shares += 1
+                for _ in range(share): queue.append(self.unassigned.popleft())
+            if not queue:
+                victim = max(self.queues, key=lambda name: len(self.queues[name]))
+                stolen = len(self.queues[victim]) // 2 or len(self.queues[victim])
+                if stolen:
+                    self.steals += 1
+                    for _ in range(stolen): queue.appendleft(self.queues[victim].pop())
+            batch = [queue.popleft() for _ in range(min(self.batch_size, len(queue)))]
+            self.in_flight[worker].update(batch)
+            return batch
+
+    def complete(self, worker: str, units: List[int]):
+        with self._lock:
+            for unit in units:
+                if unit in self.in_flight[worker]:
+                    self.in_flight[worker].discard(unit)
+                    self.remaining -= 1
+
+    def release(self, worker: str):
+        # A worker went away, whatever it held goes back to the front of the unassigned units
+        with self._lock:
+            self.unassigned.extendleft(reversed(list(self.queues.pop(worker, ())) + sorted(self.in_flight.pop(worker, ()))))
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        coordinator: "Coordinator" = self.server.coordinator
+        hello = _receive(self.rfile)
+        if not hello or hello.get("type") != "hello": return
+        worker = f"{hello.get('worker')}@{self.client_address[0]}:{self.client_address[1]}"
+        coordinator.queue.register(worker)
+        try:
+            _send(self.wfile, {"type": "config", **coordinator.worker_settings})
+            while True:
+                message = _receive(self.rfile)
+                if message is None: break
+                if message["type"] == "next":
+                    batch = coordinator.queue.next_batch(worker)
+                    if batch is None: _send(self.wfile, {"type": "done"})
+                    elif not batch: _send(self.wfile, {"type": "wait", "delay": 0.05})
+                    else: _send(self.wfile, {"type": "batch", "units": [{"unit": unit, "endpoints": coordinator.unit_endpoints(unit)} for unit in batch]})
+                elif message["type"] == "results":
+                    coordinator.collect(worker, message)
+                    _send(self.wfile, {"type": "ack"})
+        except (OSError, ValueError):
+            pass
+        finally:
+            coordinator.queue.release(worker)
+
+class _Server(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+class Coordinator:
+    # Loads the spec once, hands dependency components to APIForge workers over TCP and aggregates their
+    # results, in endpoint order, into one list and one Reporter
+    def __init__(self, spec: Union[str, Dict[str, Any]], env: str = "prod", host: str = "127.0.0.1", port: int = 0, expected_workers: int = 2,
+                 batch_size: int = 1, base_url: Optional[str] = None, max_workers: int = 10, order_resources: bool = True, reporter: Optional[Reporter] = None):
+        config = ConfigParser.load_config(spec, env)
+        self.endpoints: List[Dict[str, Any]] = config["endpoints"]
+        self.units = sorted(components(DependencyGraph(self.endpoints, order_resources)), key=lambda unit: -len(unit))
+        self.queue = WorkQueue(list(range(len(self.units))), expected_workers, batch_size)
+        rate_limit = dict(config["rate_limit"]) if config.get("rate_limit") else None
+        for key in ("rps", "burst"):
+            if rate_limit and rate_limit.get(key): rate_limit[key] = rate_limit[key] / max(expected_workers, 1)
+        self.worker_settings = {
+            "base_url": base_url or config["base_url"],
+            "auth": config.get("auth"),
+            "max_workers": max_workers,
+            "rate_limit": rate_limit,
+            "order_resources": order_resources,
+            "http2": (config.get("transport") or {}).get("http2", False)
+        }
+        self.reporter = reporter
+        self.results: List[Optional[Dict[str, Any]]] = [None] * len(self.endpoints)
+        self.success_count = 0
+        self.units_by_worker: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._finished = threading.Event()
+        if not self.endpoints: self._finished.set()
+        self._server = _Server((host, port), _Handler)
+        self._server.coordinator = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._server.server_address[:2]
+
+    def unit_endpoints(self, unit: int) -> List[List[Any]]:
+        return [[index, self.endpoints[index]] for index in self.units[unit]]
+
+    def collect(self, worker: str, message: Dict[str, Any]):
+        with self._lock:
+            for index, result in message["results"]: self.results[index] = result
+            self.success_count += message["success_count"]
+            self.units_by_worker[worker] = self.units_by_worker.get(worker, 0) + len(message["units"])
+        if self.reporter:
+            for record in message["records"]: self.reporter.log_record(record)
+        self.queue.complete(worker, message["units"])
+        if self.queue.remaining == 0: self._finished.set()
+
+    def start(self) -> Tuple[str, int]:
+        self._thread = threading.Thread(target=self._server.serve_forever, name="APIForge-coordinator", daemon=True)
+        self._thread.start()
+        return self.address
+
+    def wait(self, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        if not self._finished.wait(timeout): raise RuntimeError(f"Distributed run did not finish, {self.queue.remaining} of {len(self.units)} units left")
+        return self.results
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def run(self, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        started = time.time()
+        self.start()
+        try:
+            results = self.wait(timeout)
+        finally:
+            self.close()
+        if self.reporter:
+            self.reporter.log_generic_output(
+                        output=
+                        f"Completed {len(self.endpoints)} tests on {len(self.units_by_worker)} workers: {self.success_count} passed, "
+                        f"{len(self.endpoints) - self.success_count} failed in {time.time() - started:.2f} seconds, {self.queue.steals} steals",
+                        method="Coordinator::run"
+                    )
+            self.reporter.flush()
+        return results
+
+def run_worker(address: Tuple[str, int], name: Optional[str] = None, connect_timeout: float = 10.0) -> int:
+    # Pulls units from a Coordinator until it reports done, returns how many units this worker ran
+    from .core import APIForge
+    name = name or f"worker-{socket.gethostname()}-{os.getpid()}"
+    with socket.create_connection(tuple(address), timeout=connect_timeout) as connection:
+        connection.settimeout(None)
+        stream = connection.makefile("rwb")
+        _send(stream, {"type": "hello", "worker": name})
+        config = _receive(stream)
+        if not config or config.get("type") != "config": raise RuntimeError("Coordinator did not send a config")
+        config.pop("type")
+        forge = APIForge(**config)
+        units_run = 0
+        try:
+            while True:
+                _send(stream, {"type": "next"})
+                message = _receive(stream)
+                if message is None or message["type"] == "done": return units_run
+                if message["type"] == "wait":
+                    time.sleep(message["delay"])
+                    continue
+                indexes = [index for unit in message["units"] for index, _ in unit["endpoints"]]
+                endpoints = forge._compile_validators([endpoint for unit in message["units"] for _, endpoint in unit["endpoints"]])
+                recorder = ShardRecorder(name)
+                results, successes = forge._execute(endpoints, recorder)
+                _send(stream, {
+                    "type": "results",
+                    "units": [unit["unit"] for unit in message["units"]],
+                    "results": [[index, result] for index, result in zip(indexes, results)],
+                    "success_count": sum(successes),
+                    "records": recorder.records
+                })
+                _receive(stream)
+                units_run += len(message["units"])
+        finally:
+            forge.close()
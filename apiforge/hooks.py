@@ -0,0 +1,48 @@
+import threading
+from typing import Dict, Any, Optional
+
+# Keys of the timings dict handed to after_response, all in seconds:
+#   queue_wait  time between handing the attempt to the executor and a worker starting it
+#   throttle    time spent waiting on the rate limiter
+#   connect     TCP/TLS connection setup (0 when a keep-alive connection was reused)
+#   ttfb        request sent until response headers arrived, includes connect
+#   download    reading the response body
+#   decode      JSON decoding
+#   validate    validate_response
+#   reporter    handing the result to the Reporter
+#   total       the whole attempt, excluding queue_wait
+TIMING_KEYS = ("queue_wait", "throttle", "connect", "ttfb", "download", "decode", "validate", "reporter", "total")
+
+class Hook:
+    # Base class for profiling and instrumentation hooks, override any subset of the methods.
+    # context holds method, endpoint, url, params and attempt for the request being made.
+    def before_request(self, context: Dict[str, Any]) -> None:
+        pass
+
+    def after_response(self, context: Dict[str, Any], result: Any, error: Optional[Exception], timings: Dict[str, float]) -> None:
+        pass
+
+    def on_retry(self, context: Dict[str, Any], attempt: int, delay: float, error: Exception) -> None:
+        pass
+
+class TimingCollector(Hook):
+    # Sums timings per endpoint, handy for finding where time goes in large runs
+    def __init__(self):
+        self.totals: Dict[str, Dict[str, float]] = {}
+        self.counts: Dict[str, int] = {}
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def after_response(self, context, result, error, timings):
+        name = f"{context['method']} {context['endpoint']}"
+        with self._lock:
+            totals = self.totals.setdefault(name, {key: 0.0 for key in TIMING_KEYS})
+            for key, value in timings.items(): totals[key] = totals.get(key, 0.0) + value
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+    def on_retry(self, context, attempt, delay, error):
+        with self._lock: self.retries += 1
+
+    def averages(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {name: {key: value / self.counts[name] for key, value in totals.items()} for name, totals in self.totals.items()}
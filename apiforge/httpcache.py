@@ -0,0 +1,102 @@
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Mapping
+
+# Conditional GET cache: the ETag/Last-Modified of every cacheable response is stored with its parsed body and
+# the validators it passed. Later requests send If-None-Match/If-Modified-Since, and a 304 reuses the body and
+# skips validation it already passed instead of downloading, decoding and validating the body again.
+CACHE_FILE_VERSION = 1
+
+class CacheEntry:
+    __slots__ = ("etag", "last_modified", "body", "valid", "stored")
+
+    def __init__(self, etag: Optional[str], last_modified: Optional[str], body: Any, valid: Optional[list] = None, stored: Optional[float] = None):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.body = body
+        self.valid = set(valid or ())      # Fingerprints of the ResponseValidators the body passed
+        self.stored = stored or time.time()
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag: headers["If-None-Match"] = self.etag
+        if self.last_modified: headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+class ResponseCache:
+    # Bounded LRU of CacheEntry by request, persisted to path (JSON) on save() when a path is given
+    def __init__(self, path: Optional[str] = None, max_entries: int = 1024):
+        self.path = path
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if path and os.path.exists(path): self._load(path)
+
+    def _load(self, path: str):
+        try:
+            with open(path, "r") as f: data = json.load(f)
+        except (OSError, ValueError) as e:
+            raise RuntimeError(f"Failed to load HTTP cache {path}: {e}")
+        if data.get("version") != CACHE_FILE_VERSION: return    # Written by another version, start empty
+        for key, entry in data.get("entries", {}).items():
+            self._entries[key] = CacheEntry(entry.get("etag"), entry.get("last_modified"), entry.get("body"), entry.get("valid"), entry.get("stored"))
+        while len(self._entries) > self.max_entries: self._entries.popitem(last=False)
+
+    @staticmethod
+    def key(url: str, params: Optional[Mapping[str, Any]], headers: Optional[Mapping[str, Any]]) -> str:
+        # Request headers are part of the key, responses for different credentials are kept apart
+        canonical = json.dumps([url, sorted((str(name), str(value)) for name, value in (params or {}).items()),
+                                sorted((str(name).lower(), str(value)) for name, value in (headers or {}).items())])
+        return hashlib.sha1(canonical.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None: self._entries.move_to_end(key)
+            return entry
+
+    def store(self, key: str, headers: Mapping[str, str], body: Any) -> Optional[CacheEntry]:
+        # Only responses the server can revalidate are kept, no-store responses never
+        etag, last_modified = headers.get("ETag"), headers.get("Last-Modified")
+        if not (etag or last_modified) or "no-store" in (headers.get("Cache-Control") or ""):
+            with self._lock: self._entries.pop(key, None)
+            return None
+        # The entry keeps its own copy, the caller is free to change the body it got back
+        entry = CacheEntry(etag, last_modified, copy.deepcopy(body))
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries: self._entries.popitem(last=False)
+        return entry
+
+    def record(self, hit: bool):
+        with self._lock:
+            if hit: self.hits += 1
+            else: self.misses += 1
+
+    def mark_valid(self, entry: CacheEntry, fingerprint: str):
+        with self._lock: entry.valid.add(fingerprint)
+
+    def info(self) -> Dict[str, Any]:
+        with self._lock: return {"entries": len(self._entries), "max_entries": self.max_entries, "hits": self.hits, "misses": self.misses, "path": self.path}
+
+    def clear(self):
+        with self._lock: self._entries.clear()
+
+    def save(self):
+        if not self.path: return
+        with self._lock:
+            entries = {key: {"etag": entry.etag, "last_modified": entry.last_modified, "body": entry.body, "valid": sorted(entry.valid), "stored": entry.stored}
+                       for key, entry in self._entries.items()}
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f: json.dump({"version": CACHE_FILE_VERSION, "entries": entries}, f)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,174 @@
+import math
+import threading
+import time
+import httpx
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List, Iterator, Tuple
+from .retry import RetriesExhausted
+
+# Failure classes run_test distinguishes before wrapping them in RuntimeError
+ERROR_KINDS = ("RetriesExhausted", "RequestException", "ValueError", "AssertionError")
+
+def classify_error(error: BaseException) -> str:
+    cause = error.__cause__ or error
+    if isinstance(cause, RetriesExhausted): return "RetriesExhausted"
+    if isinstance(cause, (requests.RequestException, httpx.HTTPError)): return "RequestException"
+    if isinstance(cause, ValueError): return "ValueError"
+    if isinstance(cause, AssertionError): return "AssertionError"
+    return type(cause).__name__
+
+class LatencyHistogram:
+    # HDR-style log-linear buckets over microseconds: values below 2 * SUB_BUCKETS are exact, above that
+    # every power of two is split into SUB_BUCKETS linear buckets (~1.5% relative error), memory is fixed
+    SUB_BUCKET_BITS = 6
+    SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+    MAX_VALUE_BITS = 37     # ~38 hours in microseconds, larger values are clamped
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = [0] * self._index((1 << self.MAX_VALUE_BITS) - 1) + [0]
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    @classmethod
+    def _index(cls, value: int) -> int:
+        if value < 2 * cls.SUB_BUCKETS: return value
+        shift = value.bit_length() - cls.SUB_BUCKET_BITS - 1
+        return 2 * cls.SUB_BUCKETS + (shift - 1) * cls.SUB_BUCKETS + ((value >> shift) - cls.SUB_BUCKETS)
+
+    @classmethod
+    def _upper_value(cls, index: int) -> int:
+        # Highest value that maps to the bucket at index
+        if index < 2 * cls.SUB_BUCKETS: return index
+        shift = (index - 2 * cls.SUB_BUCKETS) // cls.SUB_BUCKETS + 1
+        sub_bucket = (index - 2 * cls.SUB_BUCKETS) % cls.SUB_BUCKETS + cls.SUB_BUCKETS
+        return ((sub_bucket + 1) << shift) - 1
+
+    def record(self, seconds: float):
+        value = min(max(int(seconds * 1_000_000), 0), (1 << self.MAX_VALUE_BITS) - 1)
+        index = self._index(value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total += value
+            self.min = value if self.min is None else min(self.min, value)
+            self.max = max(self.max, value)
+
+    def merge(self, other: "LatencyHistogram"):
+        with self._lock:
+            for index, count in enumerate(other.counts):
+                if count: self.counts[index] += count
+            self.count += other.count
+            self.total += other.total
+            if other.min is not None: self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = max(self.max, other.max)
+
+    def percentile(self, percent: float) -> float:
+        # Returns milliseconds
+        if not self.count: return 0.0
+        target = max(math.ceil(self.count * percent / 100), 1)
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target: return min(self._upper_value(index), self.max) / 1000
+        return self.max / 1000
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "min_ms": (self.min or 0) / 1000,
+            "mean_ms": (self.total / self.count / 1000) if self.count else 0.0,
+            "p50_ms": self.percentile(50),
+            "p90_ms": self.percentile(90),
+            "p99_ms": self.percentile(99),
+            "max_ms": self.max / 1000
+        }
+
+class EndpointStats:
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.errors: Dict[str, int] = {kind: 0 for kind in ERROR_KINDS}
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, error_kind: Optional[str] = None):
+        self.latency.record(seconds)
+        if error_kind:
+            with self._lock: self.errors[error_kind] = self.errors.get(error_kind, 0) + 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        requests_sent = self.latency.count
+        error_count = sum(self.errors.values())
+        return {
+            "requests": requests_sent,
+            "errors": dict(self.errors),
+            "error_rate": error_count / requests_sent if requests_sent else 0.0,
+            "latency": self.latency.to_dict()
+        }
+
+def open_loop_schedule(rps: float, duration: float, ramp: float = 0.0) -> Iterator[float]:
+    # Offsets (seconds from start) at which requests are due. The rate grows linearly from 0 to rps over
+    # the ramp, so N(t) = rps * t^2 / (2 * ramp) requests are due by t, and stays at rps until duration
+    if rps <= 0 or duration <= 0: return
+    ramp = min(max(ramp, 0.0), duration)
+    ramp_requests = rps * ramp / 2
+    index = 0
+    while True:
+        if index < ramp_requests: offset = math.sqrt(2 * ramp * index / rps)
+        else: offset = ramp + (index - ramp_requests) / rps
+        if offset >= duration: return
+        yield offset
+        index += 1
+
+class LoadRunner:
+    def __init__(self, forge, max_workers: Optional[int] = None):
+        self.forge = forge
+        self.max_workers = max_workers or forge.max_workers
+
+    @staticmethod
+    def endpoint_name(endpoint: Dict[str, Any]) -> str:
+        return f"{endpoint['method']} {endpoint['path']}"
+
+    def _fire(self, kwargs: Dict[str, Any], stats: EndpointStats, total: EndpointStats, due: float):
+        error_kind = None
+        try:
+            self.forge.run_test(**kwargs)
+        except RuntimeError as e:
+            error_kind = classify_error(e)
+        # Latency is measured from when the request was due, not when a worker picked it up, so queueing
+        # behind a saturated pool shows up in the percentiles instead of being silently omitted
+        latency = time.perf_counter() - due
+        stats.record(latency, error_kind)
+        total.record(latency, error_kind)
+
+    def run(self, endpoints: List[Dict[str, Any]], rps: float, duration: float, ramp: float = 0.0) -> Dict[str, Any]:
+        if not endpoints: raise RuntimeError("No endpoints to run a load test against")
+        prepared: List[Tuple[str, Dict[str, Any]]] = [(self.endpoint_name(e), self.forge._test_kwargs(e)) for e in endpoints]
+        stats = {name: EndpointStats() for name, _ in prepared}
+        total = EndpointStats()
+        scheduled = 0
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for offset in open_loop_schedule(rps, duration, ramp):
+                due = start + offset
+                delay = due - time.perf_counter()
+                if delay > 0: time.sleep(delay)
+                name, kwargs = prepared[scheduled % len(prepared)]
+                executor.submit(self._fire, kwargs, stats[name], total, due)
+                scheduled += 1
+        elapsed = time.perf_counter() - start
+        summary = total.to_dict()
+        return {
+            "target_rps": rps,
+            "duration": duration,
+            "ramp": ramp,
+            "elapsed": elapsed,
+            "requests": scheduled,
+            "achieved_rps": total.latency.count / elapsed if elapsed else 0.0,
+            "errors": summary["errors"],
+            "error_rate": summary["error_rate"],
+            "latency": summary["latency"],
+            "endpoints": {name: endpoint_stats.to_dict() for name, endpoint_stats in stats.items()}
+        }
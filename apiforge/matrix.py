@@ -0,0 +1,147 @@
+import hashlib
+import itertools
+import json
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Test cases derived from an operation's schemas. Only values the schema accepts are generated, so every case
+# keeps the operation's expected status. Everything is produced lazily and repeated cases are dropped.
+_STRING_FORMATS = {"date-time": "2024-01-01T00:00:00Z", "date": "2024-01-01", "email": "user@example.com", "uuid": "00000000-0000-0000-0000-000000000000",
+                   "uri": "https://example.com"}
+_DEFAULT_LENGTH = 8
+
+def _unique(values: Iterable[Any]) -> Iterator[Any]:
+    seen = set()
+    for value in values:
+        key = json.dumps(value, sort_keys=True, default=str)
+        if key in seen: continue
+        seen.add(key)
+        yield value
+
+def _numbers(schema: Dict[str, Any], integer: bool) -> Iterator[Any]:
+    step = 1 if integer else 0.5
+    low, high = schema.get("minimum"), schema.get("maximum")
+    # OAS 3.0 uses boolean exclusive flags, 3.1 numeric bounds
+    if isinstance(schema.get("exclusiveMinimum"), (int, float)) and not isinstance(schema.get("exclusiveMinimum"), bool): low = schema["exclusiveMinimum"] + step
+    elif schema.get("exclusiveMinimum") is True and low is not None: low += step
+    if isinstance(schema.get("exclusiveMaximum"), (int, float)) and not isinstance(schema.get("exclusiveMaximum"), bool): high = schema["exclusiveMaximum"] - step
+    elif schema.get("exclusiveMaximum") is True and high is not None: high -= step
+    if low is not None: yield low
+    if high is not None: yield high
+    if low is not None and high is not None: yield (low + high) // 2 if integer else (low + high) / 2
+    if low is None and high is None: yield from (0, 1, -1) if integer else (0.0, 1.5, -1.5)
+    elif low is None: yield high - 1
+    elif high is None: yield low + 1
+
+def _strings(schema: Dict[str, Any]) -> Iterator[str]:
+    if schema.get("format") in _STRING_FORMATS:
+        yield _STRING_FORMATS[schema["format"]]
+        return
+    low, high = schema.get("minLength", 0), schema.get("maxLength")
+    yield "a" * max(low, 1) if high is None or high >= 1 else ""
+    if low == 0: yield ""
+    yield "a" * (high if high is not None else max(low, _DEFAULT_LENGTH))
+
+def schema_values(schema: Optional[Dict[str, Any]], depth: int = 0) -> Iterator[Any]:
+    # Distinct valid values of a resolved schema: example and default first, then enum members or boundaries
+    if not schema or depth > 4: return
+    values = []
+    for key in ("example", "default", "const"):
+        if key in schema: values.append(schema[key])
+    values.extend(schema.get("examples") or [])
+    if schema.get("enum"):
+        yield from _unique(values + list(schema["enum"]))
+        return
+    kind = schema.get("type")
+    kinds = kind if isinstance(kind, list) else [kind]
+    if schema.get("nullable") or "null" in kinds: values.append(None)
+    for kind in kinds:
+        if kind == "integer": values = itertools.chain(values, _numbers(schema, True))
+        elif kind == "number": values = itertools.chain(values, _numbers(schema, False))
+        elif kind == "string": values = itertools.chain(values, _strings(schema))
+        elif kind == "boolean": values = itertools.chain(values, (True, False))
+        elif kind == "array": values = itertools.chain(values, _arrays(schema, depth))
+        elif kind == "object" or (kind is None and "properties" in schema): values = itertools.chain(values, [base_object(schema, depth)])
+    yield from _unique(values)
+
+def _arrays(schema: Dict[str, Any], depth: int) -> Iterator[List[Any]]:
+    item = next(schema_values(schema.get("items"), depth + 1), None)
+    low, high = schema.get("minItems", 0), schema.get("maxItems")
+    yield [item] * low
+    yield [item] * max(low, 1) if high is None else [item] * high
+
+def base_object(schema: Dict[str, Any], depth: int = 0) -> Dict[str, Any]:
+    # Every property with its first value, the payload the other cases are varied from
+    return {name: next(schema_values(prop, depth + 1), None) for name, prop in (schema.get("properties") or {}).items()}
+
+def _subsets(items: Sequence[str], limit: Optional[int]) -> Iterator[Tuple[str, ...]]:
+    # Smallest subsets first, so a limit still covers "none" and each single optional field
+    count = 0
+    for size in range(len(items) + 1):
+        for subset in itertools.combinations(items, size):
+            if limit is not None and count >= limit: return
+            count += 1
+            yield subset
+
+def payload_cases(schema: Optional[Dict[str, Any]], base: Optional[Dict[str, Any]] = None, exclude: Iterable[str] = (),
+                  optional_limit: Optional[int] = 64) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    # (label, payload): the base payload, combinations of optional fields on top of the required ones, then one
+    # field at a time through its values with the rest of the base payload unchanged
+    properties = {name: prop for name, prop in ((schema or {}).get("properties") or {}).items() if name not in exclude}
+    base = dict(base) if base else {name: value for name, value in base_object({"properties": properties}).items()}
+    yield "base", base
+    if not properties: return
+    required = [name for name in ((schema or {}).get("required") or []) if name in properties]
+    optional = [name for name in properties if name not in required]
+    defaults = base_object({"properties": properties})
+    for subset in _subsets(optional, optional_limit):
+        fields = required + list(subset)
+        yield f"fields={','.join(fields) or '-'}", {name: base.get(name, defaults[name]) for name in fields}
+    for name, prop in properties.items():
+        for value in schema_values(prop):
+            yield f"{name}={json.dumps(value, default=str)[:40]}", {**base, name: value}
+
+def _product(choices: List[Tuple[str, Iterable[Any]]]) -> Iterator[Dict[str, Any]]:
+    # itertools.product materialises its inputs, this re-iterates them instead so ranges stay lazy
+    if not choices:
+        yield {}
+        return
+    (name, values), rest = choices[0], choices[1:]
+    for value in values:
+        for combination in _product(rest): yield {name: value, **combination}
+
+def param_cases(params: Dict[str, Any], schemas: Optional[Dict[str, Dict[str, Any]]] = None,
+                ranges: Optional[Dict[str, Iterable[Any]]] = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    # (label, params): every combination of the given ranges (re-iterable, e.g. range(1, 100001)), then one
+    # parameter at a time through its schema values
+    ranges = {name: values for name, values in (ranges or {}).items() if name in params}
+    yield "base", dict(params)
+    for combination in _product(list(ranges.items())):
+        yield ",".join(f"{name}={value}" for name, value in combination.items()), {**params, **combination}
+    for name, schema in (schemas or {}).items():
+        if name in ranges: continue
+        for value in schema_values(schema):
+            yield f"{name}={json.dumps(value, default=str)[:40]}", {**params, name: value}
+
+def expand(endpoint: Dict[str, Any], ranges: Optional[Dict[str, Iterable[Any]]] = None, optional_limit: Optional[int] = 64,
+           seen: Optional[set] = None) -> Iterator[Dict[str, Any]]:
+    # Cases of one endpoint compiled with schemas=True, labelled with "case". seen holds 8 byte digests of the
+    # cases so far, shared between endpoints it dedupes across the whole run at a small fixed cost per case.
+    seen = seen if seen is not None else set()
+    template = {key: value for key, value in endpoint.items() if key not in ("param_schemas", "payload_schema")}
+    # PUT payloads leave the id to the path, as the compiled payload does
+    exclude = ("id",) if str(endpoint["method"]).upper() == "PUT" else ()
+
+    def emit(label: str, params: Dict[str, Any], payload: Any) -> Optional[Dict[str, Any]]:
+        key = hashlib.blake2b(json.dumps([endpoint["method"], endpoint["path"], params, payload], sort_keys=True, default=str).encode(), digest_size=8).digest()
+        if key in seen: return None
+        seen.add(key)
+        return {**template, "params": params, "payload": payload, "case": label}
+
+    params = endpoint.get("params") or {}
+    for label, case_params in param_cases(params, endpoint.get("param_schemas"), ranges):
+        case = emit(f"params:{label}", case_params, endpoint.get("payload"))
+        if case: yield case
+    if endpoint.get("payload_schema") or endpoint.get("payload"):
+        for label, payload in payload_cases(endpoint.get("payload_schema"), endpoint.get("payload"), exclude, optional_limit):
+            case = emit(f"payload:{label}", dict(params), payload)
+            if case: yield case
@@ -0,0 +1,182 @@
+import bisect
+import os
+import threading
+import weakref
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+from .hooks import Hook
+from .load import classify_error
+
+# Per-endpoint request counters and latency histograms in the OpenMetrics text format, for scraping APIForge runs
+# used as a synthetic monitor. Every thread records into its own shard without locking, shards are only merged
+# and formatted when the metrics are rendered. A thread's shard is folded into a base shard once the thread exits,
+# so runs starting fresh worker threads don't grow the collector.
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+# Upper bounds in seconds of the latency histogram buckets, +Inf is implied
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+class _Shard:
+    # One thread's counts. Only the owning thread writes, rendering reads them from another thread which at worst
+    # misses the request in flight.
+    __slots__ = ("requests", "retries", "latency", "cache")
+
+    def __init__(self):
+        self.requests: Dict[Tuple[str, str, str, str], int] = {}    # (method, endpoint, outcome, error)
+        self.retries: Dict[Tuple[str, str], int] = {}
+        self.latency: Dict[Tuple[str, str], List[float]] = {}       # bucket counts, then sum and count
+        self.cache: Dict[str, int] = {}
+
+    def merge(self, other: "_Shard"):
+        for key, count in list(other.requests.items()): self.requests[key] = self.requests.get(key, 0) + count
+        for key, count in list(other.retries.items()): self.retries[key] = self.retries.get(key, 0) + count
+        for key, count in list(other.cache.items()): self.cache[key] = self.cache.get(key, 0) + count
+        for key, counts in list(other.latency.items()):
+            merged = self.latency.get(key)
+            if merged is None: merged = self.latency[key] = [0] * len(counts)
+            for index, count in enumerate(list(counts)): merged[index] += count
+
+class _ShardOwner:
+    # Only referenced from the thread-local, it goes away with the thread and retires the thread's shard
+    __slots__ = ("shard", "__weakref__")
+
+    def __init__(self, shard: _Shard):
+        self.shard = shard
+
+class MetricsCollector(Hook):
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS, prefix: str = "apiforge"):
+        self.buckets = tuple(sorted(buckets))
+        self.prefix = prefix
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        self._base = _Shard()            # Counts of threads that exited
+        self._lock = threading.Lock()    # Only taken when a thread records for the first time or exits and when rendering
+
+    def _shard(self) -> _Shard:
+        owner = getattr(self._local, "owner", None)
+        if owner is None:
+            owner = self._local.owner = _ShardOwner(_Shard())
+            with self._lock: self._shards.append(owner.shard)
+            weakref.finalize(owner, self._retire, owner.shard)
+        return owner.shard
+
+    def _retire(self, shard: _Shard):
+        with self._lock:
+            self._base.merge(shard)
+            self._shards.remove(shard)
+
+    def after_response(self, context, result, error, timings):
+        shard = self._shard()
+        endpoint = (context["method"], context["endpoint"])
+        key = endpoint + (("fail", classify_error(error)) if error is not None else ("pass", ""))
+        shard.requests[key] = shard.requests.get(key, 0) + 1
+        latency = shard.latency.get(endpoint)
+        if latency is None: latency = shard.latency[endpoint] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+        seconds = timings.get("total", 0.0)
+        latency[bisect.bisect_left(self.buckets, seconds)] += 1
+        latency[-2] += seconds
+        latency[-1] += 1
+        cache = context.get("cache")
+        if cache: shard.cache[cache] = shard.cache.get(cache, 0) + 1
+
+    def on_retry(self, context, attempt, delay, error):
+        shard = self._shard()
+        endpoint = (context["method"], context["endpoint"])
+        shard.retries[endpoint] = shard.retries.get(endpoint, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        # Every shard merged: requests and retries counts, latency as cumulative bucket counts with sum and count
+        merged = _Shard()
+        with self._lock:
+            merged.merge(self._base)
+            shards = list(self._shards)
+        for shard in shards: merged.merge(shard)
+        for counts in merged.latency.values():
+            for index in range(1, len(self.buckets) + 1): counts[index] += counts[index - 1]
+        return {"requests": merged.requests, "retries": merged.retries, "latency": merged.latency, "cache": merged.cache}
+
+    def render(self) -> str:
+        snapshot = self.snapshot()
+        prefix = self.prefix
+        lines = [f"# TYPE {prefix}_requests counter", f"# HELP {prefix}_requests Finished requests by endpoint and outcome, error is the failure class."]
+        for (method, endpoint, outcome, error), count in sorted(snapshot["requests"].items()):
+            lines.append(f"{prefix}_requests_total{_labels(method=method, endpoint=endpoint, outcome=outcome, error=error)} {count}")
+        lines += [f"# TYPE {prefix}_retries counter", f"# HELP {prefix}_retries Retried attempts by endpoint."]
+        for (method, endpoint), count in sorted(snapshot["retries"].items()):
+            lines.append(f"{prefix}_retries_total{_labels(method=method, endpoint=endpoint)} {count}")
+        lines += [f"# TYPE {prefix}_request_duration_seconds histogram", f"# HELP {prefix}_request_duration_seconds Duration of the final attempt of each request."]
+        for (method, endpoint), counts in sorted(snapshot["latency"].items()):
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                lines.append(f"{prefix}_request_duration_seconds_bucket{_labels(method=method, endpoint=endpoint, le=_number(bound))} {count}")
+            lines.append(f"{prefix}_request_duration_seconds_count{_labels(method=method, endpoint=endpoint)} {counts[-1]}")
+            lines.append(f"{prefix}_request_duration_seconds_sum{_labels(method=method, endpoint=endpoint)} {_number(counts[-2])}")
+        if snapshot["cache"]:
+            lines += [f"# TYPE {prefix}_http_cache_requests counter", f"# HELP {prefix}_http_cache_requests Conditional GETs by result."]
+            for result, count in sorted(snapshot["cache"].items()):
+                lines.append(f"{prefix}_http_cache_requests_total{_labels(result=result)} {count}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str):
+        # Atomic, a scraper reading the file (e.g. node_exporter's textfile collector) never sees half of it
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f: f.write(self.render())
+        os.replace(tmp_path, path)
+
+    def serve(self, host: str = "127.0.0.1", port: int = 9464) -> "MetricsServer":
+        server = MetricsServer(self, host, port)
+        server.start()
+        return server
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(**labels: str) -> str:
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+def _number(value: float) -> str:
+    if value == float("inf"): return "+Inf"
+    return repr(float(value))
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = self.server.collector.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+class MetricsServer:
+    # /metrics of a MetricsCollector over HTTP, served from a daemon thread
+    def __init__(self, collector: MetricsCollector, host: str = "127.0.0.1", port: int = 9464):
+        self._server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        self._server.daemon_threads = True
+        self._server.collector = collector
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="APIForge-metrics", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        if self._thread: self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "MetricsServer":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,149 @@
+import threading
+import time
+from typing import Dict, Any, Optional
+
+THROTTLE_STATUSES = (429, 503)
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(rate, 1.0)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> float:
+        # Takes a token and returns 0, or returns how long to wait before one is available
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until: return self._paused_until - now
+            self._tokens = min(self._tokens + (now - self._updated) * self.rate, self.burst)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def pause(self, seconds: float):
+        # Used for Retry-After, nothing is sent to the host until the pause expires
+        with self._lock: self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+class AdaptiveConcurrency:
+    # AIMD: every successful request grows the limit by increase / limit (about +increase per round trip
+    # of the whole window), a throttled response or a latency spike multiplies it by decrease, at most
+    # once per baseline latency so one burst of 429s only counts as a single congestion signal
+    def __init__(self, initial: int = 4, min_limit: int = 1, max_limit: int = 100, increase: float = 1.0, decrease: float = 0.5, latency_tolerance: float = 2.0):
+        self.min_limit = min_limit
+        self.max_limit = max(max_limit, min_limit)
+        self.limit = float(min(max(initial, min_limit), self.max_limit))
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.baseline: Optional[float] = None
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    def try_acquire(self) -> bool:
+        with self._condition:
+            if self.in_flight >= int(self.limit): return False
+            self.in_flight += 1
+            return True
+
+    def acquire(self):
+        with self._condition:
+            while self.in_flight >= int(self.limit): self._condition.wait()
+            self.in_flight += 1
+
+    def release(self, latency: Optional[float] = None, throttled: bool = False):
+        with self._condition:
+            self.in_flight = max(self.in_flight - 1, 0)
+            if latency is not None or throttled: self._update(latency, throttled)
+            self._condition.notify_all()
+
+    def _update(self, latency: Optional[float], throttled: bool):
+        now = time.monotonic()
+        spike = latency is not None and self.baseline is not None and latency > self.baseline * self.latency_tolerance
+        if throttled or spike:
+            if now - self._last_decrease >= (self.baseline or 0.0):
+                self.limit = max(self.limit * self.decrease, float(self.min_limit))
+                self._last_decrease = now
+            return
+        # The baseline follows the fastest recent latencies and drifts slowly towards slower ones
+        if self.baseline is None or latency < self.baseline: self.baseline = latency
+        else: self.baseline += (latency - self.baseline) * 0.01
+        self.limit = min(self.limit + self.increase / max(self.limit, 1.0), float(self.max_limit))
+
+class HostLimiter:
+    def __init__(self, rps: Optional[float] = None, burst: Optional[float] = None, concurrency: Optional[AdaptiveConcurrency] = None):
+        self.bucket = TokenBucket(rps, burst) if rps else None
+        self.concurrency = concurrency
+
+    def try_acquire(self) -> float:
+        # Non-blocking variant for the async engine, returns 0 once both a slot and a token were taken
+        if self.concurrency and not self.concurrency.try_acquire(): return 0.005
+        wait = self.bucket.try_acquire() if self.bucket else 0.0
+        if wait and self.concurrency: self.concurrency.release()
+        return wait
+
+    def acquire(self):
+        if self.concurrency: self.concurrency.acquire()
+        while self.bucket:
+            wait = self.bucket.try_acquire()
+            if not wait: break
+            time.sleep(wait)
+
+    def release(self, latency: Optional[float], status_code: Optional[int] = None, retry_after: Optional[float] = None):
+        throttled = status_code in THROTTLE_STATUSES
+        if throttled and retry_after and self.bucket: self.bucket.pause(retry_after)
+        if self.concurrency: self.concurrency.release(None if throttled else latency, throttled)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "rps": self.bucket.rate if self.bucket else None,
+            "concurrency_limit": int(self.concurrency.limit) if self.concurrency else None,
+            "in_flight": self.concurrency.in_flight if self.concurrency else None,
+            "baseline_latency_ms": self.concurrency.baseline * 1000 if self.concurrency and self.concurrency.baseline is not None else None
+        }
+
+class RateLimiter:
+    # Per-host limiters built from the rate_limit section of a config, e.g.
+    #   rate_limit: {rps: 10, burst: 20, adaptive: true, min_concurrency: 1, max_concurrency: 16}
+    def __init__(self, settings: Dict[str, Any], max_workers: int = 10):
+        self.settings = settings
+        self.max_workers = max_workers
+        self._hosts: Dict[str, HostLimiter] = {}
+        self._lock = threading.Lock()
+
+    def _build(self) -> HostLimiter:
+        concurrency = None
+        if self.settings.get("adaptive"):
+            max_limit = self.settings.get("max_concurrency", self.max_workers)
+            concurrency = AdaptiveConcurrency(
+                initial=self.settings.get("initial_concurrency", max(max_limit // 4, 1)),
+                min_limit=self.settings.get("min_concurrency", 1),
+                max_limit=max_limit,
+                increase=self.settings.get("increase", 1.0),
+                decrease=self.settings.get("decrease", 0.5),
+                latency_tolerance=self.settings.get("latency_tolerance", 2.0)
+            )
+        return HostLimiter(rps=self.settings.get("rps"), burst=self.settings.get("burst"), concurrency=concurrency)
+
+    def host(self, host: str) -> HostLimiter:
+        with self._lock:
+            limiter = self._hosts.get(host)
+            if limiter is None: limiter = self._hosts[host] = self._build()
+            return limiter
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock: hosts = dict(self._hosts)
+        return {host: limiter.snapshot() for host, limiter in hosts.items()}
+
+def resolve_rate_limit(section: Optional[Dict[str, Any]], env: str) -> Optional[Dict[str, Any]]:
+    # Settings may carry per-environment overrides: {rps: 10, environments: {staging: {rps: 2}}}
+    if not section: return None
+    settings = {key: value for key, value in section.items() if key != "environments"}
+    for name, overrides in (section.get("environments") or {}).items():
+        if str(name).lower() == str(env).lower(): settings.update(overrides or {})
+    return settings
@@ -1,31 +1,99 @@
+import atexit
 import logging
+import os
 import threading
-from typing import Dict, Any
+import time
+from typing import Dict, Any, List, Optional
 from colorama import Fore, Style
+from .sink import BackgroundSink, JSONLWriter, JUnitWriter
+
+class _LogWriter:
+    # Formats log lines on the sink thread so building the message never happens on a worker
+    def __init__(self, reporter: "Reporter"):
+        self.reporter = reporter
+
+    def write(self, records: List[Dict[str, Any]]):
+        logger = self.reporter.logger
+        for record in records:
+            kind = record["type"]
+            if kind == "generic":
+                if record["method"]: logger.info(f"[INFO] {record['method']} -> {record['output']}")
+                else: logger.info(f"[INFO] {record['output']}")
+            elif kind == "result" or kind == "util":
+                success = record["success"]
+                if kind == "result":
+                    if success: self.reporter.passed += 1
+                    else: self.reporter.failed += 1
+                status = "PASS" if success else "FAIL"
+                color = "\033[32m" if success else "\033[31m"  
+                reset = "\033[0m"  
+                if kind == "result":
+                    logger.info(f"({record['thread']}) Test {record['method']} {record['endpoint']} [{record['params']}]: {status} - Result: {color}{record['result']}{reset}")
+                else:
+                    logger.info(f"[TEST_UTIL] payload: {record['test']}: {status} - Result: {color}{record['result']}{reset}")
+            elif kind == "error":
+                logger.info(f"{Fore.RED}[ERROR] {Style.RESET_ALL} {record['method']}: {record['error']}")
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
 
 class Reporter:
-    def __init__(self, output_dir: str = "reports"):
+    def __init__(self, output_dir: str = "reports", write_results: bool = True, junit: bool = False, include_responses: bool = False,
+                 queue_size: int = 10000, batch_size: int = 500, flush_interval: float = 1.0):
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger("APIForge")
         self.output_dir = output_dir
-        self.results = []
+        # Totals are counted on the sink thread, call flush() before reading them
+        self.passed = 0
+        self.failed = 0
+        handlers: List[Any] = [_LogWriter(self)]
+        if write_results: handlers.append(JSONLWriter(os.path.join(output_dir, "results.jsonl"), include_responses=include_responses))
+        if junit: handlers.append(JUnitWriter(os.path.join(output_dir, "junit.xml")))
+        self._sink = BackgroundSink(handlers, queue_size=queue_size, batch_size=batch_size, flush_interval=flush_interval)
+        atexit.register(self.close)
 
     def log_generic_output(self, output: Any, method: str = "null_method"):
-        if method: self.logger.info(f"[INFO] {method} -> {output}")
-        else: self.logger.info(f"[INFO] {output}")
+        self._sink.submit({"type": "generic", "method": method, "output": output})
+
+    @staticmethod
+    def result_record(test: Dict[str, Any], result: Any, success: bool, timings: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        return {
+            "type": "result",
+            "timestamp": time.time(),
+            "thread": threading.current_thread().name,
+            "method": test["method"],
+            "endpoint": test["endpoint"],
+            "params": test["params"],
+            "success": success,
+            "error": None if success else str(result),
+            "timings": timings,
+            "result": result
+        }
 
-    def log_api_result(self, test: Dict[str, Any], result: Any, success: bool):
-        status = "PASS" if success else "FAIL"
-        color = "\033[32m" if success else "\033[31m"  
-        reset = "\033[0m"  
-        thread_name = threading.current_thread().name
-        self.logger.info(f"({thread_name}) Test {test['method']} {test['endpoint']} [{test['params']}]: {status} - Result: {color}{result}{reset}")
+    def log_api_result(self, test: Dict[str, Any], result: Any, success: bool, timings: Optional[Dict[str, float]] = None):
+        self._sink.submit(self.result_record(test, result, success, timings))
+
+    def log_record(self, record: Dict[str, Any]):
+        # Result records built elsewhere, e.g. by shard worker processes or read back from results.jsonl
+        self._sink.submit(record)
 
     def log_util_response(self, test: Dict[str, Any], result: Any, success: bool):
-        status = "PASS" if success else "FAIL"
-        color = "\033[32m" if success else "\033[31m"  
-        reset = "\033[0m"  
-        self.logger.info(f"[TEST_UTIL] payload: {test}: {status} - Result: {color}{result}{reset}")
+        self._sink.submit({"type": "util", "test": test, "result": result, "success": success})
 
     def log_error(self, method: str, error: str):
-        self.logger.info(f"{Fore.RED}[ERROR] {Style.RESET_ALL} {method}: {error}")
\ No newline at end of file
+        self._sink.submit({"type": "error", "method": method, "error": error})
+
+    def summary(self) -> Dict[str, int]:
+        self.flush()
+        return {"passed": self.passed, "failed": self.failed}
+
+    def flush(self, timeout: float = None):
+        self._sink.flush(timeout)
+
+    def close(self):
+        # The atexit registration keeps the reporter (and its open files) alive, a closed one doesn't need it
+        atexit.unregister(self.close)
+        self._sink.close()
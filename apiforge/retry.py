@@ -0,0 +1,123 @@
+import random
+import threading
+import time
+import httpx
+import requests
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+
+class UnexpectedStatus(AssertionError):
+    # Raised for a status code other than the expected one, keeps what the retry policy needs from the response
+    def __init__(self, message: str, status_code: int, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+class RetryLater(Exception):
+    # Raised by a single attempt that should be retried after delay seconds, the caller decides how to wait
+    def __init__(self, delay: float, error: Exception):
+        super().__init__(f"Retrying in {delay:.2f}s after: {error}")
+        self.delay = delay
+        self.error = error
+
+class RetriesExhausted(Exception):
+    def __init__(self, last_exception: Exception, attempts: int):
+        super().__init__(str(last_exception))
+        self.last_exception = last_exception
+        self.attempts = attempts
+
+class RetryState:
+    # Attempts made so far for one logical request, queued_at is set (perf_counter) when an attempt is
+    # handed to an executor so the time it waits for a worker can be measured
+    def __init__(self):
+        self.attempt = 0
+        self.started = time.monotonic()
+        self.queued_at: Optional[float] = None
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    # Retry-After is either delay-seconds or an HTTP-date
+    if not value: return None
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+class RetryBudget:
+    # Per-host token bucket bounding retries to a fraction of requests: every first attempt deposits ratio
+    # tokens, every retry spends one, and min_per_second tokens trickle in so low-traffic hosts can still retry
+    def __init__(self, ratio: float = 0.2, min_per_second: float = 10.0, max_tokens: float = 100.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max(max_tokens, min_per_second)
+        self._hosts: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def _balance(self, host: str, now: float) -> float:
+        tokens, updated = self._hosts.get(host, (self.min_per_second, now))
+        return min(tokens + (now - updated) * self.min_per_second, self.max_tokens)
+
+    def record_request(self, host: str):
+        with self._lock:
+            now = time.monotonic()
+            self._hosts[host] = (min(self._balance(host, now) + self.ratio, self.max_tokens), now)
+
+    def try_spend(self, host: str) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            tokens = self._balance(host, now)
+            if tokens < 1:
+                self._hosts[host] = (tokens, now)
+                return False
+            self._hosts[host] = (tokens - 1, now)
+            return True
+
+    def tokens(self, host: str) -> float:
+        with self._lock: return self._balance(host, time.monotonic())
+
+    def __getstate__(self):
+        # Shipped to shard worker processes without the lock or the parent's balances
+        return {key: value for key, value in self.__dict__.items() if key not in ("_lock", "_hosts")}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+class RetryPolicy:
+    # Exponential backoff with full jitter, Retry-After honoured for retryable status codes
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 10.0, multiplier: float = 2.0,
+                 max_elapsed: float = 15.0, retry_statuses: Tuple[int, ...] = (429, 503), budget: Optional[RetryBudget] = None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.max_elapsed = max_elapsed
+        self.retry_statuses = retry_statuses
+        self.budget = budget if budget is not None else RetryBudget()
+
+    def is_retryable(self, error: Exception) -> bool:
+        if isinstance(error, (requests.ConnectionError, requests.Timeout, httpx.TransportError)): return True
+        return isinstance(error, UnexpectedStatus) and error.status_code in self.retry_statuses
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * self.multiplier ** (attempt - 1)))
+
+    def start_attempt(self, state: RetryState, host: str):
+        state.attempt += 1
+        if state.attempt == 1 and self.budget: self.budget.record_request(host)
+
+    def raise_for_retry(self, error: Exception, state: RetryState, host: str):
+        # Raises RetryLater when the failed attempt should be retried, RetriesExhausted when a retryable
+        # failure can't be retried any more, and returns for errors that are never retried
+        if not self.is_retryable(error): return
+        if state.attempt >= self.max_attempts: raise RetriesExhausted(error, state.attempt) from error
+        delay = self.backoff(state.attempt)
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after is not None: delay = max(delay, retry_after)
+        if time.monotonic() - state.started + delay > self.max_elapsed: raise RetriesExhausted(error, state.attempt) from error
+        if self.budget and not self.budget.try_spend(host): raise RetriesExhausted(error, state.attempt) from error
+        raise RetryLater(delay, error) from error
@@ -0,0 +1,267 @@
+import re
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+_PLACEHOLDER = re.compile(r"\{([^{}]+)\}")
+READ_METHODS = ("GET",)
+
+def endpoint_name(endpoint: Dict[str, Any]) -> str:
+    # Endpoints are referenced by their id, or by "METHOD path" when they don't have one
+    return str(endpoint.get("id") or f"{str(endpoint['method']).upper()} {endpoint['path']}")
+
+def extract(data: Any, path: str) -> Any:
+    # Dotted lookup into a JSON result, e.g. "id", "data.0.id"
+    for part in str(path).split("."):
+        if isinstance(data, dict) and part in data: data = data[part]
+        elif isinstance(data, list) and part.lstrip("-").isdigit() and -len(data) <= int(part) < len(data): data = data[int(part)]
+        else: raise KeyError(f"Cannot capture '{path}' from the response")
+    return data
+
+class DependencyGraph:
+    # Orders the endpoints of a run:
+    #   depends_on: [name, ...]    explicit dependencies on other endpoints
+    #   capture: {var: path}       values taken from a result, endpoints using {var} in their path or params
+    #                              depend on the nearest preceding endpoint capturing var (or the first one)
+    # With order_resources, endpoints on the same collection (first path segment) behave like a readers/writer
+    # lock in config order: a write waits for everything before it, a read only for the previous write.
+    def __init__(self, endpoints: List[Dict[str, Any]], order_resources: bool = True):
+        self.endpoints = endpoints
+        self.names = [endpoint_name(endpoint) for endpoint in endpoints]
+        # requires holds the dependencies an endpoint needs to run at all (explicit and captured values),
+        # dependencies adds the ordering between endpoints on the same collection
+        self.requires: List[Set[int]] = [set() for _ in endpoints]
+        # Producer of every placeholder an endpoint fills from captured values
+        self.sources: List[Dict[str, int]] = [{} for _ in endpoints]
+        self._explicit()
+        self._captured()
+        self.dependencies: List[Set[int]] = [set(required) for required in self.requires]
+        if order_resources: self._resources()
+        self.dependents: List[List[int]] = [[] for _ in endpoints]
+        for index, dependencies in enumerate(self.dependencies):
+            for dependency in dependencies: self.dependents[dependency].append(index)
+        self._check_cycles()
+
+    def _explicit(self):
+        indexes: Dict[str, int] = {}
+        for index, name in enumerate(self.names): indexes.setdefault(name, index)
+        for index, endpoint in enumerate(self.endpoints):
+            depends_on = endpoint.get("depends_on") or []
+            for name in [depends_on] if isinstance(depends_on, str) else depends_on:
+                if name not in indexes: raise RuntimeError(f"Unknown dependency '{name}' of {self.names[index]}")
+                if indexes[name] != index: self.requires[index].add(indexes[name])
+
+    @staticmethod
+    def variables(endpoint: Dict[str, Any]) -> Set[str]:
+        # Placeholders an endpoint needs filled from captured values
+        params = endpoint.get("params") or {}
+        names = {name for name in _PLACEHOLDER.findall(endpoint["path"]) if name not in params}
+        for value in params.values():
+            if isinstance(value, str): names.update(_PLACEHOLDER.findall(value))
+        return names
+
+    def _captured(self):
+        producers: Dict[str, List[int]] = {}
+        for index, endpoint in enumerate(self.endpoints):
+            for var in endpoint.get("capture") or {}: producers.setdefault(var, []).append(index)
+        for index, endpoint in enumerate(self.endpoints):
+            for var in self.variables(endpoint):
+                candidates = [producer for producer in producers.get(var, []) if producer != index]
+                if not candidates: continue
+                preceding = [producer for producer in candidates if producer < index]
+                self.sources[index][var] = preceding[-1] if preceding else candidates[0]
+                self.requires[index].add(self.sources[index][var])
+
+    def _resources(self):
+        last_write: Dict[str, int] = {}
+        reads: Dict[str, List[int]] = {}
+        for index, endpoint in enumerate(self.endpoints):
+            resource = endpoint["path"].lstrip("/").split("/")[0]
+            if resource in last_write: self.dependencies[index].add(last_write[resource])
+            if str(endpoint["method"]).upper() in READ_METHODS:
+                reads.setdefault(resource, []).append(index)
+            else:
+                self.dependencies[index].update(reads.pop(resource, []))
+                last_write[resource] = index
+            self.dependencies[index].discard(index)
+
+    def _check_cycles(self):
+        # Kahn's algorithm, whatever is left over is part of a cycle
+        remaining = [len(dependencies) for dependencies in self.dependencies]
+        ready = [index for index, count in enumerate(remaining) if count == 0]
+        seen = 0
+        while ready:
+            index = ready.pop()
+            seen += 1
+            for dependent in self.dependents[index]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0: ready.append(dependent)
+        if seen != len(self.endpoints):
+            raise RuntimeError(f"Dependency cycle between: {', '.join(self.names[index] for index, count in enumerate(remaining) if count)}")
+
+    def closure(self, indexes: List[int]) -> List[int]:
+        # indexes plus everything they require, transitively
+        selected = set(indexes)
+        stack = list(indexes)
+        while stack:
+            for dependency in self.requires[stack.pop()]:
+                if dependency not in selected:
+                    selected.add(dependency)
+                    stack.append(dependency)
+        return sorted(selected)
+
+    def roots(self) -> List[int]:
+        return [index for index, dependencies in enumerate(self.dependencies) if not dependencies]
+
+class DependencyTracker:
+    # Run-time state for a DependencyGraph: which endpoints finished, failed and what they captured
+    def __init__(self, graph: DependencyGraph):
+        self.graph = graph
+        self.remaining = [len(dependencies) for dependencies in graph.dependencies]
+        self.failed: Dict[int, str] = {}
+        self.captured: Dict[int, Dict[str, Any]] = {}   # Producer index -> captured values
+
+    def complete(self, index: int, result: Any, success: bool) -> List[int]:
+        # Records a finished endpoint and returns the endpoints that became ready
+        if success:
+            for var, path in (self.graph.endpoints[index].get("capture") or {}).items():
+                try: self.captured.setdefault(index, {})[var] = extract(result, path)
+                except KeyError as e:
+                    self.failed[index] = str(e.args[0])
+        else:
+            self.failed[index] = self.graph.names[index]
+        ready = []
+        for dependent in self.graph.dependents[index]:
+            self.remaining[dependent] -= 1
+            if self.remaining[dependent] == 0: ready.append(dependent)
+        return ready
+
+    def blocked_by(self, index: int) -> Optional[str]:
+        # Name of a failed dependency, endpoints behind a failure are skipped rather than run with missing values.
+        # Ordering alone (same collection) doesn't block, a failed POST shouldn't skip the reads after it.
+        for dependency in sorted(self.graph.requires[index]):
+            if dependency in self.failed: return self.graph.names[dependency]
+        return None
+
+    def bind(self, index: int) -> Dict[str, Any]:
+        # Values only come from the endpoint's own producers, another endpoint capturing the same name doesn't leak in
+        captured = {var: self.captured[producer][var] for var, producer in self.graph.sources[index].items() if var in self.captured.get(producer, {})}
+        return bind(self.graph.endpoints[index], captured)
+
+def bind(endpoint: Dict[str, Any], captured: Dict[str, Any]) -> Dict[str, Any]:
+    # Copy of the endpoint with captured values filled into path placeholders and params
+    variables = DependencyGraph.variables(endpoint)
+    if not variables: return endpoint
+    params = dict(endpoint.get("params") or {})
+    for name in _PLACEHOLDER.findall(endpoint["path"]):
+        if name not in params and name in captured: params[name] = captured[name]
+    for key, value in params.items():
+        if isinstance(value, str) and _PLACEHOLDER.search(value):
+            match = _PLACEHOLDER.fullmatch(value)
+            # A value that is only a placeholder keeps the captured type, e.g. an integer id
+            if match and match.group(1) in captured: params[key] = captured[match.group(1)]
+            else: params[key] = _PLACEHOLDER.sub(lambda m: str(captured.get(m.group(1), m.group(0))), value)
+    return {**endpoint, "params": params}
+
+class StreamTracker:
+    # Dependencies for endpoints that arrive one at a time (APIForge.stream_generated_tests). depends_on and captured
+    # values can only refer to endpoints that came earlier; ordering per collection works as in DependencyGraph.
+    # Only unfinished endpoints and the outcomes still referenced are kept, so memory doesn't grow with the
+    # number of endpoints.
+    def __init__(self, order_resources: bool = True):
+        self.order_resources = order_resources
+        self.next_seq = 0
+        self.endpoints: Dict[int, Dict[str, Any]] = {}      # Admitted and not finished yet
+        self.waiting: Dict[int, Set[int]] = {}               # Unfinished endpoints each one waits for
+        self.requires: Dict[int, Set[int]] = {}
+        self.sources: Dict[int, Dict[str, int]] = {}        # Producer of every captured placeholder
+        self.dependents: Dict[int, List[int]] = {}
+        self.latest: Dict[str, int] = {}                     # Name, or $var for a captured variable -> latest seq
+        self.outcomes: Dict[int, Tuple[bool, str]] = {}      # Finished endpoints something may still require
+        self.captured: Dict[int, Dict[str, Any]] = {}        # and the values they captured
+        self.references: Dict[int, int] = {}
+        self.last_write: Dict[str, int] = {}
+        self.reads: Dict[str, Set[int]] = {}
+
+    def _reference(self, seq: int, count: int):
+        self.references[seq] = self.references.get(seq, 0) + count
+        if self.references[seq] <= 0:
+            del self.references[seq]
+            self.outcomes.pop(seq, None)
+            self.captured.pop(seq, None)
+
+    def _remember(self, key: str, seq: int):
+        previous = self.latest.get(key)
+        self.latest[key] = seq
+        self._reference(seq, 1)
+        if previous is not None: self._reference(previous, -1)
+
+    @staticmethod
+    def _resource(endpoint: Dict[str, Any]) -> str:
+        return endpoint["path"].lstrip("/").split("/")[0]
+
+    def admit(self, endpoint: Dict[str, Any]) -> Tuple[int, bool]:
+        # Returns the endpoint's sequence number and whether it can start right away
+        seq = self.next_seq
+        self.next_seq += 1
+        name = endpoint_name(endpoint)
+        requires: Set[int] = set()
+        sources: Dict[str, int] = {}
+        depends_on = endpoint.get("depends_on") or []
+        for dependency in [depends_on] if isinstance(depends_on, str) else depends_on:
+            if dependency not in self.latest: raise RuntimeError(f"Unknown dependency '{dependency}' of {name}, streamed endpoints can only depend on earlier ones")
+            requires.add(self.latest[dependency])
+        for var in DependencyGraph.variables(endpoint):
+            if f"${var}" in self.latest:
+                sources[var] = self.latest[f"${var}"]
+                requires.add(sources[var])
+        for dependency in requires: self._reference(dependency, 1)
+        waiting = {dependency for dependency in requires if dependency in self.endpoints}
+        if self.order_resources:
+            resource = self._resource(endpoint)
+            if resource in self.last_write: waiting.add(self.last_write[resource])
+            if str(endpoint["method"]).upper() in READ_METHODS:
+                self.reads.setdefault(resource, set()).add(seq)
+            else:
+                waiting.update(self.reads.pop(resource, set()))
+                self.last_write[resource] = seq
+        self.endpoints[seq] = endpoint
+        self.requires[seq] = requires
+        self.sources[seq] = sources
+        self.waiting[seq] = waiting
+        for dependency in waiting: self.dependents.setdefault(dependency, []).append(seq)
+        self._remember(name, seq)
+        for var in endpoint.get("capture") or {}: self._remember(f"${var}", seq)
+        return seq, not waiting
+
+    def blocked_by(self, seq: int) -> Optional[str]:
+        for dependency in sorted(self.requires[seq]):
+            success, name = self.outcomes.get(dependency, (True, None))
+            if not success: return name
+        return None
+
+    def bind(self, seq: int) -> Dict[str, Any]:
+        captured = {var: self.captured[producer][var] for var, producer in self.sources[seq].items() if var in self.captured.get(producer, {})}
+        return bind(self.endpoints[seq], captured)
+
+    def complete(self, seq: int, result: Any, success: bool) -> List[int]:
+        # Forgets a finished endpoint and returns the endpoints that became ready
+        endpoint = self.endpoints.pop(seq)
+        name = endpoint_name(endpoint)
+        captured = {}
+        if success:
+            for var, path in (endpoint.get("capture") or {}).items():
+                try: captured[var] = extract(result, path)
+                except KeyError as e: success, name = False, str(e.args[0])
+        if seq in self.references:
+            self.outcomes[seq] = (success, name)
+            if captured: self.captured[seq] = captured
+        for dependency in self.requires.pop(seq): self._reference(dependency, -1)
+        del self.sources[seq]
+        del self.waiting[seq]
+        resource = self._resource(endpoint)
+        if seq in self.reads.get(resource, ()): self.reads[resource].discard(seq)
+        if self.last_write.get(resource) == seq: del self.last_write[resource]
+        ready = []
+        for dependent in self.dependents.pop(seq, []):
+            self.waiting[dependent].discard(seq)
+            if not self.waiting[dependent]: ready.append(dependent)
+        return ready
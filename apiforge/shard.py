@@ -0,0 +1,119 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Any, List, Optional, Tuple, Union
+from .reporter import Reporter
+from .scheduler import DependencyGraph, endpoint_name
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    # "i/n" with 1 <= i <= n, as used by --shard
+    try:
+        index, count = (int(part) for part in str(value).split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{value}', expected i/n")
+    if count < 1 or not 1 <= index <= count: raise ValueError(f"Invalid shard '{value}', expected 1 <= i <= n")
+    return index, count
+
+def components(graph: DependencyGraph) -> List[List[int]]:
+    # Endpoints connected through dependencies have to run on the same shard
+    parent = list(range(len(graph.endpoints)))
+
+    def find(index: int) -> int:
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    for index, dependencies in enumerate(graph.dependencies):
+        for dependency in dependencies: parent[find(index)] = find(dependency)
+    groups: Dict[int, List[int]] = {}
+    for index in range(len(graph.endpoints)): groups.setdefault(find(index), []).append(index)
+    return list(groups.values())
+
+def shard_indexes(endpoints: List[Dict[str, Any]], index: int, count: int, order_resources: bool = True) -> List[int]:
+    # Deterministic partition of endpoints into count shards, returns the endpoint indexes of shard index (1-based).
+    # Dependency components are assigned largest first to the least loaded shard, ties are broken by a hash of
+    # the component so every process and CI node computes the same assignment for the same spec.
+    if count == 1: return list(range(len(endpoints)))
+    graph = DependencyGraph(endpoints, order_resources)
+
+    def key(component: List[int]) -> str:
+        first = endpoints[component[0]]
+        return hashlib.sha1(f"{endpoint_name(first)}|{json.dumps(first.get('params'), sort_keys=True, default=str)}".encode()).hexdigest()
+
+    loads = [0] * count
+    selected: List[int] = []
+    for component in sorted(components(graph), key=lambda component: (-len(component), key(component))):
+        shard = loads.index(min(loads))
+        loads[shard] += len(component)
+        if shard == index - 1: selected.extend(component)
+    return sorted(selected)
+
+class ShardRecorder:
+    # Stands in for a Reporter inside shard worker processes, records are returned to the parent and replayed
+    # into its Reporter so one report covers every shard. label prefixes the thread name of each record.
+    def __init__(self, label: str):
+        self.label = label
+        self.records: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def log_api_result(self, test: Dict[str, Any], result: Any, success: bool, timings: Optional[Dict[str, float]] = None):
+        record = Reporter.result_record(test, result if success else str(result), success, timings)
+        record["thread"] = f"{self.label}:{record['thread']}"
+        with self._lock: self.records.append(record)
+
+    def log_generic_output(self, output: Any, method: str = "null_method"):
+        pass
+
+    def log_util_response(self, test: Dict[str, Any], result: Any, success: bool):
+        pass
+
+    def log_error(self, method: str, error: str):
+        pass
+
+    def flush(self, timeout: float = None):
+        pass
+
+def run_shard(settings: Dict[str, Any], spec: Union[str, Dict[str, Any]], shard: Tuple[int, int]) -> Dict[str, Any]:
+    # Entry point of a worker process, builds its own APIForge (and so its own connection pool)
+    from .core import APIForge
+    forge = APIForge(**settings)
+    recorder = ShardRecorder(f"shard-{shard[0]}/{shard[1]}")
+    try:
+        endpoints = forge._generate_endpoints(spec, None, "APIForge::run_shard")
+        indexes = shard_indexes(endpoints, shard[0], shard[1], forge.order_resources)
+        stats_before = forge.transport.stats()
+        results, successes = forge._execute([endpoints[index] for index in indexes], recorder)
+        return {
+            "shard": shard,
+            "indexes": indexes,
+            "results": results,
+            "success_count": sum(successes),
+            "records": recorder.records,
+            "connection_stats": forge.transport.stats_delta(stats_before, forge.transport.stats())
+        }
+    finally:
+        forge.close()
+
+def merge_reports(input_dirs: List[str], output_dir: str, junit: bool = True) -> Dict[str, Any]:
+    # Combines the results.jsonl files written by separate shard runs (e.g. CI nodes) into one report
+    reporter = Reporter(output_dir, junit=junit)
+    timings: Dict[str, float] = {}
+    try:
+        for input_dir in input_dirs:
+            # A shard that got no endpoints never creates its results.jsonl
+            if not os.path.isdir(input_dir): raise RuntimeError(f"Shard report directory {input_dir} does not exist")
+            path = os.path.join(input_dir, "results.jsonl")
+            if not os.path.isfile(path): continue
+            with open(path, "r") as f:
+                for line in f:
+                    if not line.strip(): continue
+                    record = json.loads(line)
+                    for key, value in (record.get("timings") or {}).items(): timings[key] = timings.get(key, 0.0) + value
+                    # A response written by the shard (include_responses) is kept as is in the merged file
+                    reporter.log_record({**record, "type": "result", "result": record.get("response") if record.get("success") else record.get("error")})
+        summary = reporter.summary()
+    finally:
+        reporter.close()
+    return {**summary, "shards": len(input_dirs), "timings": timings}
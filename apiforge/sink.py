@@ -0,0 +1,153 @@
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+from xml.sax.saxutils import escape, quoteattr
+from typing import Dict, Any, List, Optional
+
+class JSONLWriter:
+    # One JSON object per API result, the file is only created once the first result arrives
+    def __init__(self, path: str, include_responses: bool = False):
+        self.path = path
+        self.include_responses = include_responses
+        self._file = None
+
+    def _serialize(self, record: Dict[str, Any]) -> str:
+        data = {key: value for key, value in record.items() if key not in ("type", "result")}
+        if self.include_responses and record["success"]: data["response"] = record["result"]
+        return json.dumps(data, default=str)
+
+    def write(self, records: List[Dict[str, Any]]):
+        lines = [self._serialize(record) for record in records if record.get("type") == "result"]
+        if not lines: return
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._file = open(self.path, "w")
+        self._file.write("\n".join(lines) + "\n")
+
+    def flush(self):
+        if self._file: self._file.flush()
+
+    def close(self):
+        if self._file: self._file.close()
+        self._file = None
+
+class JUnitWriter:
+    # <testsuite> needs the totals up front, so test cases stream into a side file and are copied
+    # behind the header on close instead of being kept in memory
+    def __init__(self, path: str, suite_name: str = "apiforge"):
+        self.path = path
+        self.suite_name = suite_name
+        self._body_path = f"{path}.body"
+        self._body = None
+        self.tests = 0
+        self.failures = 0
+        self.time = 0.0
+
+    def write(self, records: List[Dict[str, Any]]):
+        cases = []
+        for record in records:
+            if record.get("type") != "result": continue
+            self.tests += 1
+            duration = (record.get("timings") or {}).get("total", 0.0)
+            self.time += duration
+            name = quoteattr(f"{record['endpoint']} {record['params']}")
+            case = f'<testcase classname={quoteattr(str(record["method"]))} name={name} time="{duration:.6f}"'
+            if record["success"]:
+                cases.append(case + "/>")
+            else:
+                self.failures += 1
+                error = str(record.get("error"))
+                cases.append(f"{case}><failure message={quoteattr(error[:1024])}>{escape(error)}</failure></testcase>")
+        if not cases: return
+        if self._body is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._body = open(self._body_path, "w")
+        self._body.write("\n".join(cases) + "\n")
+
+    def flush(self):
+        if self._body: self._body.flush()
+
+    def close(self):
+        if self._body is None: return
+        self._body.close()
+        self._body = None
+        with open(self.path, "w") as f:
+            f.write('<?xml version="1.0" encoding="utf-8"?>\n<testsuites>\n')
+            f.write(f'<testsuite name={quoteattr(self.suite_name)} tests="{self.tests}" failures="{self.failures}" errors="0" time="{self.time:.6f}">\n')
+            with open(self._body_path, "r") as body: shutil.copyfileobj(body, f)
+            f.write("</testsuite>\n</testsuites>\n")
+        os.remove(self._body_path)
+
+class BackgroundSink:
+    # Records are handed to a bounded queue and written by one daemon thread in batches, so callers
+    # only pay for a queue put. When the queue is full callers block instead of dropping results.
+    def __init__(self, handlers: List[Any], queue_size: int = 10000, batch_size: int = 500, flush_interval: float = 1.0):
+        self.handlers = handlers
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._closed = False
+        self.errors = 0     # Handler failures, counted so a broken writer can't kill the thread
+
+    def _ensure_started(self):
+        if self._thread is not None: return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="APIForge-sink", daemon=True)
+                self._thread.start()
+
+    def submit(self, record: Dict[str, Any]):
+        if self._closed: raise RuntimeError("Cannot submit to a closed sink")
+        self._ensure_started()
+        self._queue.put(record)
+
+    def _call(self, method: str, *args):
+        for handler in self.handlers:
+            try: getattr(handler, method)(*args)
+            except Exception: self.errors += 1
+
+    def _write(self, batch: List[Dict[str, Any]]):
+        self._call("write", batch)
+        batch.clear()
+
+    def _run(self):
+        batch: List[Dict[str, Any]] = []
+        last_flush = time.monotonic()
+        while True:
+            try:
+                item = self._queue.get(timeout=max(self.flush_interval - (time.monotonic() - last_flush), 0.01))
+            except queue.Empty:
+                item = None
+            if isinstance(item, threading.Event) or item is None:
+                # Flush request (an Event to set once written) or the flush interval elapsed
+                if batch: self._write(batch)
+                self._call("flush")
+                last_flush = time.monotonic()
+                if item is not None: item.set()
+                continue
+            if item is self:
+                if batch: self._write(batch)
+                self._call("close")
+                return
+            batch.append(item)
+            if len(batch) >= self.batch_size: self._write(batch)
+
+    def flush(self, timeout: Optional[float] = None):
+        if self._thread is None: return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def close(self):
+        if self._closed: return
+        self._closed = True
+        if self._thread is None:
+            self._call("close")
+            return
+        self._queue.put(self)    # The sink itself is the stop marker
+        self._thread.join()
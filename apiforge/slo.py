@@ -0,0 +1,113 @@
+import json
+import math
+import os
+import statistics
+import threading
+import time
+from typing import Dict, Any, List
+from .hooks import Hook
+
+# Latency SLOs and baselines. Endpoints may set max_latency_ms, checked on every request by run_test, and p95_ms,
+# checked over all requests of an endpoint once run_generated_tests finished. A Baseline compares the p95 of every
+# endpoint with its earlier runs so CI can fail (or warn) on a performance regression.
+BASELINE_VERSION = 1
+
+class PerformanceError(RuntimeError):
+    # Raised by run_generated_tests when an endpoint missed its p95_ms or regressed against a baseline in fail mode,
+    # after the run was reported. The results and the outcome (as in last_performance) come with it.
+    def __init__(self, performance: Dict[str, Any], results: List[Dict[str, Any]]):
+        failures = [f"{violation['endpoint']} p95 {violation['p95_ms']:.1f}ms > p95_ms {violation['limit_ms']}" for violation in performance["slo_violations"]]
+        failures += [f"{regression['endpoint']} p95 {regression['change']:.0%} above the baseline" for regression in performance["regressions"]]
+        super().__init__(f"Performance check failed: {'; '.join(failures)}")
+        self.performance = performance
+        self.results = results
+
+def percentile(samples: List[float], percent: float) -> float:
+    # Nearest rank, like LatencyHistogram.percentile, samples in milliseconds
+    if not samples: return 0.0
+    ordered = sorted(samples)
+    return ordered[max(math.ceil(len(ordered) * percent / 100), 1) - 1]
+
+def request_latency_ms(timings: Dict[str, float]) -> float:
+    # Sending the request until its body was read (ttfb includes connect). Waiting on the client's own rate limiter,
+    # decoding, validation and reporting are left out, the SLOs are about the server.
+    return (timings.get("ttfb", 0.0) + timings.get("download", 0.0)) * 1000
+
+class LatencyRecorder(Hook):
+    # Milliseconds of every finished request by "METHOD path". Raw samples instead of a LatencyHistogram per
+    # endpoint: a generated run has many endpoints with few requests each, and the histogram's fixed buckets
+    # would take far more memory than the samples.
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def after_response(self, context, result, error, timings):
+        if not timings.get("ttfb"): return    # No response, e.g. a connection error
+        name = f"{context['method']} {context['endpoint']}"
+        samples = self.samples.get(name)
+        if samples is None:
+            with self._lock: samples = self.samples.setdefault(name, [])
+        samples.append(request_latency_ms(timings))
+
+    def percentiles(self, percent: float) -> Dict[str, float]:
+        with self._lock: samples = dict(self.samples)
+        return {name: percentile(values, percent) for name, values in samples.items()}
+
+def check_slos(endpoints: List[Dict[str, Any]], recorder: LatencyRecorder) -> List[Dict[str, Any]]:
+    # Endpoints whose p95 over this run is above their p95_ms
+    p95 = recorder.percentiles(95)
+    violations = []
+    checked = set()
+    for endpoint in endpoints:
+        name = f"{endpoint['method']} {endpoint['path']}"
+        if endpoint.get("p95_ms") is None or name in checked or name not in p95: continue
+        checked.add(name)
+        if p95[name] > endpoint["p95_ms"]: violations.append({"endpoint": name, "p95_ms": p95[name], "limit_ms": endpoint["p95_ms"]})
+    return violations
+
+class Baseline:
+    # p50/p95 of the last history runs of every endpoint, stored as JSON at path. An endpoint regressed once its p95
+    # is more than threshold (0.2 = 20%) and min_delta_ms above the median p95 of the stored runs, the absolute
+    # floor keeps jitter of fast endpoints from failing the gate. mode "fail" fails the run, "warn" only reports.
+    # With update=True every run is appended, e.g. on the main branch while pull requests only compare.
+    def __init__(self, path: str, threshold: float = 0.2, mode: str = "fail", update: bool = False, history: int = 10, min_delta_ms: float = 2.0):
+        if mode not in ("fail", "warn"): raise RuntimeError(f"Unknown baseline mode '{mode}', expected fail or warn")
+        self.path = path
+        self.threshold = threshold
+        self.mode = mode
+        self.update = update
+        self.history = history
+        self.min_delta_ms = min_delta_ms
+        self.endpoints: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r") as f: data = json.load(f)
+            except (OSError, ValueError) as e:
+                raise RuntimeError(f"Failed to load baseline {path}: {e}")
+            if data.get("version") != BASELINE_VERSION: raise RuntimeError(f"{path} holds a version {data.get('version')} baseline, expected {BASELINE_VERSION}")
+            self.endpoints = data.get("endpoints", {})
+
+    def compare(self, recorder: LatencyRecorder) -> List[Dict[str, Any]]:
+        regressions = []
+        for name, current in sorted(recorder.percentiles(95).items()):
+            runs = self.endpoints.get(name, {}).get("p95_ms")
+            if not runs: continue
+            baseline = statistics.median(runs)
+            if current > baseline * (1 + self.threshold) and current - baseline > self.min_delta_ms:
+                regressions.append({"endpoint": name, "baseline_ms": baseline, "p95_ms": current, "change": current / baseline - 1 if baseline else math.inf})
+        return regressions
+
+    def record(self, recorder: LatencyRecorder):
+        p50, p95 = recorder.percentiles(50), recorder.percentiles(95)
+        for name in p95:
+            entry = self.endpoints.setdefault(name, {"p50_ms": [], "p95_ms": []})
+            entry["p50_ms"] = (entry["p50_ms"] + [p50[name]])[-self.history:]
+            entry["p95_ms"] = (entry["p95_ms"] + [p95[name]])[-self.history:]
+            entry["updated"] = time.time()
+
+    def save(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f: json.dump({"version": BASELINE_VERSION, "endpoints": self.endpoints}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
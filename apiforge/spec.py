@@ -0,0 +1,90 @@
+import json
+import os
+import threading
+import yaml
+from typing import Dict, Any, Optional, Tuple
+from urllib.parse import unquote
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# libyaml's loader is several times faster than the pure Python one, PyYAML only has it when built against libyaml
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+class RemoteReference(RuntimeError):
+    # The spec refers to another server, ConfigParser falls back to prance for those
+    pass
+
+def load_document(path: str) -> Any:
+    # A JSON or YAML file, JSON goes through orjson when it's installed
+    with open(path, "rb") as f: data = f.read()
+    if path.endswith(".json") or data.lstrip()[:1] in (b"{", b"["):
+        try: return orjson.loads(data) if orjson else json.loads(data)
+        except ValueError:
+            if path.endswith(".json"): raise
+    return yaml.load(data, Loader=YAML_LOADER)
+
+class RefResolver:
+    # Resolves $refs on demand instead of expanding the whole document up front. Each reference (file and JSON
+    # pointer) is resolved once and the result shared; referenced files are loaded when first needed. A reference
+    # back into itself is left as the $ref, e.g. a tree schema whose children are trees.
+    def __init__(self, document: Dict[str, Any], path: Optional[str] = None):
+        self.root = document
+        self.path = os.path.abspath(path) if path else None
+        self._documents: Dict[Optional[str], Any] = {self.path: document}
+        self._resolved: Dict[Tuple[Optional[str], str], Any] = {}
+        self._lock = threading.Lock()
+
+    def _document(self, path: Optional[str]) -> Any:
+        with self._lock:
+            if path not in self._documents:
+                try: self._documents[path] = load_document(path)
+                except OSError as e: raise RuntimeError(f"Cannot resolve reference to {path}: {e}")
+            return self._documents[path]
+
+    def _target(self, ref: str, base: Optional[str]) -> Tuple[Any, Optional[str], Tuple[Optional[str], str]]:
+        file, _, pointer = ref.partition("#")
+        base = base or self.path
+        if file.startswith(("http://", "https://")): raise RemoteReference(f"Remote reference {ref} needs the full spec parser")
+        path = os.path.normpath(os.path.join(os.path.dirname(base) if base else os.getcwd(), file)) if file else base
+        node = self._document(path)
+        for part in filter(None, pointer.split("/")):
+            part = unquote(part).replace("~1", "/").replace("~0", "~")
+            try: node = node[int(part)] if isinstance(node, list) else node[part]
+            except (KeyError, IndexError, ValueError, TypeError): raise RuntimeError(f"Unresolvable reference {ref}")
+        return node, path, (path, pointer)
+
+    def node(self, value: Any, base: Optional[str] = None) -> Tuple[Any, Optional[str]]:
+        # value with $refs followed until it isn't one, nested refs are left alone. Returns the file the value
+        # came from too, refs nested in it are relative to that file.
+        for _ in range(32):
+            if not (isinstance(value, dict) and isinstance(value.get("$ref"), str)): return value, base
+            value, base, _ = self._target(value["$ref"], base)
+        raise RuntimeError("Reference chain too long")
+
+    def deep(self, value: Any, base: Optional[str] = None, _active: Tuple = ()) -> Any:
+        # value with every nested $ref resolved
+        if isinstance(value, dict):
+            ref = value.get("$ref")
+            if isinstance(ref, str):
+                target, path, key = self._target(ref, base)
+                if key in self._resolved: return self._resolved[key]
+                if key in _active: return value
+                resolved = self.deep(target, path, _active + (key,))
+                self._resolved[key] = resolved
+                return resolved
+            return {name: self.deep(item, base, _active) for name, item in value.items()}
+        if isinstance(value, list): return [self.deep(item, base, _active) for item in value]
+        return value
+
+def load_spec(spec: Any) -> Tuple[Dict[str, Any], RefResolver]:
+    # An unresolved OAS document and its resolver, from a dict or a local file
+    if isinstance(spec, dict): return spec, RefResolver(spec)
+    try:
+        document = load_document(spec)
+    except (OSError, ValueError, yaml.YAMLError) as e:
+        raise RuntimeError(f"Failed to load spec {spec}: {e}")
+    if not isinstance(document, dict): raise RuntimeError("Spec must parse to a dictionary")
+    return document, RefResolver(document, spec)
@@ -0,0 +1,145 @@
+import codecs
+import json
+import time
+from typing import Dict, Any, List, Optional, Union
+from .utils import ResponseValidator
+
+STREAM_CHUNK_SIZE = 64 * 1024
+_WHITESPACE = " \t\n\r"
+
+class JSONArrayParser:
+    # Incremental parser for a top level JSON array: feed() takes raw bytes and returns the items completed
+    # so far, only the item currently being received is buffered. Bodies that are not an array are buffered
+    # whole and returned by value once the final chunk was fed.
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self.state = "start"    # start -> first -> item <-> next -> end, or value for non-array bodies
+        self.value: Any = None
+
+    def feed(self, chunk: bytes, final: bool = False) -> List[Any]:
+        self._buffer += self._text.decode(chunk, final)
+        if self.state == "value":
+            if final: self.value = json.loads(self._buffer)
+            return []
+        items = []
+        buffer, pos, size = self._buffer, 0, len(self._buffer)
+        while True:
+            while pos < size and buffer[pos] in _WHITESPACE: pos += 1
+            if pos == size: break
+            if self.state == "start":
+                if buffer[pos] != "[":
+                    self.state = "value"
+                    self._buffer = buffer[pos:]
+                    if final: self.value = json.loads(self._buffer)
+                    return items
+                self.state, pos = "first", pos + 1
+            elif self.state in ("first", "next") and buffer[pos] == "]":
+                self.state, pos = "end", pos + 1
+            elif self.state == "next":
+                if buffer[pos] != ",": raise ValueError(f"Expecting ',' delimiter at offset {pos}")
+                self.state, pos = "item", pos + 1
+            elif self.state in ("first", "item"):
+                try:
+                    item, end = self._decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if final: raise
+                    break
+                # A number at the very end of a chunk may continue in the next one
+                if end == size and not final: break
+                items.append(item)
+                self.state, pos = "next", end
+            else:
+                raise ValueError(f"Extra data after the array at offset {pos}")
+        self._buffer = buffer[pos:]
+        if final and self.state != "end": raise ValueError("Unexpected end of JSON array")
+        return items
+
+class StreamValidator:
+    # Validates the items of a streamed array response as they arrive. With first=N only the first N items
+    # are validated and reading stops afterwards, with every=k every k-th item is validated, both together
+    # validate the first N and every k-th item after them. The first invalid item ends the stream.
+    def __init__(self, validator: Optional[ResponseValidator] = None, first: Optional[int] = None, every: Optional[int] = None):
+        self.validator = validator or ResponseValidator()
+        self.first = first
+        self.every = every
+        self.parser = JSONArrayParser()
+        self.items = 0
+        self.validated = 0
+        self.invalid_index: Optional[int] = None
+        self.error: Optional[str] = None
+        self.complete = False
+        self.decode_time = 0.0
+        self.validate_time = 0.0
+
+    @classmethod
+    def from_options(cls, options: Union[bool, Dict[str, Any], None], validator: Optional[ResponseValidator] = None) -> Optional["StreamValidator"]:
+        # Endpoint configs use stream: true or stream: {first: 1000, every: 10}
+        if not options: return None
+        if options is True: return cls(validator)
+        return cls(validator, first=options.get("first"), every=options.get("every"))
+
+    def _sampled(self, index: int) -> bool:
+        if self.first is None and self.every is None: return True
+        if self.first is not None and index < self.first: return True
+        return bool(self.every) and index % self.every == 0
+
+    @property
+    def done(self) -> bool:
+        if self.invalid_index is not None or self.complete: return True
+        return self.first is not None and self.every is None and self.items >= self.first
+
+    def feed(self, chunk: bytes, final: bool = False) -> bool:
+        # Returns True once no more of the body is needed
+        started = time.perf_counter()
+        try:
+            items = self.parser.feed(chunk, final)
+        except ValueError as e:
+            raise ValueError(f"Failed to parse JSON response: {e}")
+        parsed = time.perf_counter()
+        for item in items:
+            index = self.items
+            self.items += 1
+            if self._sampled(index):
+                self.validated += 1
+                try:
+                    self.validator.validate_item(item)
+                except AssertionError as e:
+                    self.invalid_index, self.error = index, str(e)
+                    break
+            if self.done: break
+        self.validate_time += time.perf_counter() - parsed
+        self.decode_time += parsed - started
+        if final:
+            self.complete = True
+            if self.parser.state == "value": self._validate_value()
+        return self.done
+
+    def _validate_value(self):
+        started = time.perf_counter()
+        try:
+            self.validator.validate(self.parser.value)
+        except AssertionError as e:
+            self.invalid_index, self.error = 0, str(e)
+        self.validate_time += time.perf_counter() - started
+
+    @property
+    def valid(self) -> bool:
+        if self.invalid_index is not None: return False
+        # An empty array never satisfies expected_keys, same as validate_response
+        return not self.validator.expected_keys or self.parser.state == "value" or self.items > 0
+
+    def raise_for_invalid(self):
+        if self.valid: return
+        raise AssertionError(self.error or "Response validation failed: missing expected keys")
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "streamed": True,
+            "array": self.parser.state != "value",
+            "items": self.items,
+            "validated": self.validated,
+            "complete": self.complete,
+            "invalid_index": self.invalid_index
+        }
@@ -0,0 +1,182 @@
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
+from .config import ConfigParser
+
+METHODS = ("GET", "POST", "PUT", "DELETE", "PATCH")
+_PATH_PARAM = re.compile(r"\{([^{}/]+)\}")
+_FORMAT_EXAMPLES = {"date-time": "2024-01-01T00:00:00Z", "date": "2024-01-01", "email": "user@example.com", "uuid": "00000000-0000-0000-0000-000000000000",
+                    "uri": "https://example.com"}
+
+def example_from_schema(schema: Optional[Dict[str, Any]], depth: int = 0) -> Any:
+    # A value matching a resolved schema, built from its example/default/enum where present
+    if not schema or depth > 8: return None
+    for key in ("example", "default"):
+        if key in schema: return schema[key]
+    if schema.get("examples"): return schema["examples"][0]
+    if schema.get("enum"): return schema["enum"][0]
+    if "const" in schema: return schema["const"]
+    if schema.get("allOf"):
+        merged: Dict[str, Any] = {}
+        for part in schema["allOf"]:
+            value = example_from_schema(part, depth + 1)
+            if isinstance(value, dict): merged.update(value)
+        return merged
+    for key in ("oneOf", "anyOf"):
+        if schema.get(key): return example_from_schema(schema[key][0], depth + 1)
+    kind = schema.get("type")
+    if isinstance(kind, list): kind = next((item for item in kind if item != "null"), "null")
+    if kind == "object" or "properties" in schema:
+        return {name: example_from_schema(prop, depth + 1) for name, prop in schema.get("properties", {}).items()}
+    if kind == "array":
+        item = example_from_schema(schema.get("items"), depth + 1)
+        return [item] * max(schema.get("minItems", 1), 1)
+    if kind == "integer": return int(schema.get("minimum", 0))
+    if kind == "number": return float(schema.get("minimum", 0))
+    if kind == "boolean": return True
+    if kind == "string": return _FORMAT_EXAMPLES.get(schema.get("format"), "x" * schema.get("minLength", 6))
+    return None
+
+def _response(operation: Dict[str, Any]) -> Tuple[int, Optional[bytes]]:
+    # Same status as the generated tests expect (first code below 400), body from the media example or the schema
+    responses = operation.get("responses", {})
+    status = next((int(code) for code in responses if str(code).isdigit() and int(code) < 400), 200)
+    media = responses.get(str(status), {}).get("content", {}).get("application/json")
+    if media is None: return status, None
+    if "example" in media: body = media["example"]
+    elif media.get("examples"): body = next(iter(media["examples"].values())).get("value")
+    else: body = example_from_schema(media.get("schema"))
+    return status, json.dumps(body).encode()
+
+class StubRoutes:
+    # Precompiled routes of an OAS spec, every response body is encoded once up front
+    def __init__(self, spec: Union[str, Dict[str, Any]]):
+        spec = ConfigParser.parse_oas(spec)
+        self.routes: List[Tuple[re.Pattern, str, Dict[str, Tuple[int, Optional[bytes]]]]] = []
+        for path, operations in spec.get("paths", {}).items():
+            parts = _PATH_PARAM.split("/" + path.lstrip("/"))
+            pattern = re.compile("^" + "".join("[^/]+" if position % 2 else re.escape(part) for position, part in enumerate(parts)) + "/?$")
+            responses = {method.upper(): _response(operation) for method, operation in operations.items() if method.upper() in METHODS}
+            self.routes.append((pattern, path, responses))
+        # Literal paths win over templated ones, e.g. /posts/latest before /posts/{id}
+        self.routes.sort(key=lambda route: "{" in route[1])
+
+    def match(self, method: str, path: str) -> Tuple[Optional[str], Optional[Tuple[int, Optional[bytes]]]]:
+        # (spec path, response), (spec path, None) for a method the path doesn't have, (None, None) for no path
+        for pattern, spec_path, responses in self.routes:
+            if pattern.match(path): return spec_path, responses.get(method)
+        return None, None
+
+class Faults:
+    # Injected latency and errors. latency is seconds or a (min, max) range, error_rate the share of requests
+    # answered with error_status, fail_first fails the first N requests of every route so retry scenarios
+    # replay the same way on every run. seed makes the random choices repeatable.
+    def __init__(self, latency: Union[float, Tuple[float, float], None] = None, error_rate: float = 0.0, error_status: int = 503,
+                 retry_after: Optional[float] = None, fail_first: int = 0, seed: Optional[int] = None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.fail_first = fail_first
+        self._random = random.Random(seed)
+        self._seen: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def delay(self) -> float:
+        if not self.latency: return 0.0
+        if isinstance(self.latency, (int, float)): return float(self.latency)
+        with self._lock: return self._random.uniform(*self.latency)
+
+    def should_fail(self, route: str) -> bool:
+        with self._lock:
+            seen = self._seen.get(route, 0)
+            self._seen[route] = seen + 1
+            if seen < self.fail_first: return True
+            return self.error_rate > 0 and self._random.random() < self.error_rate
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True    # Headers and body are written separately, don't wait for the delayed ACK
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: Optional[bytes], headers: Optional[Dict[str, str]] = None):
+        self.send_response(status)
+        for name, value in (headers or {}).items(): self.send_header(name, value)
+        if body is not None: self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body or b"")))
+        self.end_headers()
+        if body: self.wfile.write(body)
+
+    def _handle(self):
+        server: StubServer = self.server.stub
+        length = int(self.headers.get("Content-Length") or 0)
+        if length: self.rfile.read(length)
+        route, response = server.routes.match(self.command, urlsplit(self.path).path)
+        server.count(route, self.command)
+        delay = server.faults.delay()
+        if delay: time.sleep(delay)
+        if route is None: return self._send(404, b'{"message": "Not Found"}')
+        if response is None: return self._send(405, b'{"message": "Method Not Allowed"}')
+        if server.faults.should_fail(f"{self.command} {route}"):
+            headers = {"Retry-After": f"{server.faults.retry_after:g}"} if server.faults.retry_after is not None else None
+            return self._send(server.faults.error_status, json.dumps({"status": server.faults.error_status}).encode(), headers)
+        status, body = response
+        if self.command == "GET" and body is not None:
+            # Bodies are static, so their hash is a strong validator for conditional requests
+            etag = f'"{hashlib.md5(body).hexdigest()}"'
+            if self.headers.get("If-None-Match") == etag: return self._send(304, None, {"ETag": etag})
+            return self._send(status, body, {"ETag": etag})
+        self._send(status, body)
+
+    do_GET = do_POST = do_PUT = do_DELETE = do_PATCH = _handle
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024     # Load tests open many connections at once
+
+class StubServer:
+    # Serves the examples of an OAS spec over HTTP so generated and load tests can run without the real upstream
+    def __init__(self, spec: Union[str, Dict[str, Any]], host: str = "127.0.0.1", port: int = 0, faults: Optional[Faults] = None):
+        self.routes = StubRoutes(spec)
+        self.faults = faults or Faults()
+        self.requests: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._server = _Server((host, port), _StubHandler)
+        self._server.stub = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, route: Optional[str], method: str):
+        name = f"{method} {route}" if route else "unmatched"
+        with self._lock: self.requests[name] = self.requests.get(name, 0) + 1
+
+    def start(self) -> str:
+        self._thread = threading.Thread(target=self._server.serve_forever, name="APIForge-stub", daemon=True)
+        self._thread.start()
+        return self.url
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def close(self):
+        if self._thread: self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StubServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,284 @@
+import os
+import ssl
+import threading
+import httpx
+import time
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import DEFAULT_CA_BUNDLE_PATH, get_encoding_from_headers, select_proxy
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from typing import Dict, Any, Optional, Tuple, Union
+from .cassette import Cassette, CassetteWriter, ReplayAdapter, AsyncReplayTransport, AsyncRecordingTransport, recording_adapter
+from .decoders import read_capped
+from .ratelimit import resolve_rate_limit
+from .stream import STREAM_CHUNK_SIZE
+
+# Connection specific headers requests adds that HTTP/2 forbids
+_HOP_BY_HOP = ("connection", "keep-alive", "proxy-connection", "transfer-encoding", "upgrade")
+
+# Connect time of the request currently being sent by this thread
+_connect_timing = threading.local()
+# Expected status and error_body_limit of the next request this thread sends, see expect_status
+_expected = threading.local()
+
+def expect_status(status: Optional[int], error_body_limit: Optional[int]):
+    # The adapters read the body of a non-streamed response with another status only up to error_body_limit, it's
+    # only used for the error message. Applies to the next request sent from this thread.
+    _expected.status, _expected.limit = status, error_body_limit
+
+def _read_body(response: requests.Response):
+    # What a non-streaming send does, except for the capped body of an unexpected status
+    status, limit = getattr(_expected, "status", None), getattr(_expected, "limit", None)
+    _expected.status = None
+    if status is None or limit is None or response.status_code == status:
+        response.content
+        return
+    response._content = read_capped(response.iter_content(STREAM_CHUNK_SIZE), limit)
+    response.close()
+
+class TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        start = time.perf_counter()
+        try: super().connect()
+        finally: _connect_timing.seconds = getattr(_connect_timing, "seconds", 0.0) + time.perf_counter() - start
+
+class TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        start = time.perf_counter()
+        try: super().connect()
+        finally: _connect_timing.seconds = getattr(_connect_timing, "seconds", 0.0) + time.perf_counter() - start
+
+class ConnectionCounters:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.requests = 0
+
+    def connection_opened(self):
+        with self._lock: self.opened += 1
+
+    def request_sent(self):
+        with self._lock: self.requests += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {"requests": self.requests, "connections_opened": self.opened, "connections_reused": max(self.requests - self.opened, 0)}
+
+def _counting_pool(base: type, connection_cls: type, counters: ConnectionCounters) -> type:
+    # urllib3 calls _new_conn only when no idle keep-alive connection is available in the pool
+    class CountingConnectionPool(base):
+        ConnectionCls = connection_cls
+
+        def _new_conn(self):
+            counters.connection_opened()
+            return super()._new_conn()
+    return CountingConnectionPool
+
+class PooledHTTPAdapter(HTTPAdapter):
+    def __init__(self, pool_size: int = 10, timeout: Optional[Tuple[float, float]] = None, counters: Optional[ConnectionCounters] = None):
+        self.timeout = timeout
+        self.counters = counters or ConnectionCounters()
+        # One pool per host holding up to pool_size keep-alive connections, so every worker can hold one
+        super().__init__(pool_connections=pool_size, pool_maxsize=pool_size)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _counting_pool(HTTPConnectionPool, TimedHTTPConnection, self.counters),
+            "https": _counting_pool(HTTPSConnectionPool, TimedHTTPSConnection, self.counters)
+        }
+
+    def send(self, request, stream=False, **kwargs):
+        # Apply the default (connect, read) timeout without changing Session.request call sites
+        if kwargs.get("timeout") is None: kwargs["timeout"] = self.timeout
+        self.counters.request_sent()
+        _connect_timing.seconds = 0.0
+        start = time.perf_counter()
+        # Always stream so the call returns once headers arrive, then read the body here as a
+        # non-streaming Session.send would, which splits time to first byte from the download
+        response = super().send(request, stream=True, **kwargs)
+        ttfb = time.perf_counter() - start
+        if not stream: _read_body(response)
+        response.timings = {"connect": _connect_timing.seconds, "ttfb": ttfb, "download": time.perf_counter() - start - ttfb}
+        return response
+
+def resolve_transport(section: Optional[Dict[str, Any]], env: str) -> Optional[Dict[str, Any]]:
+    # Transport settings of a config or spec (x-apiforge-transport), with the same per-environment overrides as
+    # rate_limit: {http2: true, environments: {staging: {http2: false}}}
+    return resolve_rate_limit(section, env)
+
+def _http_versions(http2: Union[bool, str]) -> Dict[str, bool]:
+    # "prior_knowledge" speaks HTTP/2 without negotiating it, for cleartext (h2c) servers. Otherwise HTTP/2 is
+    # negotiated with ALPN, so it's only used over https and http:// URLs stay on HTTP/1.1.
+    if http2 == "prior_knowledge": return {"http1": False, "http2": True}
+    if http2 not in (True, False): raise RuntimeError(f"Unknown http2 setting '{http2}', expected true, false or prior_knowledge")
+    return {"http1": True, "http2": bool(http2)}
+
+def _ssl_context(verify: Union[bool, str], cert: Union[str, Tuple[str, str], None]) -> ssl.SSLContext:
+    # What requests does with verify (False, or a CA bundle file or directory) and a client cert, as an SSL context
+    if verify is False:
+        context = ssl.create_default_context()
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+    elif verify is True: context = ssl.create_default_context(cafile=DEFAULT_CA_BUNDLE_PATH)
+    elif os.path.isdir(verify): context = ssl.create_default_context(capath=verify)
+    elif os.path.isfile(verify): context = ssl.create_default_context(cafile=verify)
+    else: raise OSError(f"Could not find a suitable TLS CA certificate bundle, invalid path: {verify}")
+    if cert:
+        if isinstance(cert, str): context.load_cert_chain(cert)
+        else: context.load_cert_chain(*cert)
+    return context
+
+class _StreamedBody:
+    # File-like Response.raw over a streamed httpx response, iter_content and .content read it chunk by chunk
+    def __init__(self, response: httpx.Response, request: requests.PreparedRequest):
+        self._response = response
+        self._request = request
+        self._chunks = response.iter_bytes()
+        self._buffer = b""
+
+    def read(self, amount: Optional[int] = None, **kwargs) -> bytes:
+        try:
+            while amount is None or len(self._buffer) < amount:
+                chunk = next(self._chunks, None)
+                if chunk is None: break
+                self._buffer += chunk
+        except httpx.HTTPError as e:
+            raise requests.exceptions.ConnectionError(e, request=self._request)
+        if amount is None: data, self._buffer = self._buffer, b""
+        else: data, self._buffer = self._buffer[:amount], self._buffer[amount:]
+        return data
+
+    def close(self):
+        self._response.close()
+
+    release_conn = close
+
+class HTTP2Adapter(BaseAdapter):
+    # requests adapter sending through an httpx client that speaks HTTP/2, so every worker thread multiplexes its
+    # requests over a few connections per host. Responses and errors are translated to their requests
+    # equivalents, everything above the adapter (status checks, retries, parsing) stays the same. verify, cert and
+    # proxies (which requests already merged with the environment) get a client of their own per combination.
+    def __init__(self, pool_size: int = 10, timeout: Optional[Tuple[float, float]] = None, counters: Optional[ConnectionCounters] = None,
+                 http2: Union[bool, str] = True):
+        super().__init__()
+        self.timeout = timeout
+        self.counters = counters or ConnectionCounters()
+        self.pool_size = pool_size
+        self.versions = _http_versions(http2)
+        self._clients: Dict[Tuple[Any, Any, Optional[str]], httpx.Client] = {}
+        self._lock = threading.Lock()
+        self.client = self._client(True, None, None)
+
+    def _client(self, verify: Union[bool, str], cert: Union[str, Tuple[str, str], None], proxy: Optional[str]) -> httpx.Client:
+        key = (verify, tuple(cert) if isinstance(cert, list) else cert, proxy)
+        client = self._clients.get(key)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    # trust_env is off, the environment's proxies and CA bundle already came in through requests
+                    client = self._clients[key] = httpx.Client(limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size),
+                                                               verify=_ssl_context(verify, key[1]), proxy=proxy, trust_env=False, **self.versions)
+        return client
+
+    @staticmethod
+    def _timeout(timeout: Any) -> httpx.Timeout:
+        if isinstance(timeout, tuple): return httpx.Timeout(timeout[1], connect=timeout[0])
+        return httpx.Timeout(timeout)
+
+    def send(self, request: requests.PreparedRequest, stream=False, timeout=None, verify=True, cert=None, proxies=None) -> requests.Response:
+        self.counters.request_sent()
+        marks: Dict[str, float] = {}
+
+        def trace(event_name: str, info: Dict[str, Any]):
+            if event_name == "connection.connect_tcp.started": marks["connect_start"] = time.perf_counter()
+            elif event_name == "connection.connect_tcp.complete": self.counters.connection_opened()
+            if event_name in ("connection.connect_tcp.complete", "connection.start_tls.complete"): marks["connect_end"] = time.perf_counter()
+
+        headers = [(name, value) for name, value in request.headers.items() if name.lower() not in _HOP_BY_HOP]
+        try: client = self._client(verify, cert, select_proxy(request.url, proxies or {}))
+        except ImportError as e: raise requests.exceptions.InvalidSchema(f"Missing dependencies for the proxy: {e}", request=request)
+        start = time.perf_counter()
+        try:
+            sent = client.build_request(request.method, request.url, headers=headers, content=request.body,
+                                             timeout=self._timeout(timeout if timeout is not None else self.timeout), extensions={"trace": trace})
+            upstream = client.send(sent, stream=True)
+        except httpx.ConnectTimeout as e: raise requests.exceptions.ConnectTimeout(e, request=request)
+        except httpx.TimeoutException as e: raise requests.exceptions.ReadTimeout(e, request=request)
+        except httpx.HTTPError as e: raise requests.exceptions.ConnectionError(e, request=request)
+        ttfb = time.perf_counter() - start
+        response = requests.Response()
+        response.status_code = upstream.status_code
+        response.reason = upstream.reason_phrase
+        response.headers = CaseInsensitiveDict(upstream.headers.items())
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = _StreamedBody(upstream, request)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response.http_version = upstream.http_version
+        if not stream: _read_body(response)
+        connect = marks["connect_end"] - marks["connect_start"] if "connect_end" in marks and "connect_start" in marks else 0.0
+        response.timings = {"connect": connect, "ttfb": ttfb, "download": time.perf_counter() - start - ttfb}
+        return response
+
+    def close(self):
+        with self._lock: clients, self._clients = list(self._clients.values()), {}
+        for client in clients: client.close()
+
+class Transport:
+    # cassette with cassette_mode="record" saves every response to that file, "replay" answers from it
+    # without any network access. http2 sends requests through HTTP2Adapter and the async engine over HTTP/2.
+    def __init__(self, pool_size: int = 10, connect_timeout: Optional[float] = 10.0, read_timeout: Optional[float] = 60.0,
+                 cassette: Optional[str] = None, cassette_mode: str = "replay", http2: Union[bool, str] = False):
+        self.counters = ConnectionCounters()
+        self.http2 = http2
+        timeout = (connect_timeout, read_timeout) if connect_timeout is not None or read_timeout is not None else None
+        self.cassette_mode = cassette_mode if cassette else None
+        self.writer = self.cassette = None
+        if self.cassette_mode == "record":
+            self.writer = CassetteWriter(cassette)
+            self.adapter = recording_adapter(PooledHTTPAdapter)(self.writer, pool_size=pool_size, timeout=timeout, counters=self.counters)
+        elif self.cassette_mode == "replay":
+            self.cassette = Cassette(cassette)
+            self.adapter = ReplayAdapter(self.cassette, self.counters)
+        elif self.cassette_mode is not None:
+            raise RuntimeError(f"Unknown cassette mode '{cassette_mode}', expected record or replay")
+        elif http2:
+            self.adapter = HTTP2Adapter(pool_size=pool_size, timeout=timeout, counters=self.counters, http2=http2)
+        else:
+            self.adapter = PooledHTTPAdapter(pool_size=pool_size, timeout=timeout, counters=self.counters)
+        self._local = threading.local()
+
+    def async_transport(self, limits: httpx.Limits) -> Optional[httpx.AsyncBaseTransport]:
+        # Transport for the async engine's client, None uses httpx's default one
+        if self.cassette_mode == "record": return AsyncRecordingTransport(self.writer, limits=limits)
+        if self.cassette_mode == "replay": return AsyncReplayTransport(self.cassette)
+        if self.http2: return httpx.AsyncHTTPTransport(limits=limits, **_http_versions(self.http2))
+        return None
+
+    @property
+    def session(self) -> requests.Session:
+        # Each thread gets its own Session (cookies, headers) while all of them share the adapter's pools
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.mount("http://", self.adapter)
+            session.mount("https://", self.adapter)
+            self._local.session = session
+        return session
+
+    def stats(self) -> Dict[str, int]:
+        return self.counters.snapshot()
+
+    @staticmethod
+    def stats_delta(before: Dict[str, int], after: Dict[str, int]) -> Dict[str, int]:
+        sent = after["requests"] - before["requests"]
+        opened = after["connections_opened"] - before["connections_opened"]
+        return {"requests": sent, "connections_opened": opened, "connections_reused": max(sent - opened, 0)}
+
+    def close(self):
+        self.adapter.close()
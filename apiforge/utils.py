@@ -1,40 +1,102 @@
-from typing import Any, Union, Tuple, List
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Union, Tuple, List, Callable, Optional, Dict
+from jsonschema.exceptions import best_match
+from openapi_schema_validator import OAS30Validator, OAS31Validator
 
 expected_key = Union[Tuple[str, type], Tuple[str, type, Any]]
 
 def validate_response(data: Any, expected_keys: Union[List[expected_key], Tuple[expected_key], List[str], Tuple[str]]) -> bool:
     # Ensure API responses have expected structure
-    if not expected_keys: return True
-    if not isinstance(data, (dict, list, tuple)): return False
-    if not data: return False
-
-    # First check if all expected_keys are present in data
-    if isinstance(expected_keys[0], str):   # If first item is str, assume all are str
-        if isinstance(data, dict): return all(key in data for key in expected_keys)
-        if isinstance(data, (list, tuple)):
-            for item in data:
-                if not isinstance(item, dict) or not all(key in item for key in expected_keys): return False
-            return True
-
-    # Handle case where expected_keys are tuples with (key, type) or (key, type, value),
-    # check that the key is of the expected type and optionally if the value matches the expected value
-    if isinstance(data, dict):
-        for item in expected_keys:
-            if not isinstance(item, tuple) or len(item) not in (2, 3): return False
-            key, expected_type = item[0], item[1]
-            if key not in data or not isinstance(data[key], expected_type): return False
-            if len(item) == 3 and data[key] != item[2]: return False
-        return True
+    return compile_expected_keys(expected_keys)(data)
+
+def compile_item_check(expected_keys: Any) -> Optional[Callable[[Any], bool]]:
+    # Check for a single response object, the shape of expected_keys is inspected once here instead of per item.
+    # Returns None when there is nothing to check.
+    if not expected_keys: return None
+
+    # If first item is str, assume all are str
+    if isinstance(expected_keys[0], str):
+        keys = tuple(expected_keys)
+        return lambda item: isinstance(item, dict) and all(key in item for key in keys)
 
-    # Same logic as above but if data is a list/tuple of dictionaries 
-    if isinstance(data, (list, tuple)):
-        for item in data:
-            if not isinstance(item, dict): return False
-            for ek in expected_keys:
-                if not isinstance(ek, tuple) or len(ek) not in (2, 3): return False
-                key, expected_type = ek[0], ek[1]
-                if key not in item or not isinstance(item[key], expected_type): return False
-                if len(ek) == 3 and item[key] != ek[2]: return False
+    # Tuples with (key, type) or (key, type, value), check that the key is of the expected type and
+    # optionally if the value matches the expected value
+    if any(not isinstance(item, tuple) or len(item) not in (2, 3) for item in expected_keys): return lambda item: False
+    typed = tuple((item[0], item[1], len(item) == 3, item[2] if len(item) == 3 else None) for item in expected_keys)
+
+    def check_item(item: Any) -> bool:
+        if not isinstance(item, dict): return False
+        for key, expected_type, has_value, value in typed:
+            if key not in item or not isinstance(item[key], expected_type): return False
+            if has_value and item[key] != value: return False
         return True
+    return check_item
+
+def compile_expected_keys(expected_keys: Any) -> Callable[[Any], bool]:
+    # Same rules as validate_response: a dict, or a non-empty list/tuple of dicts, must satisfy every expected key
+    check_item = compile_item_check(expected_keys)
+    if check_item is None: return lambda data: True
+
+    def check(data: Any) -> bool:
+        if isinstance(data, dict): return check_item(data)
+        if isinstance(data, (list, tuple)): return bool(data) and all(map(check_item, data))
+        return False
+    return check
+
+# Compiled JSON Schema validators keyed by schema content, shared across endpoints, runs and threads
+_SCHEMA_VALIDATORS: "OrderedDict[str, Any]" = OrderedDict()
+_SCHEMA_VALIDATORS_MAX = 1024
+_schema_lock = threading.Lock()
+
+def schema_validator(schema: Dict[str, Any]) -> Union[OAS30Validator, OAS31Validator]:
+    # OAS 3.1 schemas carry the $schema dialect set by ConfigParser, anything else is treated as OAS 3.0
+    key = hashlib.sha256(json.dumps(schema, sort_keys=True, default=str).encode()).hexdigest()
+    with _schema_lock:
+        validator = _SCHEMA_VALIDATORS.get(key)
+        if validator is not None:
+            _SCHEMA_VALIDATORS.move_to_end(key)
+            return validator
+    validator = (OAS31Validator if "$schema" in schema else OAS30Validator)(schema)
+    with _schema_lock:
+        _SCHEMA_VALIDATORS[key] = validator
+        while len(_SCHEMA_VALIDATORS) > _SCHEMA_VALIDATORS_MAX: _SCHEMA_VALIDATORS.popitem(last=False)
+    return validator
+
+class ResponseValidator:
+    # expected_keys and the OAS response schema compiled once per endpoint, validate() raises AssertionError
+    def __init__(self, expected_keys: Any = None, schema: Optional[Dict[str, Any]] = None):
+        self.expected_keys = expected_keys
+        self.schema_source = schema
+        self._fingerprint: Optional[str] = None
+        self.check = compile_expected_keys(expected_keys)
+        self.check_item = compile_item_check(expected_keys)
+        self.schema = schema_validator(schema) if schema else None
+        # Streamed arrays are validated item by item against the items schema
+        item_schema = schema.get("items") if schema and schema.get("type") == "array" else None
+        if item_schema and "$schema" in schema: item_schema = {**item_schema, "$schema": schema["$schema"]}
+        self.item_schema = schema_validator(item_schema) if item_schema else None
+
+    @property
+    def fingerprint(self) -> str:
+        # Stable across runs, identifies the checks a cached response already passed (see ResponseCache)
+        if self._fingerprint is None:
+            self._fingerprint = hashlib.sha1(json.dumps([self.expected_keys, self.schema_source], sort_keys=True, default=str).encode()).hexdigest()
+        return self._fingerprint
+
+    @staticmethod
+    def _check_schema(validator: Union[OAS30Validator, OAS31Validator], data: Any):
+        error = best_match(validator.iter_errors(data))
+        if error is None: return
+        path = "/".join(str(part) for part in error.absolute_path)
+        raise AssertionError(f"Response schema validation failed: {error.message}" + (f" at {path}" if path else ""))
+
+    def validate(self, data: Any):
+        if not self.check(data): raise AssertionError("Response validation failed: missing expected keys")
+        if self.schema: self._check_schema(self.schema, data)
 
-    return False
\ No newline at end of file
+    def validate_item(self, item: Any):
+        if self.check_item and not self.check_item(item): raise AssertionError("Response validation failed: missing expected keys")
+        if self.item_schema: self._check_schema(self.item_schema, item)
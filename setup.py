@@ -6,10 +6,13 @@ setup(
     packages=find_packages(),
     install_requires=[
         "requests>=2.28.0",
+        "httpx>=0.28.0",
+        "h2>=4.0.0",
         "pytest>=7.0.0",
         "pyyaml>=6.0",
         "pytest-html>=3.0.0",
     ],
+    entry_points={"console_scripts": ["apiforge=apiforge.cli:main"]},
     author="Your Name",
     author_email="your.email@example.com",
     description="Automated API Testing Framework",
@@ -0,0 +1,74 @@
+import json
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from apiforge.cache import SpecCache
+from apiforge.config import ConfigParser
+
+POSTS = [{"id": i, "title": f"title {i}", "body": f"body {i}", "userId": (i % 3) + 1} for i in range(1, 11)]
+
+# Minimal in-process stand-in for jsonplaceholder so tests can run without network access
+class LocalAPIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, headers=None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        for name, value in (headers or {}).items(): self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length)) if length else {}
+
+    def _route(self, method):
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        if len(parts) == 2 and parts[0] == "status":
+            # /status/<code>?retry_after=<seconds> answers with that status code
+            query = parse_qs(url.query)
+            headers = {"Retry-After": query["retry_after"][0]} if "retry_after" in query else None
+            return self._send(int(parts[1]), {"status": int(parts[1])}, headers)
+        if not parts or parts[0] != "posts" or len(parts) > 2: return self._send(404, {})
+        if len(parts) == 1:
+            if method == "GET":
+                query = parse_qs(url.query)
+                posts = [p for p in POSTS if "userId" not in query or str(p["userId"]) == query["userId"][0]]
+                return self._send(200, posts)
+            if method == "POST": return self._send(201, {**self._body(), "id": len(POSTS) + 1})
+            return self._send(404, {})
+        post_id = int(parts[1])
+        if method == "GET": return self._send(200, POSTS[post_id - 1]) if 0 < post_id <= len(POSTS) else self._send(404, {})
+        if method in ("PUT", "PATCH"): return self._send(200, {**POSTS[0], **self._body(), "id": post_id})
+        if method == "DELETE": return self._send(200, {})
+        return self._send(404, {})
+
+    def do_GET(self): self._route("GET")
+    def do_POST(self): self._route("POST")
+    def do_PUT(self): self._route("PUT")
+    def do_PATCH(self): self._route("PATCH")
+    def do_DELETE(self): self._route("DELETE")
+
+# Keep the compiled-spec cache out of the user's home directory while testing
+@pytest.fixture(autouse=True)
+def spec_cache(tmp_path, monkeypatch):
+    cache = SpecCache(cache_dir=str(tmp_path / "spec_cache"), enabled=True)
+    monkeypatch.setattr(ConfigParser, "cache", cache)
+    return cache
+
+@pytest.fixture
+def local_api():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), LocalAPIHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
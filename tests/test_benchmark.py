@@ -0,0 +1,31 @@
+import json
+import pytest
+from apiforge.benchmark import synthetic_spec, run_benchmarks, compare, load_results, save_results
+from apiforge.cli import main
+from apiforge.generator import TestGenerator as Generator
+
+def test_synthetic_spec():
+    endpoints = Generator().generate_tests(synthetic_spec(10))
+    assert len(endpoints) == 10
+    assert endpoints[1]["method"] == "PUT" and endpoints[1]["expected_keys"] == ["id", "title", "userId"]
+
+def test_run_and_compare(tmp_path):
+    results = run_benchmarks(paths=20, items=100, workers=(1, 2), run_paths=10, repeat=1)
+    assert results["version"] == 1 and len(results["benchmarks"]) == 6
+    assert results["benchmarks"]["run_generated_tests[10 paths,max_workers=2]"]["requests_per_second"] > 0
+    save_results(results, str(tmp_path / "baseline.json"))
+    baseline = load_results(str(tmp_path / "baseline.json"))
+    slower = {"benchmarks": {name: {**value, "median": value["median"] * 1.5} for name, value in results["benchmarks"].items()}}
+    assert all(entry["regressed"] and entry["change"] == pytest.approx(0.5) for entry in compare(slower, baseline, threshold=0.2))
+    assert not any(entry["regressed"] for entry in compare(results, baseline))
+    (tmp_path / "old.json").write_text(json.dumps({"version": 0}))
+    with pytest.raises(RuntimeError, match="expected 1"): load_results(str(tmp_path / "old.json"))
+
+def test_bench_cli(tmp_path, capsys):
+    baseline = {"version": 1, "benchmarks": {"validate_response[50 items]": {"median": 1e-9}}}
+    (tmp_path / "baseline.json").write_text(json.dumps(baseline))
+    arguments = ["bench", "--paths", "4", "--items", "50", "--workers", "1", "--run-paths", "4", "--repeat", "1"]
+    assert main(arguments + ["--output", str(tmp_path / "results.json"), "--baseline", str(tmp_path / "baseline.json")]) == 1
+    comparison = json.loads(capsys.readouterr().out)["comparison"]
+    assert [entry["name"] for entry in comparison] == ["validate_response[50 items]"]
+    assert main(arguments + ["--baseline", str(tmp_path / "results.json"), "--threshold", "100"]) == 0
@@ -0,0 +1,44 @@
+import asyncio
+import pytest
+from apiforge.cassette import Cassette, CassetteWriter, request_key
+from apiforge.core import APIForge
+
+SPEC = "configs/open_api_config.yaml"
+OFFLINE = "http://127.0.0.1:9"     # Nothing listens here, replayed runs must not connect
+
+def test_request_key():
+    key = request_key("get", "http://a/posts?b=2&a=1", None)
+    assert key == request_key("GET", "https://b/posts?a=1&b=2", b"")
+    assert request_key("POST", "http://a/posts", '{"a": 1, "b": 2}') == request_key("POST", "http://b/posts", b'{"b":2,"a":1}')
+    assert key != request_key("GET", "http://a/posts?a=1", None)
+
+def test_cassette_file(tmp_path):
+    path = str(tmp_path / "cassette.apfc")
+    writer = CassetteWriter(path)
+    key = request_key("POST", "/posts", b"{}")
+    writer.add(key, 201, {"Content-Type": "application/json", "Content-Encoding": "gzip"}, b'{"id": 1}')
+    writer.add(key, 201, {}, b'{"id": 2}')
+    writer.close()
+    cassette = Cassette(path)
+    assert len(cassette) == 2
+    assert cassette.lookup(key) == (201, [["Content-Type", "application/json"]], b'{"id": 1}')
+    assert [cassette.lookup(key)[2] for _ in range(2)] == [b'{"id": 2}'] * 2
+    assert cassette.lookup(request_key("GET", "/posts", None)) is None
+    cassette.close()
+    (tmp_path / "other").write_bytes(b"not a cassette file, just text")
+    with pytest.raises(RuntimeError, match="not a version 1 cassette"): Cassette(str(tmp_path / "other"))
+
+def test_record_and_replay(local_api, tmp_path):
+    path = str(tmp_path / "run.apfc")
+    recorder = APIForge(local_api, cassette=path, cassette_mode="record")
+    expected = recorder.run_generated_tests(SPEC)
+    recorder.run_test("GET", "posts")
+    recorder.close()
+
+    player = APIForge(OFFLINE, cassette=path)
+    assert player.run_generated_tests(SPEC) == expected
+    assert player.last_connection_stats["connections_opened"] == 0
+    assert player.run_test("GET", "posts", stream=True)["items"] == 10
+    with pytest.raises(RuntimeError, match="No recorded response for GET /users"): player.run_test("GET", "users")
+    assert asyncio.run(player.run_generated_tests_async(SPEC)) == expected
+    player.close()
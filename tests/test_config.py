@@ -1,8 +1,21 @@
 import pytest
 import os
+import yaml
 from apiforge.config import ConfigParser
 from .test_core import EXPECTED_KEYS
 
+OAS31_DIALECT = "https://spec.openapis.org/oas/3.1/dialect/base"
+POST_SCHEMA = {
+    "type": "object",
+    "required": EXPECTED_KEYS,
+    "properties": {
+        "id": {"type": "integer", "example": 1},
+        "title": {"type": "string", "example": "foo"},
+        "body": {"type": "string", "example": "bar"},
+        "userId": {"type": "integer", "example": 1}
+    }
+}
+
 def test_yaml_config():
     os.environ["API_BEARER_TOKEN"] = "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9..."
     config = ConfigParser.load_config("configs/open_api_config.yaml", "prod")
@@ -19,7 +32,8 @@ def test_yaml_config():
         "params": {"userId": 1},
         "expected_status": 200,
         "expected_keys": EXPECTED_KEYS,
-        "payload": None
+        "payload": None,
+        "response_schema": {"type": "array", "items": POST_SCHEMA, "$schema": OAS31_DIALECT}
     }
     assert config["endpoints"][1] == {
         "method": "POST",
@@ -27,7 +41,8 @@ def test_yaml_config():
         "payload": payload,
         "expected_status": 201,
         "expected_keys": EXPECTED_KEYS,
-        "params": {}
+        "params": {},
+        "response_schema": {**POST_SCHEMA, "$schema": OAS31_DIALECT}
     }
     assert config["endpoints"][2] == {
         "method": "PUT",
@@ -35,7 +50,8 @@ def test_yaml_config():
         "payload": put_payload,
         "expected_status": 200,
         "expected_keys": EXPECTED_KEYS,
-        "params": {"id": 1}
+        "params": {"id": 1},
+        "response_schema": {**POST_SCHEMA, "$schema": OAS31_DIALECT}
     }
     assert config["endpoints"][3] == {
         "method": "DELETE",
@@ -43,7 +59,8 @@ def test_yaml_config():
         "expected_status": 200,
         "expected_keys": [],
         "params": {"id": 1},
-        "payload": None
+        "payload": None,
+        "response_schema": {"type": "object", "additionalProperties": False, "$schema": OAS31_DIALECT}
     }
 
 def test_config():
@@ -57,4 +74,93 @@ def test_load_config_empty_yaml(tmp_path):
     empty_file = tmp_path / "invalid.yaml"
     with open(empty_file, "w") as f: f.write("")
     config = ConfigParser.load_config(str(empty_file))
-    assert config is None
\ No newline at end of file
+    assert config is None
+
+def test_load_config_cached(spec_cache, mocker):
+    first = ConfigParser.load_config("configs/open_api_config.yaml", "prod")
+    parser = mocker.patch("apiforge.config.load_spec")
+    second = ConfigParser.load_config("configs/open_api_config.yaml", "prod")
+    assert parser.call_count == 0
+    assert second == first
+    assert spec_cache.info()["hits"] == 1
+    assert spec_cache.info()["disk_entries"] == 1
+
+    # A fresh process only has the on-disk store
+    spec_cache.clear(disk=False)
+    assert ConfigParser.load_config("configs/open_api_config.yaml", "prod") == first
+    assert parser.call_count == 0
+
+def test_load_config_cache_keys(spec_cache):
+    ConfigParser.load_config("configs/open_api_config.yaml", "prod")
+    ConfigParser.load_config("configs/open_api_config.yaml", "prod", for_generator=True)
+    ConfigParser.load_config("configs/open_api_config.yaml", "Staging")
+    assert spec_cache.info()["disk_entries"] == 3
+    ConfigParser.clear_cache()
+    assert ConfigParser.cache_info()["disk_entries"] == 0
+    assert ConfigParser.cache_info()["memory_entries"] == 0
+
+def test_load_config_cache_invalidation(spec_cache, tmp_path):
+    spec = yaml.safe_load(open("configs/open_api_config.yaml"))
+    spec["components"]["schemas"]["Post"] = {"$ref": "post.yaml"}
+    post_schema = tmp_path / "post.yaml"
+    post_schema.write_text(yaml.safe_dump({"type": "object", "required": ["id"], "properties": {"id": {"type": "integer", "example": 1}}}))
+    spec_file = tmp_path / "spec.yaml"
+    spec_file.write_text(yaml.safe_dump(spec))
+    assert ConfigParser.load_config(str(spec_file))["endpoints"][0]["expected_keys"] == ["id"]
+
+    # Changing a referenced file must invalidate the compiled entry
+    post_schema.write_text(yaml.safe_dump({"type": "object", "required": ["id", "title"], "properties": {"id": {"type": "integer", "example": 1}, "title": {"type": "string"}}}))
+    assert ConfigParser.load_config(str(spec_file))["endpoints"][0]["expected_keys"] == ["id", "title"]
+    assert spec_cache.info()["hits"] == 0
+
+def test_load_config_cache_invalidation_dict(spec_cache, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    spec = yaml.safe_load(open(os.path.join(os.path.dirname(__file__), "..", "configs", "open_api_config.yaml")))
+    spec["components"]["schemas"]["Post"] = {"$ref": "post.yaml"}
+    post_schema = tmp_path / "post.yaml"
+    post_schema.write_text(yaml.safe_dump({"type": "object", "required": ["id"], "properties": {"id": {"type": "integer", "example": 1}}}))
+    assert ConfigParser.load_config(spec)["endpoints"][0]["expected_keys"] == ["id"]
+    post_schema.write_text(yaml.safe_dump({"type": "object", "required": ["id", "title"], "properties": {"id": {"type": "integer", "example": 1}, "title": {"type": "string"}}}))
+    assert ConfigParser.load_config(spec)["endpoints"][0]["expected_keys"] == ["id", "title"]
+    assert spec_cache.info()["hits"] == 0
+
+def test_load_config_cache_not_mutated(spec_cache):
+    config = ConfigParser.load_config("configs/open_api_config.yaml", "prod")
+    config["endpoints"][0]["params"]["userId"] = 99
+    assert ConfigParser.load_config("configs/open_api_config.yaml", "prod")["endpoints"][0]["params"] == {"userId": 1}
+
+def test_lazy_refs(tmp_path, mocker):
+    (tmp_path / "schemas.yaml").write_text(yaml.safe_dump({
+        "Post": {"type": "object", "required": ["id"], "properties": {"id": {"type": "integer", "example": 1}, "parent": {"$ref": "#/Post"}}}
+    }))
+    spec = {
+        "openapi": "3.0.3",
+        "components": {"parameters": {"Id": {"name": "id", "in": "path", "schema": {"type": "integer", "example": 7}}},
+                       "responses": {"Post": {"description": "A post", "content": {"application/json": {"schema": {"$ref": "schemas.yaml#/Post"}}}}}},
+        "paths": {"/posts/{id}": {
+            "get": {"parameters": [{"$ref": "#/components/parameters/Id"}], "responses": {"200": {"$ref": "#/components/responses/Post"}}},
+            "options": {"responses": {"200": {"$ref": "#/components/responses/Missing"}}}     # Skipped, so never resolved
+        }}
+    }
+    (tmp_path / "spec.yaml").write_text(yaml.safe_dump(spec))
+    dump = mocker.spy(yaml, "safe_dump")
+    endpoints = ConfigParser.load_config(str(tmp_path / "spec.yaml"), for_generator=True)["endpoints"]
+    assert dump.call_count == 0
+    assert len(endpoints) == 1 and endpoints[0]["params"] == {"id": 7} and endpoints[0]["expected_keys"] == ["id"]
+    # The self reference stays a $ref instead of recursing forever
+    assert endpoints[0]["response_schema"]["properties"]["parent"] == {"$ref": "#/Post"}
+    with pytest.raises(RuntimeError, match="Unresolvable reference"):
+        ConfigParser.load_config({**spec, "paths": {"/a": {"get": {"responses": {"200": {"$ref": "#/components/responses/Missing"}}}}}})
+
+def test_refs_inside_external_file(tmp_path):
+    # Refs inside common.yaml are relative to common.yaml, not to the spec
+    (tmp_path / "common.yaml").write_text(yaml.safe_dump({
+        "responses": {"PostResp": {"description": "A post", "content": {"application/json": {"schema": {"$ref": "#/schemas/Post"}}}}},
+        "parameters": {"Id": {"name": "id", "in": "path", "schema": {"$ref": "#/schemas/Id"}}},
+        "schemas": {"Post": {"type": "object", "required": ["id", "title"]}, "Id": {"type": "integer", "example": 3}}
+    }))
+    (tmp_path / "spec.yaml").write_text(yaml.safe_dump({"openapi": "3.0.3", "paths": {"/posts/{id}": {"get": {
+        "parameters": [{"$ref": "common.yaml#/parameters/Id"}], "responses": {"200": {"$ref": "common.yaml#/responses/PostResp"}}
+    }}}}))
+    endpoint = ConfigParser.load_config(str(tmp_path / "spec.yaml"))["endpoints"][0]
+    assert endpoint["expected_keys"] == ["id", "title"] and endpoint["params"] == {"id": 3}
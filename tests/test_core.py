@@ -1,5 +1,8 @@
+import asyncio
 import pytest
 import requests
+import yaml
+from concurrent.futures import ThreadPoolExecutor
 from apiforge.core import APIForge
 from apiforge.reporter import Reporter
 
@@ -184,4 +187,73 @@ def test_osa_dict():
             for item in result:
                 assert isinstance(item, dict)
                 for key in EXPECTED_KEYS:
-                    assert key in item
\ No newline at end of file
+                    assert key in item
+
+def test_generated_tests_async(local_api):
+    api_forge = APIForge(local_api)
+    results = api_forge.run_generated_tests(spec="configs/open_api_config.yaml", reporter=REPORTER)
+    async_results = asyncio.run(api_forge.run_generated_tests_async(spec="configs/open_api_config.yaml", reporter=REPORTER, concurrency=2))
+    assert async_results == results
+    assert not any("error" in result for result in async_results if isinstance(result, dict))
+
+def test_config_tests_async_errors(local_api, tmp_path):
+    api_forge = APIForge(local_api)
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text(yaml.safe_dump({"base_url": local_api, "endpoints": [
+        {"method": "GET", "path": "posts/1", "expected_status": 200, "expected_keys": EXPECTED_KEYS},
+        {"method": "GET", "path": "posts/1", "expected_status": 200, "expected_keys": ["missing"]},
+        {"method": "GET", "path": "missing", "expected_status": 200}
+    ]}))
+    results = asyncio.run(api_forge.run_config_tests_async(str(config_file), reporter=REPORTER))
+    assert results[0]["id"] == 1
+    assert results[1] == {"error": "API test failed: Response validation failed: missing expected keys"}
+    assert results[2] == {"error": "API error: Endpoint not found: 404"}
+
+def test_connection_reuse(local_api):
+    api_forge = APIForge(local_api, max_workers=2)
+    for _ in range(3): api_forge.run_generated_tests(spec="configs/open_api_config.yaml")
+    stats = api_forge.connection_stats()
+    assert stats["requests"] == 12
+    assert stats["connections_opened"] <= 2
+    assert stats["connections_reused"] == stats["requests"] - stats["connections_opened"]
+    assert api_forge.last_connection_stats["requests"] == 4
+    api_forge.close()
+
+def test_per_thread_sessions(local_api):
+    api_forge = APIForge(local_api, max_workers=4, connect_timeout=1.5, read_timeout=3)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        sessions = list(executor.map(lambda _: api_forge._session, range(2)))
+    assert api_forge._session is api_forge._session
+    assert api_forge._session not in sessions
+    for session in sessions + [api_forge._session]:
+        assert session.get_adapter(local_api) is api_forge.transport.adapter
+    assert api_forge.transport.adapter.timeout == (1.5, 3)
+    assert api_forge.transport.adapter._pool_maxsize == 4
+
+def test_response_schema_validation(local_api):
+    api_forge = APIForge(local_api)
+    schema = {"type": "object", "required": ["id"], "properties": {"id": {"type": "integer"}, "userId": {"type": "string"}}}
+    spec = {"openapi": "3.0.0", "info": {"title": "t", "version": "1"}, "paths": {"/posts/{id}": {"get": {
+        "parameters": [{"name": "id", "in": "path", "required": True, "schema": {"type": "integer", "example": 1}}],
+        "responses": {"200": {"description": "ok", "content": {"application/json": {"schema": schema}}}}}}}}
+    results = api_forge.run_generated_tests(spec)
+    assert results == [{"error": "API test failed: Response schema validation failed: 2 is not of type 'string' at userId"}]
+
+def test_stream_backpressure(local_api):
+    pulled = []
+
+    def endpoints():
+        for index in range(50):
+            pulled.append(index)
+            yield {"method": "GET", "path": f"posts/{index % 10 + 1}", "expected_status": 200, "expected_keys": ["id"]}
+
+    api_forge = APIForge(local_api, max_workers=4)
+    count = 0
+    for endpoint, result, success in api_forge.stream_generated_tests(endpoints(), max_in_flight=5):
+        count += 1
+        assert success and result["id"] == int(endpoint["path"].split("/")[1])
+        # Never more than the window admitted ahead of what was handed back
+        assert len(pulled) - count <= 5
+    assert count == 50
+    spec_outcomes = list(api_forge.stream_generated_tests("configs/open_api_config.yaml"))
+    assert len(spec_outcomes) == 4 and all(success for _, _, success in spec_outcomes)
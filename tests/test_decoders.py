@@ -0,0 +1,90 @@
+import asyncio
+import json
+import socket
+import threading
+import time
+import httpx
+import pytest
+from apiforge import transport
+from apiforge.core import APIForge
+from apiforge.decoders import DECODERS, get_decoder, read_capped, read_capped_async, register_decoder, truncate_body
+from apiforge.retry import RetryPolicy
+from apiforge.stub import StubServer, Faults
+
+SPEC = "configs/open_api_config.yaml"
+
+def test_get_decoder():
+    assert get_decoder("json") is json.loads
+    assert get_decoder()(b'{"a": [1, 2]}') == {"a": [1, 2]}
+    with pytest.raises(RuntimeError, match="Unknown JSON decoder"): get_decoder("yaml")
+    for decoder in DECODERS.values():
+        with pytest.raises(ValueError): decoder(b"{not json")
+
+def test_truncate_body():
+    assert truncate_body(b"short", 10) == "short"
+    assert truncate_body(b"x" * 20, 10) == "x" * 10 + "... [truncated]"
+    assert truncate_body("é".encode() * 3, 3) == "é... [truncated]"
+    assert truncate_body(b"x" * 20, None) == "x" * 20
+    assert read_capped(iter([b"abc", b"def", b"ghi"]), 4) == b"abcdef"
+
+    async def chunks():
+        for chunk in (b"abc", b"def", b"ghi"): yield chunk
+
+    assert asyncio.run(read_capped_async(chunks(), 4)) == b"abcdef"
+    assert asyncio.run(read_capped_async(chunks(), None)) == b"abcdefghi"
+
+def test_pluggable_decoder():
+    calls = []
+    register_decoder("counting", lambda body: calls.append(body) or json.loads(body))
+    try:
+        with StubServer(SPEC) as stub:
+            api_forge = APIForge(stub.url, json_decoder="counting")
+            assert api_forge.run_test("GET", "posts")[0]["id"] == 1
+            assert calls == [b'[{"id": 1, "title": "foo", "body": "bar", "userId": 1}]']
+            api_forge.close()
+    finally:
+        DECODERS.pop("counting")
+
+def test_error_body_limit():
+    faults = Faults(fail_first=10, error_status=500)
+    with StubServer(SPEC, faults=faults) as stub:
+        api_forge = APIForge(stub.url, retry_policy=RetryPolicy(max_attempts=1), error_body_limit=5)
+        with pytest.raises(RuntimeError, match=r'got 500: \{"sta\.\.\. \[truncated\]$'): api_forge.run_test("GET", "posts")
+        with pytest.raises(RuntimeError, match=r"\[truncated\]$"): api_forge.run_test("GET", "posts", stream={"first": 1})
+
+        async def run():
+            async with httpx.AsyncClient() as client: await api_forge.run_test_async(client, "GET", "posts")
+
+        with pytest.raises(RuntimeError, match=r"\[truncated\]$"): asyncio.run(run())
+        api_forge.close()
+
+def test_error_body_not_downloaded():
+    # A 500 announcing 100MB but sending only its start: the sync engine stops after error_body_limit bytes instead
+    # of waiting for the rest of the body
+    listener = socket.create_server(("127.0.0.1", 0))
+    connections = []
+
+    def serve():
+        conn, _ = listener.accept()
+        connections.append(conn)
+        conn.recv(65536)
+        conn.sendall(b"HTTP/1.1 500 Internal Server Error\r\nContent-Type: text/plain\r\nContent-Length: 100000000\r\n\r\n" + b"x" * 65536)
+
+    threading.Thread(target=serve, daemon=True).start()
+    api_forge = APIForge(f"http://127.0.0.1:{listener.getsockname()[1]}", read_timeout=5, retry_policy=RetryPolicy(max_attempts=1), error_body_limit=10)
+    started = time.perf_counter()
+    with pytest.raises(RuntimeError, match=r"got 500: x{10}\.\.\. \[truncated\]$"): api_forge.run_test("GET", "posts")
+    assert time.perf_counter() - started < 2
+    api_forge.close()
+    for conn in connections: conn.close()
+    listener.close()
+
+def test_error_body_limit_cleared_after_failure():
+    # A request that never got a response must not cap the body of the next, unrelated one on this thread
+    listener = socket.create_server(("127.0.0.1", 0))
+    port = listener.getsockname()[1]
+    listener.close()
+    api_forge = APIForge(f"http://127.0.0.1:{port}", retry_policy=RetryPolicy(max_attempts=1), error_body_limit=10)
+    with pytest.raises(RuntimeError): api_forge.run_test("GET", "posts")
+    assert transport._expected.status is None
+    api_forge.close()
@@ -0,0 +1,55 @@
+import json
+import multiprocessing
+import yaml
+from apiforge.core import APIForge
+from apiforge.distributed import WorkQueue, Coordinator, run_worker
+from apiforge.reporter import Reporter
+
+def test_work_queue_stealing():
+    queue = WorkQueue(list(range(8)), expected_workers=2, batch_size=1)
+    queue.register("a")
+    queue.register("b")
+    assert queue.next_batch("a") == [0]
+    assert list(queue.queues["a"]) == [1, 2, 3]
+    # b takes the rest of the unassigned units, runs through them and then steals from a's tail
+    batches = [queue.next_batch("b") for _ in range(5)]
+    assert batches == [[4], [5], [6], [7], [3]] and queue.steals == 1
+    assert list(queue.queues["a"]) == [1, 2]
+    queue.complete("a", [0])
+    queue.complete("b", [4, 5, 6, 7])
+    # A worker going away hands back its in-flight units
+    queue.release("b")
+    assert list(queue.unassigned) == [3]
+    assert [queue.next_batch("a") for _ in range(4)] == [[1], [2], [3], []]
+    queue.complete("a", [1, 2, 3])
+    assert queue.next_batch("a") is None
+
+def test_distributed_run(local_api, tmp_path):
+    endpoints = [{"method": "GET", "path": f"posts/{i}", "expected_status": 200, "expected_keys": ["id"]} for i in range(1, 11)]
+    endpoints += [
+        {"method": "POST", "path": "comments", "expected_status": 404},
+        {"method": "GET", "path": "status/200", "expected_status": 200, "id": "status"},
+        {"method": "GET", "path": "status/503", "expected_status": 200, "depends_on": ["status"]}
+    ]
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text(yaml.safe_dump({"base_url": local_api, "endpoints": endpoints}))
+    expected = APIForge(local_api).run_config_tests(str(config_file))
+
+    reporter = Reporter(str(tmp_path / "reports"))
+    coordinator = Coordinator(str(config_file), expected_workers=3, reporter=reporter)
+    address = coordinator.start()
+    context = multiprocessing.get_context("spawn")
+    workers = [context.Process(target=run_worker, args=(address, f"w{i}")) for i in range(3)]
+    for worker in workers: worker.start()
+    try:
+        results = coordinator.wait(timeout=60)
+    finally:
+        coordinator.close()
+        for worker in workers: worker.join(10)
+    assert [result.get("error", "").split(":")[0] for result in results] == [result.get("error", "").split(":")[0] for result in expected]
+    assert results[:10] == expected[:10]
+    assert coordinator.success_count == 11 and sum(coordinator.units_by_worker.values()) == len(coordinator.units)
+    assert all(worker.exitcode == 0 for worker in workers)
+    reporter.close()
+    records = [json.loads(line) for line in (tmp_path / "reports" / "results.jsonl").read_text().splitlines()]
+    assert len(records) == len(endpoints)
@@ -0,0 +1,44 @@
+import json
+from apiforge.core import APIForge
+from apiforge.generator import TestGenerator as Generator, RunState
+
+SPEC = "configs/open_api_config.yaml"
+
+def endpoint(method, path, **extra):
+    return {"method": method, "path": path, "params": {}, "payload": None, "expected_status": 200, **extra}
+
+def test_fingerprint():
+    fingerprint = Generator.fingerprint(endpoint("GET", "posts"))
+    assert fingerprint == Generator.fingerprint({**endpoint("GET", "posts"), "validator": object()})
+    assert fingerprint != Generator.fingerprint(endpoint("GET", "posts", params={"userId": 1}))
+    assert fingerprint != Generator.fingerprint(endpoint("GET", "posts", response_schema={"type": "array"}))
+
+def test_select_changed(tmp_path):
+    endpoints = [endpoint("POST", "posts", capture={"id": "id"}), endpoint("GET", "posts/{id}"), endpoint("GET", "users")]
+    state = RunState(str(tmp_path / "state.json"))
+    assert Generator.select_changed(endpoints, state) == [0, 1, 2]
+    state.record(endpoints, [True, False, True])
+    state.save()
+
+    state = RunState(str(tmp_path / "state.json"))
+    # The failed read runs again together with the POST it takes its id from
+    assert Generator.select_changed(endpoints, state) == [0, 1]
+    assert Generator.select_changed(endpoints, state, force=True) == [0, 1, 2]
+    changed = endpoints[:2] + [endpoint("GET", "users", params={"page": 2})]
+    assert Generator.select_changed(changed, state) == [0, 1, 2]
+    state.record([], [], changed)
+    assert len(state.operations) == 2
+
+def test_incremental_runs(local_api, tmp_path):
+    state_file = str(tmp_path / "state.json")
+    api_forge = APIForge(local_api)
+    total = len(Generator().generate_tests(SPEC))
+    assert len(api_forge.run_generated_tests(SPEC, state_file=state_file)) == total
+    assert api_forge.run_generated_tests(SPEC, state_file=state_file) == []
+    assert len(api_forge.run_generated_tests(SPEC, state_file=state_file, force=True)) == total
+
+    data = json.loads(open(state_file).read())
+    assert data["version"] == 1 and len(data["operations"]) == total
+    data["operations"][next(iter(data["operations"]))]["success"] = False
+    open(state_file, "w").write(json.dumps(data))
+    assert len(api_forge.run_generated_tests(SPEC, state_file=state_file)) >= 1
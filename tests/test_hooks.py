@@ -0,0 +1,71 @@
+import asyncio
+import json
+from apiforge.core import APIForge
+from apiforge.hooks import Hook, TimingCollector, TIMING_KEYS
+from apiforge.reporter import Reporter
+from apiforge.retry import RetryPolicy
+
+class RecordingHook(Hook):
+    def __init__(self):
+        self.events = []
+
+    def before_request(self, context):
+        self.events.append(("before", context["method"], context["attempt"]))
+
+    def after_response(self, context, result, error, timings):
+        self.events.append(("after", error is None, sorted(timings)))
+
+    def on_retry(self, context, attempt, delay, error):
+        self.events.append(("retry", attempt, delay >= 0))
+
+def test_hooks_called(local_api):
+    hook = RecordingHook()
+    api_forge = APIForge(local_api, hooks=[hook])
+    api_forge.run_test("GET", "posts/{id}", params={"id": 1}, expected_keys=["id"])
+    assert hook.events == [("before", "GET", 1), ("after", True, sorted(TIMING_KEYS))]
+
+def test_retry_hook(local_api):
+    hook = RecordingHook()
+    api_forge = APIForge(local_api, hooks=[hook], retry_policy=RetryPolicy(max_attempts=2, base_delay=0.01))
+    try: api_forge.run_test("GET", "status/503")
+    except RuntimeError: pass
+    assert [event[0] for event in hook.events] == ["before", "retry", "before", "after"]
+    assert hook.events[2] == ("before", "GET", 2)
+    assert hook.events[-1][1] is False
+
+def test_timings_in_results(local_api, tmp_path):
+    reporter = Reporter(str(tmp_path))
+    collector = TimingCollector()
+    api_forge = APIForge(local_api, hooks=[collector])
+    spec = {"openapi": "3.0.0", "info": {"title": "t", "version": "1"}, "paths": {"/posts": {"get": {"responses": {"200": {"description": "ok"}}}}}}
+    api_forge.run_generated_tests(spec, reporter=reporter)
+    reporter.close()
+    record = json.loads((tmp_path / "results.jsonl").read_text().splitlines()[0])
+    assert set(record["timings"]) == set(TIMING_KEYS)
+    assert record["timings"]["ttfb"] > 0 and record["timings"]["total"] >= record["timings"]["ttfb"]
+    assert record["timings"]["queue_wait"] >= 0
+    averages = collector.averages()["GET posts"]
+    assert averages["total"] > 0 and averages["reporter"] > 0
+
+def test_async_timings(local_api):
+    collector = TimingCollector()
+    api_forge = APIForge(local_api, hooks=[collector])
+    spec = {"openapi": "3.0.0", "info": {"title": "t", "version": "1"}, "paths": {"/posts": {"get": {"responses": {"200": {"description": "ok"}}}}}}
+    results = asyncio.run(api_forge.run_generated_tests_async(spec))
+    assert results
+    averages = collector.averages()["GET posts"]
+    assert averages["connect"] > 0 and averages["ttfb"] >= averages["connect"] and averages["decode"] > 0
+
+def test_raising_hook_releases_limiter(local_api):
+    class FailingHook(Hook):
+        def before_request(self, context): raise RuntimeError("boom")
+
+    api_forge = APIForge(local_api, hooks=[FailingHook()], retry_policy=RetryPolicy(max_attempts=1), rate_limit={"adaptive": True, "initial_concurrency": 1, "max_concurrency": 1})
+    limiter = api_forge.rate_limiter.host(local_api.split("//")[1])
+    for _ in range(2):
+        try: api_forge.run_test("GET", "posts/{id}", params={"id": 1})
+        except RuntimeError as e: assert "boom" in str(e)
+        assert limiter.concurrency.in_flight == 0
+    spec = {"openapi": "3.0.0", "info": {"title": "t", "version": "1"}, "paths": {"/posts": {"get": {"responses": {"200": {"description": "ok"}}}}}}
+    asyncio.run(api_forge.run_generated_tests_async(spec))
+    assert limiter.concurrency.in_flight == 0
@@ -0,0 +1,81 @@
+import asyncio
+import httpx
+from apiforge.core import APIForge
+from apiforge.hooks import Hook
+from apiforge.httpcache import ResponseCache
+from apiforge.stub import StubServer
+from apiforge.utils import ResponseValidator
+
+SPEC = "configs/open_api_config.yaml"
+
+class CacheStatus(Hook):
+    def __init__(self):
+        self.statuses = []
+
+    def after_response(self, context, result, error, timings):
+        self.statuses.append((context.get("cache"), timings["validate"]))
+
+class CountingValidator(ResponseValidator):
+    calls = 0
+
+    def validate(self, data):
+        CountingValidator.calls += 1
+        super().validate(data)
+
+def test_lru_and_store():
+    cache = ResponseCache(max_entries=2)
+    assert cache.store("a", {"Cache-Control": "no-store", "ETag": '"1"'}, [1]) is None
+    assert cache.store("b", {}, [1]) is None
+    for key in ("a", "b"): cache.store(key, {"ETag": f'"{key}"'}, [key])
+    cache.get("a")
+    cache.store("c", {"Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}, ["c"])
+    assert cache.get("b") is None and cache.get("a").body == ["a"]
+    assert cache.get("c").conditional_headers() == {"If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}
+    assert ResponseCache.key("u", {"a": 1, "b": 2}, {"X": "1"}) == ResponseCache.key("u", {"b": 2, "a": 1}, {"x": "1"})
+
+def test_not_modified_reuses_body_and_validation():
+    hook = CacheStatus()
+    with StubServer(SPEC) as stub:
+        api_forge = APIForge(stub.url, hooks=[hook], http_cache=True)
+        CountingValidator.calls = 0
+        first = api_forge.run_test("GET", "posts", validator=CountingValidator(["id", "title"]))
+        second = api_forge.run_test("GET", "posts", validator=CountingValidator(["id", "title"]))
+        assert second == first and second is not first and CountingValidator.calls == 1
+        # Results are copies, changing one doesn't change the cached body or skip its validation
+        second.clear()
+        assert api_forge.run_test("GET", "posts", validator=CountingValidator(["id", "title"])) == first
+        # Other checks on the same cached body still run once
+        api_forge.run_test("GET", "posts", validator=CountingValidator(["id"]))
+        api_forge.run_test("GET", "posts", validator=CountingValidator(["id"]))
+        assert CountingValidator.calls == 2
+        assert [status for status, _ in hook.statuses] == ["miss", "hit", "hit", "hit", "hit"]
+        assert api_forge.http_cache.info()["hits"] == 4
+        api_forge.run_test("POST", "posts", expected_status=201, json={"title": "foo"})
+        assert hook.statuses[-1][0] is None
+        api_forge.close()
+
+def test_persisted_cache(tmp_path):
+    path = str(tmp_path / "http-cache.json")
+    with StubServer(SPEC) as stub:
+        api_forge = APIForge(stub.url, http_cache=path)
+        api_forge.run_generated_tests(SPEC)
+        api_forge.close()
+        api_forge = APIForge(stub.url, http_cache=path)
+        results = api_forge.run_generated_tests(SPEC)
+        assert all("error" not in result for result in results)
+        assert api_forge.http_cache.info()["hits"] == 1
+        api_forge.close()
+
+def test_async_not_modified():
+    with StubServer(SPEC) as stub:
+        api_forge = APIForge(stub.url, http_cache=True)
+
+        async def run():
+            async with httpx.AsyncClient() as client:
+                first = await api_forge.run_test_async(client, "GET", "posts", expected_keys=["id"])
+                second = await api_forge.run_test_async(client, "GET", "posts", expected_keys=["id"])
+                return first, second
+
+        first, second = asyncio.run(run())
+        assert second == first and second is not first and api_forge.http_cache.info()["hits"] == 1
+        api_forge.close()
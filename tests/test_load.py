@@ -0,0 +1,53 @@
+import random
+import pytest
+from apiforge.core import APIForge
+from apiforge.load import LatencyHistogram, open_loop_schedule, classify_error
+from .test_core import REPORTER
+
+def test_histogram_percentiles():
+    histogram = LatencyHistogram()
+    samples = [random.uniform(0.001, 2.0) for _ in range(10000)]
+    for sample in samples: histogram.record(sample)
+    samples.sort()
+    for percent in (50, 90, 99):
+        exact = samples[int(len(samples) * percent / 100) - 1] * 1000
+        assert histogram.percentile(percent) == pytest.approx(exact, rel=0.02)
+    assert histogram.to_dict()["max_ms"] == pytest.approx(samples[-1] * 1000, abs=0.001)
+    assert histogram.count == 10000
+
+def test_histogram_fixed_memory():
+    histogram = LatencyHistogram()
+    buckets = len(histogram.counts)
+    histogram.record(0)
+    histogram.record(10 ** 9)
+    assert len(histogram.counts) == buckets
+    other = LatencyHistogram()
+    other.record(0.5)
+    histogram.merge(other)
+    assert histogram.count == 3
+
+def test_open_loop_schedule():
+    offsets = list(open_loop_schedule(rps=100, duration=2))
+    assert len(offsets) == 200
+    assert offsets[1] - offsets[0] == pytest.approx(0.01)
+    ramped = list(open_loop_schedule(rps=100, duration=2, ramp=1))
+    assert len(ramped) == pytest.approx(150, abs=1)
+    assert ramped == sorted(ramped)
+
+def test_classify_error(local_api):
+    api_forge = APIForge(local_api)
+    with pytest.raises(RuntimeError) as error: api_forge.run_test("GET", "missing")
+    assert classify_error(error.value) == "ValueError"
+    with pytest.raises(RuntimeError) as error: api_forge.run_test("GET", "posts/1", expected_keys=["missing"])
+    assert classify_error(error.value) == "AssertionError"
+
+def test_run_load(local_api):
+    api_forge = APIForge(local_api, max_workers=4)
+    summary = api_forge.run_load("configs/open_api_config.yaml", rps=100, duration=0.5, reporter=REPORTER)
+    assert summary["requests"] == 50
+    assert summary["latency"]["count"] == 50
+    assert summary["error_rate"] == 0
+    assert set(summary["endpoints"]) == {"GET posts", "POST posts", "PUT posts/{id}", "DELETE posts/{id}"}
+    for stats in summary["endpoints"].values():
+        assert stats["requests"] in (12, 13)
+        assert 0 < stats["latency"]["p50_ms"] <= stats["latency"]["p99_ms"] <= stats["latency"]["max_ms"]
@@ -0,0 +1,58 @@
+import itertools
+from apiforge.core import APIForge
+from apiforge.generator import TestGenerator as Generator
+from apiforge.matrix import schema_values, payload_cases, param_cases, expand
+from apiforge.stub import StubServer
+
+SPEC = "configs/open_api_config.yaml"
+
+def test_schema_values():
+    assert list(schema_values({"type": "integer", "minimum": 1, "maximum": 10})) == [1, 10, 5]
+    assert list(schema_values({"type": "integer", "exclusiveMinimum": 0})) == [1, 2]
+    assert list(schema_values({"type": "integer", "minimum": 0, "exclusiveMinimum": True, "maximum": 4})) == [1, 4, 2]
+    assert list(schema_values({"type": "string", "minLength": 2, "maxLength": 5})) == ["aa", "aaaaa"]
+    assert list(schema_values({"type": "string", "enum": ["open", "closed"], "example": "closed"})) == ["closed", "open"]
+    assert list(schema_values({"type": ["string", "null"], "format": "uuid"})) == [None, "00000000-0000-0000-0000-000000000000"]
+    assert list(schema_values({"type": "array", "items": {"type": "boolean"}, "minItems": 1, "maxItems": 3})) == [[True], [True, True, True]]
+
+def test_payload_cases():
+    schema = {"type": "object", "required": ["name"], "properties": {
+        "name": {"type": "string", "example": "ann"}, "age": {"type": "integer", "minimum": 0}, "role": {"enum": ["admin", "user"]}}}
+    cases = dict(payload_cases(schema))
+    assert cases["base"] == {"name": "ann", "age": 0, "role": "admin"}
+    assert cases["fields=name"] == {"name": "ann"}
+    assert cases["fields=name,age,role"] == cases["base"]
+    assert cases['role="user"'] == {"name": "ann", "age": 0, "role": "user"}
+    assert [label for label, _ in payload_cases(schema, optional_limit=2) if label.startswith("fields=")] == ["fields=name", "fields=name,age"]
+
+def test_param_ranges_are_lazy():
+    cases = param_cases({"id": 1, "page": 1}, ranges={"id": range(1, 10 ** 9), "page": range(1, 3)})
+    assert [params for _, params in itertools.islice(cases, 4)] == [{"id": 1, "page": 1}, {"id": 1, "page": 1}, {"id": 1, "page": 2}, {"id": 2, "page": 1}]
+
+def test_expand_dedupes():
+    endpoint = {"method": "GET", "path": "posts/{id}", "params": {"id": 1}, "payload": None, "expected_status": 200,
+                "param_schemas": {"id": {"type": "integer", "minimum": 1, "maximum": 3}}}
+    seen = set()
+    cases = list(expand(endpoint, {"id": range(1, 4)}, seen=seen))
+    assert [case["params"]["id"] for case in cases] == [1, 2, 3]
+    assert cases[1]["case"] == "params:id=2" and "param_schemas" not in cases[1]
+    assert list(expand(endpoint, seen=seen)) == []
+
+def test_expand_tests():
+    cases = list(Generator().expand_tests(SPEC))
+    assert len(cases) == len({(case["method"], case["path"], str(case["params"]), str(case["payload"])) for case in cases})
+    puts = [case for case in cases if case["method"] == "PUT"]
+    assert all("id" not in case["payload"] for case in puts)
+    assert {"payload": {"id": 1, "title": "", "body": "bar", "userId": 1}, "expected_status": 201} in \
+        [{"payload": case["payload"], "expected_status": case["expected_status"]} for case in cases if case["method"] == "POST"]
+    assert sum(1 for _ in Generator().expand_tests(SPEC, ranges={"id": range(1, 1001)}, max_cases=1500)) == 1500
+
+def test_stream_matrix():
+    with StubServer(SPEC) as stub:
+        api_forge = APIForge(stub.url, max_workers=4)
+        cases = Generator().expand_tests(SPEC, ranges={"id": range(1, 51)})
+        outcomes = list(api_forge.stream_generated_tests(cases))
+        assert all(success for _, _, success in outcomes)
+        assert stub.requests["PUT /posts/{id}"] == sum(1 for endpoint, _, _ in outcomes if endpoint["method"] == "PUT")
+        assert stub.requests["DELETE /posts/{id}"] >= 50
+        api_forge.close()
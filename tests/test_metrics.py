@@ -0,0 +1,65 @@
+import gc
+import threading
+import pytest
+import requests
+from apiforge.core import APIForge
+from apiforge.metrics import MetricsCollector, CONTENT_TYPE
+from apiforge.retry import RetryPolicy
+from apiforge.stub import StubServer, Faults
+
+SPEC = "configs/open_api_config.yaml"
+
+def test_collects_per_endpoint():
+    metrics = MetricsCollector(buckets=(0.5, 60))
+    with StubServer(SPEC, faults=Faults(fail_first=1, retry_after=0)) as stub:
+        api_forge = APIForge(stub.url, hooks=[metrics], retry_policy=RetryPolicy(max_attempts=2, base_delay=0))
+        api_forge.run_generated_tests(SPEC)
+        with pytest.raises(RuntimeError): api_forge.run_test("GET", "users")
+        api_forge.close()
+    text = metrics.render()
+    assert 'apiforge_requests_total{method="GET",endpoint="posts",outcome="pass",error=""} 1' in text
+    assert 'apiforge_requests_total{method="GET",endpoint="users",outcome="fail",error="ValueError"} 1' in text
+    assert 'apiforge_retries_total{method="PUT",endpoint="posts/{id}"} 1' in text
+    assert 'apiforge_request_duration_seconds_bucket{method="PUT",endpoint="posts/{id}",le="0.5"} 1' in text
+    assert 'apiforge_request_duration_seconds_bucket{method="PUT",endpoint="posts/{id}",le="+Inf"} 1' in text
+    assert 'apiforge_request_duration_seconds_count{method="DELETE",endpoint="posts/{id}"} 1' in text
+    assert text.startswith("# TYPE apiforge_requests counter\n") and text.endswith("# EOF\n")
+
+def test_thread_shards_merge():
+    metrics = MetricsCollector()
+    context = {"method": "GET", "endpoint": 'a"b\\c'}
+
+    def record():
+        for _ in range(1000): metrics.after_response(context, None, None, {"total": 0.02})
+
+    threads = [threading.Thread(target=record) for _ in range(8)]
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+    snapshot = metrics.snapshot()
+    assert snapshot["requests"][("GET", 'a"b\\c', "pass", "")] == 8000
+    latency = snapshot["latency"][("GET", 'a"b\\c')]
+    assert latency[1] == 0 and latency[2] == 8000 and latency[-1] == 8000
+    assert 'endpoint="a\\"b\\\\c"' in metrics.render()
+
+def test_exited_threads_retire_shards():
+    # Every run starts fresh worker threads, their shards are folded into one when the threads exit
+    metrics = MetricsCollector()
+    with StubServer(SPEC) as stub:
+        api_forge = APIForge(stub.url, hooks=[metrics], max_workers=2)
+        for _ in range(20): api_forge.run_generated_tests(SPEC)
+        api_forge.close()
+    gc.collect()
+    assert len(metrics._shards) <= 2
+    assert metrics.snapshot()["requests"][("GET", "posts", "pass", "")] == 20
+    assert metrics.snapshot()["latency"][("GET", "posts")][-1] == 20
+
+def test_file_and_endpoint(tmp_path):
+    metrics = MetricsCollector()
+    metrics.after_response({"method": "GET", "endpoint": "posts", "cache": "hit"}, [], None, {"total": 0.001})
+    path = tmp_path / "apiforge.prom"
+    metrics.write(str(path))
+    assert 'apiforge_http_cache_requests_total{result="hit"} 1' in path.read_text()
+    with metrics.serve(port=0) as server:
+        response = requests.get(server.url)
+        assert response.headers["Content-Type"] == CONTENT_TYPE and response.text == path.read_text()
+        assert requests.get(server.url.replace("/metrics", "/other")).status_code == 404
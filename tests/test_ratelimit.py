@@ -0,0 +1,84 @@
+import asyncio
+import time
+import pytest
+import yaml
+from apiforge.core import APIForge
+from apiforge.config import ConfigParser
+from apiforge.ratelimit import TokenBucket, AdaptiveConcurrency, RateLimiter, resolve_rate_limit
+from apiforge.retry import RetryPolicy
+
+def test_token_bucket():
+    bucket = TokenBucket(rate=10, burst=2)
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == pytest.approx(0.1, abs=0.01)
+    bucket.pause(1)
+    assert bucket.try_acquire() == pytest.approx(1, abs=0.01)
+
+def test_adaptive_concurrency():
+    concurrency = AdaptiveConcurrency(initial=2, min_limit=1, max_limit=4)
+    for _ in range(20):
+        assert concurrency.try_acquire()
+        concurrency.release(latency=0.01)
+    assert concurrency.limit == 4
+    assert concurrency.baseline == 0.01
+
+    # A burst of throttled responses counts as one congestion signal within a baseline latency
+    concurrency.baseline = 10
+    concurrency.try_acquire()
+    concurrency.release(throttled=True)
+    concurrency.try_acquire()
+    concurrency.release(throttled=True)
+    assert concurrency.limit == 2
+
+    concurrency.baseline = 0
+    concurrency.try_acquire()
+    concurrency.release(latency=5)
+    assert concurrency.limit == 1
+    assert concurrency.try_acquire()
+    assert not concurrency.try_acquire()
+
+def test_resolve_rate_limit():
+    section = {"rps": 10, "adaptive": True, "environments": {"staging": {"rps": 2}}}
+    assert resolve_rate_limit(section, "prod") == {"rps": 10, "adaptive": True}
+    assert resolve_rate_limit(section, "Staging") == {"rps": 2, "adaptive": True}
+    assert resolve_rate_limit(None, "prod") is None
+
+def test_rate_limit_config(tmp_path):
+    spec = yaml.safe_load(open("configs/open_api_config.yaml"))
+    spec["x-apiforge-rate-limit"] = {"rps": 5, "environments": {"Staging": {"rps": 1}}}
+    spec_file = tmp_path / "spec.yaml"
+    spec_file.write_text(yaml.safe_dump(spec))
+    assert ConfigParser.load_config(str(spec_file), "Production")["rate_limit"] == {"rps": 5}
+    assert ConfigParser.load_config(str(spec_file), "Staging")["rate_limit"] == {"rps": 1}
+    assert ConfigParser.load_config("configs/api_config.yaml")["rate_limit"] is None
+    assert APIForge.from_config(str(spec_file)).rate_limiter.settings == {"rps": 5}
+
+def test_rate_limited_run(local_api):
+    api_forge = APIForge(local_api, max_workers=4, rate_limit={"rps": 20, "burst": 1, "adaptive": True, "max_concurrency": 4})
+    start = time.monotonic()
+    for _ in range(3): api_forge.run_generated_tests(spec="configs/open_api_config.yaml")
+    assert time.monotonic() - start >= 0.5
+    snapshot = api_forge.rate_limiter.snapshot()[local_api.split("//")[1]]
+    assert snapshot["rps"] == 20
+    assert 1 <= snapshot["concurrency_limit"] <= 4
+    assert snapshot["in_flight"] == 0
+
+def test_throttling_backs_off(local_api):
+    api_forge = APIForge(local_api, retry_policy=RetryPolicy(max_attempts=1), rate_limit={"adaptive": True, "initial_concurrency": 8, "max_concurrency": 8})
+    with pytest.raises(RuntimeError): api_forge.run_test("GET", "status/429")
+    limiter = api_forge.rate_limiter.host(local_api.split("//")[1])
+    assert limiter.concurrency.limit == 4
+
+def test_limiter_isolated_per_host():
+    limiter = RateLimiter({"rps": 1, "burst": 1})
+    assert limiter.host("a").try_acquire() == 0
+    assert limiter.host("b").try_acquire() == 0
+    assert limiter.host("a").try_acquire() > 0
+
+def test_rate_limited_async_run(local_api):
+    api_forge = APIForge(local_api, rate_limit={"rps": 20, "burst": 1, "adaptive": True, "max_concurrency": 2})
+    start = time.monotonic()
+    results = asyncio.run(api_forge.run_generated_tests_async(spec="configs/open_api_config.yaml"))
+    assert time.monotonic() - start >= 0.15
+    assert not any("error" in result for result in results if isinstance(result, dict))
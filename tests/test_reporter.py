@@ -0,0 +1,74 @@
+import gc
+import json
+import logging
+import weakref
+import xml.etree.ElementTree as ET
+from apiforge.core import APIForge
+from apiforge.reporter import Reporter
+from apiforge.sink import BackgroundSink
+
+def test_results_written(local_api, tmp_path):
+    reporter = Reporter(str(tmp_path), junit=True)
+    api_forge = APIForge(local_api)
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text(
+        f"base_url: {local_api}\n"
+        "endpoints:\n"
+        "  - {method: GET, path: posts/1, expected_status: 200, expected_keys: [id]}\n"
+        "  - {method: GET, path: posts/1, expected_status: 200, expected_keys: [missing]}\n"
+    )
+    api_forge.run_config_tests(str(config_file), reporter=reporter)
+    assert reporter.summary() == {"passed": 1, "failed": 1}
+    reporter.close()
+
+    # Both reads run in parallel, so records arrive in completion order
+    records = sorted((json.loads(line) for line in (tmp_path / "results.jsonl").read_text().splitlines()), key=lambda record: not record["success"])
+    assert [record["success"] for record in records] == [True, False]
+    assert records[0]["endpoint"] == "posts/1" and records[0]["method"] == "GET"
+    assert "response" not in records[0]
+    assert records[1]["error"] == "Response validation failed: missing expected keys"
+
+    suite = ET.parse(tmp_path / "junit.xml").getroot().find("testsuite")
+    assert suite.get("tests") == "2" and suite.get("failures") == "1"
+    assert len(suite.findall("testcase")) == 2
+    assert not (tmp_path / "junit.xml.body").exists()
+
+def test_logging_off_worker_threads(tmp_path, caplog):
+    reporter = Reporter(str(tmp_path), write_results=False)
+    with caplog.at_level(logging.INFO, logger="APIForge"):
+        reporter.log_generic_output("hello", method="test")
+        reporter.log_api_result({"method": "GET", "endpoint": "posts", "params": {}}, {"id": 1}, True)
+        reporter.log_error("test", "boom")
+        reporter.flush()
+    assert "[INFO] test -> hello" in caplog.text
+    assert "Test GET posts [{}]: PASS" in caplog.text
+    assert "test: boom" in caplog.text
+    assert {record.threadName for record in caplog.records} == {"APIForge-sink"}
+    assert not (tmp_path / "results.jsonl").exists()
+    reporter.close()
+
+def test_closed_reporter_released(tmp_path):
+    reporter = Reporter(str(tmp_path), junit=True)
+    reporter.close()
+    ref = weakref.ref(reporter)
+    del reporter
+    gc.collect()
+    assert ref() is None
+
+def test_sink_batches_and_bounds():
+    class Collect:
+        def __init__(self): self.batches = []
+        def write(self, records): self.batches.append(len(records))
+        def flush(self): pass
+        def close(self): pass
+
+    class Broken(Collect):
+        def write(self, records): raise IOError("disk full")
+
+    collect = Collect()
+    sink = BackgroundSink([Broken(), collect], queue_size=4, batch_size=3, flush_interval=60)
+    for i in range(10): sink.submit({"type": "result", "i": i})
+    sink.close()
+    assert sum(collect.batches) == 10
+    assert max(collect.batches) <= 3
+    assert sink.errors == len(collect.batches)
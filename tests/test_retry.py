@@ -0,0 +1,64 @@
+import time
+import pytest
+import requests
+from apiforge.core import APIForge
+from apiforge.retry import RetryPolicy, RetryBudget, RetryState, RetryLater, RetriesExhausted, UnexpectedStatus, parse_retry_after
+
+def test_backoff_bounds():
+    policy = RetryPolicy(base_delay=0.5, max_delay=3, multiplier=2)
+    for attempt in range(1, 8):
+        for _ in range(50):
+            assert 0 <= policy.backoff(attempt) <= min(3, 0.5 * 2 ** (attempt - 1))
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    assert 0 <= parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+    assert 55 < parse_retry_after(time.strftime("%a, %d %b %Y %H:%M:%S GMT", time.gmtime(time.time() + 60))) <= 60
+
+def test_retry_decisions():
+    policy = RetryPolicy(max_attempts=2)
+    state = RetryState()
+    policy.start_attempt(state, "host")
+    # Non retryable errors are returned to the caller untouched
+    policy.raise_for_retry(UnexpectedStatus("Expected 200, got 500", 500), state, "host")
+    with pytest.raises(RetryLater) as retry:
+        policy.raise_for_retry(UnexpectedStatus("Expected 200, got 429", 429, retry_after=4), state, "host")
+    assert retry.value.delay >= 4
+    policy.start_attempt(state, "host")
+    with pytest.raises(RetriesExhausted):
+        policy.raise_for_retry(requests.ConnectionError("down"), state, "host")
+
+def test_retry_budget():
+    budget = RetryBudget(ratio=0.5, min_per_second=0, max_tokens=2)
+    policy = RetryPolicy(max_attempts=10, base_delay=0, budget=budget)
+    assert budget.tokens("host") == 0
+    for _ in range(4): budget.record_request("host")
+    assert budget.tokens("host") == 2
+    state = RetryState()
+    for _ in range(2):
+        policy.start_attempt(state, "host")
+        with pytest.raises(RetryLater): policy.raise_for_retry(requests.Timeout(), state, "host")
+    policy.start_attempt(state, "host")
+    with pytest.raises(RetriesExhausted): policy.raise_for_retry(requests.Timeout(), state, "host")
+    assert budget.tokens("other") == 0
+
+def test_retry_after_honoured(local_api):
+    api_forge = APIForge(local_api, retry_policy=RetryPolicy(max_attempts=2, base_delay=0))
+    start = time.monotonic()
+    with pytest.raises(RuntimeError, match="API request failed after retries: Expected 200, got 503"):
+        api_forge.run_test("GET", "status/503", params={"retry_after": 0.3})
+    assert time.monotonic() - start >= 0.3
+
+def test_retries_release_workers(local_api, mocker):
+    # A single worker keeps serving other endpoints while the flaky one waits for its retries
+    api_forge = APIForge(local_api, max_workers=1, retry_policy=RetryPolicy(max_attempts=3, base_delay=0))
+    reporter = mocker.MagicMock()
+    endpoints = [{"method": "GET", "path": "status/429", "params": {"retry_after": 0.2}, "expected_status": 200}]
+    endpoints += [{"method": "GET", "path": "posts/1", "expected_status": 200}] * 5
+    results, successes = api_forge._execute(endpoints, reporter)
+    assert successes == [False] + [True] * 5
+    assert results[0] == {"error": "API request failed after retries: Expected 200, got 429: {\"status\": 429}"}
+    outcomes = [call.kwargs["success"] for call in reporter.log_api_result.call_args_list]
+    assert outcomes == [True] * 5 + [False]
@@ -0,0 +1,106 @@
+import asyncio
+import pytest
+import yaml
+from apiforge.core import APIForge
+from apiforge.scheduler import DependencyGraph, DependencyTracker, StreamTracker, extract
+
+def endpoints(*specs):
+    return [{"method": method, "path": path, **extra} for method, path, extra in specs]
+
+def test_resource_ordering():
+    graph = DependencyGraph(endpoints(
+        ("GET", "posts", {}), ("GET", "posts/1", {}), ("POST", "posts", {}), ("GET", "posts", {}),
+        ("DELETE", "posts/1", {}), ("GET", "users", {})
+    ))
+    # Reads run together, a write waits for the reads before it and the reads after it wait for the write
+    assert graph.dependencies == [set(), set(), {0, 1}, {2}, {2, 3}, set()]
+    assert graph.roots() == [0, 1, 5]
+    assert DependencyGraph(graph.endpoints, order_resources=False).roots() == list(range(6))
+
+def test_explicit_and_captured_dependencies():
+    graph = DependencyGraph(endpoints(
+        ("PUT", "posts/{id}", {}), ("POST", "posts", {"id": "create", "capture": {"id": "id"}}),
+        ("GET", "users", {"params": {"post": "{id}"}, "depends_on": "create"}), ("GET", "comments", {"depends_on": ["PUT posts/{id}"]})
+    ), order_resources=False)
+    assert graph.dependencies == [{1}, set(), {1}, {0}]
+    with pytest.raises(RuntimeError, match="Unknown dependency 'missing'"):
+        DependencyGraph(endpoints(("GET", "posts", {"depends_on": ["missing"]})))
+    with pytest.raises(RuntimeError, match="Dependency cycle"):
+        DependencyGraph(endpoints(("GET", "a", {"id": "a", "depends_on": ["b"]}), ("GET", "b", {"id": "b", "depends_on": ["a"]})))
+
+def test_bind_and_failures():
+    tracker = DependencyTracker(DependencyGraph(endpoints(
+        ("POST", "posts", {"capture": {"post_id": "id", "first_tag": "tags.0"}}),
+        ("GET", "posts/{post_id}/tags/{tag}", {"params": {"tag": "{first_tag}", "q": "post-{post_id}"}})
+    )))
+    assert tracker.complete(0, {"id": 11, "tags": ["a"]}, True) == [1]
+    assert tracker.bind(1)["params"] == {"tag": "a", "q": "post-11", "post_id": 11}
+    assert tracker.blocked_by(1) is None
+    tracker.complete(0, {}, True)
+    assert tracker.blocked_by(1) == "POST posts"
+    # A failed write only skips what requires it, not the reads ordered after it on the same collection
+    tracker = DependencyTracker(DependencyGraph(endpoints(("POST", "posts", {}), ("GET", "posts", {}))))
+    assert tracker.complete(0, None, False) == [1]
+    assert tracker.blocked_by(1) is None
+    assert extract({"data": [{"id": 3}]}, "data.-1.id") == 3
+
+def test_captured_per_producer():
+    # Two producers capture id, each consumer gets the value of the producer it depends on
+    chain = endpoints(("POST", "users", {"capture": {"id": "id"}}), ("GET", "users/{id}", {}), ("POST", "posts", {"capture": {"id": "id"}}))
+    tracker = DependencyTracker(DependencyGraph(chain, order_resources=False))
+    tracker.complete(0, {"id": 1}, True)
+    tracker.complete(2, {"id": 2}, True)
+    assert tracker.bind(1)["params"] == {"id": 1}
+    stream = StreamTracker(order_resources=False)
+    for endpoint in chain: stream.admit(endpoint)
+    stream.complete(0, {"id": 1}, True)
+    stream.complete(2, {"id": 2}, True)
+    assert stream.bind(1)["params"] == {"id": 1}
+
+def write_config(tmp_path, base_url, endpoints):
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text(yaml.safe_dump({"base_url": base_url, "endpoints": endpoints}))
+    return str(config_file)
+
+CHAIN = [
+    {"method": "POST", "path": "posts", "expected_status": 201, "payload": {"title": "foo"}, "capture": {"id": "id"}},
+    {"method": "PUT", "path": "posts/{id}", "expected_status": 200, "payload": {"title": "bar"}, "expected_keys": ["id"]},
+    {"method": "DELETE", "path": "posts/{id}", "expected_status": 200},
+    {"method": "GET", "path": "status/500", "expected_status": 200, "id": "broken"},
+    {"method": "GET", "path": "status/200", "expected_status": 200, "depends_on": ["broken"]}
+]
+
+def test_config_chain(local_api, tmp_path):
+    results = APIForge(local_api).run_config_tests(write_config(tmp_path, local_api, CHAIN))
+    assert results[0]["id"] == 11 and results[1] == {**results[1], "id": 11, "title": "bar"} and results[2] == {}
+    assert results[4] == {"error": "Skipped: dependency broken failed"}
+
+def test_config_chain_async(local_api, tmp_path):
+    results = asyncio.run(APIForge(local_api).run_config_tests_async(write_config(tmp_path, local_api, CHAIN)))
+    assert results[1]["id"] == 11 and results[2] == {}
+    assert results[4] == {"error": "Skipped: dependency broken failed"}
+
+def test_stream_tracker():
+    tracker = StreamTracker()
+    assert tracker.admit(CHAIN[0]) == (0, True)
+    assert tracker.admit({"method": "GET", "path": "posts"}) == (1, False)
+    assert tracker.admit(CHAIN[1]) == (2, False)
+    assert tracker.complete(0, {"id": 11}, True) == [1]
+    assert tracker.complete(1, [], True) == [2]
+    assert tracker.bind(2)["params"] == {"id": 11}
+    tracker.complete(2, {}, True)
+    assert tracker.admit(CHAIN[3]) == (3, True)
+    assert tracker.admit(CHAIN[4]) == (4, False)
+    assert tracker.complete(3, {}, False) == [4]
+    assert tracker.blocked_by(4) == "broken"
+    tracker.complete(4, {}, False)
+    # Only what a later endpoint could still refer to is kept
+    assert not tracker.endpoints and not tracker.waiting and set(tracker.outcomes) <= set(tracker.latest.values())
+    with pytest.raises(RuntimeError, match="can only depend on earlier ones"): tracker.admit({"method": "GET", "path": "a", "depends_on": "later"})
+
+def test_stream_chain(local_api):
+    api_forge = APIForge(local_api)
+    # Yielded in completion order, independent endpoints may finish in any order
+    results = {f"{endpoint['method']} {endpoint['path']}": result for endpoint, result, _ in api_forge.stream_generated_tests(iter(CHAIN), max_in_flight=2)}
+    assert len(results) == len(CHAIN)
+    assert results["PUT posts/{id}"]["id"] == 11 and results["GET status/200"] == {"error": "Skipped: dependency broken failed"}
@@ -0,0 +1,49 @@
+import json
+import pytest
+from apiforge.cli import main
+from apiforge.core import APIForge
+from apiforge.generator import TestGenerator as Generator
+from apiforge.reporter import Reporter
+from apiforge.shard import parse_shard, shard_indexes, merge_reports
+
+SPEC = "configs/open_api_config.yaml"
+
+def test_parse_shard():
+    assert parse_shard("2/4") == (2, 4)
+    for value in ("0/4", "5/4", "1/0", "a/b", "1"):
+        with pytest.raises(ValueError): parse_shard(value)
+
+def test_partition():
+    endpoints = [{"method": "GET", "path": f"collection{i % 7}/{{id}}", "params": {"id": i}} for i in range(50)]
+    endpoints += [{"method": "POST", "path": "posts"}, {"method": "DELETE", "path": "posts/1"}]
+    shards = [shard_indexes(endpoints, index, 4) for index in range(1, 5)]
+    assert sorted(index for shard in shards for index in shard) == list(range(len(endpoints)))
+    assert shards == [shard_indexes(endpoints, index, 4) for index in range(1, 5)]
+    # POST and DELETE on posts are ordered, so they stay on one shard
+    assert any({50, 51} <= set(shard) for shard in shards)
+    assert max(map(len, shards)) - min(map(len, shards)) <= 2
+
+def test_sharded_runs(local_api, tmp_path):
+    api_forge = APIForge(local_api)
+    expected = api_forge.run_generated_tests(SPEC)
+    total = len(Generator().generate_tests(SPEC))
+    shard_results = [api_forge.run_generated_tests(SPEC, shard=(index, 2)) for index in (1, 2)]
+    assert sum(map(len, shard_results)) == total
+
+    reporter = Reporter(str(tmp_path))
+    assert api_forge.run_generated_tests_multiprocess(SPEC, processes=2, reporter=reporter) == expected
+    assert reporter.summary() == {"passed": total, "failed": 0}
+    assert api_forge.last_connection_stats["requests"] == total
+    reporter.close()
+    records = [json.loads(line) for line in (tmp_path / "results.jsonl").read_text().splitlines()]
+    assert len(records) == total and all(record["thread"].startswith("shard-") and record["timings"]["total"] > 0 for record in records)
+
+def test_cli_shards_and_merge(local_api, tmp_path, capsys):
+    for index in (1, 2):
+        assert main(["run", SPEC, "--base-url", local_api, "--shard", f"{index}/2", "--output", str(tmp_path / f"shard-{index}")]) == 0
+    assert main(["merge", str(tmp_path / "shard-1"), str(tmp_path / "shard-2"), "--output", str(tmp_path / "merged")]) == 0
+    summary = json.loads(capsys.readouterr().out.strip().splitlines()[-1])
+    assert summary["passed"] == len(Generator().generate_tests(SPEC)) and summary["failed"] == 0 and summary["shards"] == 2
+    assert (tmp_path / "merged" / "junit.xml").exists()
+    assert len((tmp_path / "merged" / "results.jsonl").read_text().splitlines()) == summary["passed"]
+    with pytest.raises(RuntimeError, match="does not exist"): merge_reports([str(tmp_path / "missing")], str(tmp_path / "out"))
@@ -0,0 +1,111 @@
+import json
+import threading
+import pytest
+import yaml
+from apiforge import core
+from apiforge.core import APIForge
+from apiforge.slo import Baseline, LatencyRecorder, PerformanceError, percentile
+from apiforge.stub import StubServer, Faults
+
+SPEC = "configs/open_api_config.yaml"
+
+def slow_spec(p95_ms):
+    with open(SPEC) as f: spec = yaml.safe_load(f)
+    spec["paths"]["/posts"]["get"]["x-apiforge-p95-ms"] = p95_ms
+    return spec
+
+def test_percentile():
+    assert percentile([], 95) == 0.0
+    assert percentile([5.0, 1.0, 3.0], 50) == 3.0
+    assert percentile(list(range(1, 101)), 95) == 95
+
+def test_max_latency_ms():
+    with StubServer(SPEC, faults=Faults(latency=0.05)) as stub:
+        api_forge = APIForge(stub.url)
+        with pytest.raises(RuntimeError, match=r"API test failed: Latency \d+\.\dms exceeded max_latency_ms 10"):
+            api_forge.run_test("GET", "posts", max_latency_ms=10)
+        assert api_forge.run_test("GET", "posts", max_latency_ms=5000)[0]["id"] == 1
+        api_forge.close()
+
+def test_latency_excludes_throttling():
+    # Waiting on the client's own rate limiter isn't server latency
+    recorder = LatencyRecorder()
+    with StubServer(SPEC) as stub:
+        api_forge = APIForge(stub.url, rate_limit={"rps": 2, "burst": 1}, hooks=[recorder])
+        for _ in range(3): api_forge.run_test("GET", "posts", max_latency_ms=200)
+        api_forge.close()
+    assert len(recorder.samples["GET posts"]) == 3 and max(recorder.samples["GET posts"]) < 200
+
+def test_p95_slo():
+    with StubServer(SPEC, faults=Faults(latency=0.03)) as stub:
+        api_forge = APIForge(stub.url)
+        with pytest.raises(PerformanceError, match=r"Performance check failed: GET posts p95 \d+\.\dms > p95_ms 5$") as failed:
+            api_forge.run_generated_tests(slow_spec(5))
+        assert all("error" not in result for result in failed.value.results) and len(failed.value.results) == 4
+        assert failed.value.performance is api_forge.last_performance and api_forge.last_performance["passed"] is False
+        assert [violation["endpoint"] for violation in api_forge.last_performance["slo_violations"]] == ["GET posts"]
+        api_forge.run_generated_tests(slow_spec(5000))
+        assert api_forge.last_performance == {"passed": True, "slo_violations": [], "regressions": []}
+        api_forge.run_generated_tests(SPEC)
+        assert api_forge.last_performance is None
+        api_forge.close()
+
+def test_concurrent_runs_record_separately(monkeypatch):
+    # Two runs on one APIForge each only see their own requests, and the instance's hooks are left alone
+    recorders = []
+
+    class TrackedRecorder(LatencyRecorder):
+        def __init__(self):
+            super().__init__()
+            recorders.append(self)
+
+    monkeypatch.setattr(core, "LatencyRecorder", TrackedRecorder)
+    with StubServer(SPEC, faults=Faults(latency=0.02)) as stub:
+        api_forge = APIForge(stub.url)
+        runs = [threading.Thread(target=api_forge.run_generated_tests, args=(slow_spec(5000),)) for _ in range(2)]
+        for run in runs: run.start()
+        for run in runs: run.join()
+        assert api_forge.hooks == []
+        api_forge.close()
+    assert len(recorders) == 2
+    for recorder in recorders: assert {name: len(samples) for name, samples in recorder.samples.items()} == {"GET posts": 1, "POST posts": 1, "PUT posts/{id}": 1, "DELETE posts/{id}": 1}
+
+def test_baseline(tmp_path):
+    path = str(tmp_path / "baseline.json")
+    with StubServer(SPEC) as stub:
+        api_forge = APIForge(stub.url)
+        api_forge.run_generated_tests(SPEC, baseline=Baseline(path, update=True))
+        api_forge.run_generated_tests(SPEC, baseline=Baseline(path, update=True))
+        assert api_forge.last_performance["passed"] is True
+        api_forge.close()
+    with open(path) as f: stored = json.load(f)
+    assert set(stored["endpoints"]) == {"GET posts", "POST posts", "PUT posts/{id}", "DELETE posts/{id}"}
+    assert len(stored["endpoints"]["GET posts"]["p95_ms"]) == 2
+    with StubServer(SPEC, faults=Faults(latency=0.05)) as stub:
+        api_forge = APIForge(stub.url)
+        with pytest.raises(PerformanceError, match="above the baseline"): api_forge.run_generated_tests(SPEC, baseline=Baseline(path))
+        assert api_forge.last_performance["passed"] is False
+        assert len(api_forge.last_performance["regressions"]) == 4
+        api_forge.run_generated_tests(SPEC, baseline=Baseline(path, mode="warn", threshold=1000.0))
+        assert api_forge.last_performance["passed"] is True and api_forge.last_performance["regressions"] == []
+        api_forge.run_generated_tests(SPEC, baseline=Baseline(path, mode="warn"))
+        assert api_forge.last_performance["passed"] is True and len(api_forge.last_performance["regressions"]) == 4
+        api_forge.close()
+    with open(path) as f: assert json.load(f) == stored
+
+def test_baseline_history(tmp_path):
+    baseline = Baseline(str(tmp_path / "baseline.json"), history=3)
+    recorder = LatencyRecorder()
+    for value in (10, 20, 30, 40):
+        recorder.samples = {"GET posts": [value]}
+        baseline.record(recorder)
+    assert baseline.endpoints["GET posts"]["p95_ms"] == [20, 30, 40]
+    recorder.samples = {"GET posts": [35.0]}
+    assert baseline.compare(recorder) == []
+    recorder.samples = {"GET posts": [37.0]}
+    assert [regression["baseline_ms"] for regression in baseline.compare(recorder)] == [30]
+    assert Baseline(str(tmp_path / "other.json"), threshold=0.2, min_delta_ms=0).compare(recorder) == []
+    baseline.save()
+    with open(baseline.path, "w") as f: json.dump({"version": 0}, f)
+    with pytest.raises(RuntimeError, match="version 0 baseline"): Baseline(baseline.path)
+    with pytest.raises(RuntimeError, match="Unknown baseline mode"): Baseline(baseline.path + ".new", mode="block")
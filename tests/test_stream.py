@@ -0,0 +1,75 @@
+import asyncio
+import json
+import pytest
+from apiforge.core import APIForge
+from apiforge.stream import JSONArrayParser, StreamValidator
+from apiforge.utils import ResponseValidator
+
+def chunks(data: bytes, size: int):
+    for start in range(0, len(data), size): yield data[start:start + size]
+
+def parse(data: bytes, size: int):
+    parser = JSONArrayParser()
+    items = []
+    for chunk in chunks(data, size): items.extend(parser.feed(chunk))
+    items.extend(parser.feed(b"", final=True))
+    return parser, items
+
+def test_parser_chunk_boundaries():
+    body = [{"id": 12345, "title": "café ☃", "tags": ["a", "b"], "nested": {"x": [1.5, None, True]}}, 7, "s", [], {}]
+    data = json.dumps(body, ensure_ascii=False).encode()
+    for size in (1, 2, 3, 7, len(data)):
+        parser, items = parse(data, size)
+        assert items == body and parser.state == "end"
+    assert parse(b" [ ] ", 1)[1] == []
+
+def test_parser_non_array_and_errors():
+    parser, items = parse(b'{"id": 1}', 3)
+    assert items == [] and parser.state == "value" and parser.value == {"id": 1}
+    for data in (b"[1, 2", b"[1 2]", b"[1] 2", b""):
+        with pytest.raises(ValueError):
+            parse(data, 2)
+
+def test_parser_memory_bounded():
+    parser = JSONArrayParser()
+    item = json.dumps({"id": 1, "title": "x" * 100}).encode()
+    count = largest = 0
+    for chunk in chunks(b"[" + b",".join([item] * 20000) + b"]", 4096):
+        count += len(parser.feed(chunk))
+        largest = max(largest, len(parser._buffer))
+    count += len(parser.feed(b"", final=True))
+    assert count == 20000 and largest < 4096 + len(item)
+
+def test_validator_sampling():
+    data = json.dumps([{"id": i} for i in range(101)] + [{"other": 1}]).encode()
+    validator = StreamValidator(ResponseValidator(["id"]), first=10)
+    assert any(validator.feed(chunk) for chunk in chunks(data, 64))
+    assert validator.valid and validator.validated == 10 and not validator.complete
+
+    validator = StreamValidator(ResponseValidator(["id"]), every=25)
+    for chunk in chunks(data, 64): validator.feed(chunk)
+    validator.feed(b"", final=True)
+    assert validator.valid and validator.validated == 5 and validator.items == 102
+
+    validator = StreamValidator(ResponseValidator(["id"]))
+    for chunk in chunks(data, 64): validator.feed(chunk)
+    validator.feed(b"", final=True)
+    assert not validator.valid and validator.invalid_index == 101
+
+    validator = StreamValidator(ResponseValidator(["id"]))
+    validator.feed(b"[]", final=True)
+    assert not validator.valid
+
+def test_streamed_run_test(local_api):
+    api_forge = APIForge(local_api)
+    result = api_forge.run_test("GET", "posts", expected_keys=["id", "title"], stream={"every": 2})
+    assert result == {"streamed": True, "array": True, "items": 10, "validated": 5, "complete": True, "invalid_index": None}
+    with pytest.raises(RuntimeError, match="Response validation failed"):
+        api_forge.run_test("GET", "posts", expected_keys=["missing"], stream=True)
+
+    async def run():
+        import httpx
+        async with httpx.AsyncClient() as client:
+            return await api_forge.run_test_async(client, "GET", "posts", expected_keys=["id"], stream={"first": 3})
+    result = asyncio.run(run())
+    assert result["validated"] == 3 and result["items"] >= 3
@@ -0,0 +1,45 @@
+import pytest
+import requests
+from apiforge.core import APIForge
+from apiforge.retry import RetryPolicy
+from apiforge.stub import StubServer, StubRoutes, Faults, example_from_schema
+
+SPEC = "configs/open_api_config.yaml"
+
+def test_example_from_schema():
+    schema = {"type": "object", "properties": {
+        "id": {"type": "integer", "minimum": 5}, "state": {"enum": ["open", "closed"]}, "tags": {"type": "array", "items": {"type": "string"}},
+        "owner": {"allOf": [{"properties": {"name": {"type": "string", "example": "ann"}}}, {"properties": {"email": {"type": "string", "format": "email"}}}]},
+        "score": {"type": ["null", "number"]}
+    }}
+    assert example_from_schema(schema) == {"id": 5, "state": "open", "tags": ["xxxxxx"], "owner": {"name": "ann", "email": "user@example.com"}, "score": 0.0}
+
+def test_routes():
+    routes = StubRoutes(SPEC)
+    assert routes.match("GET", "/posts/7")[0] == "/posts/{id}"
+    assert routes.match("POST", "/posts/7") == ("/posts/{id}", None)
+    assert routes.match("GET", "/users") == (None, None)
+    status, body = routes.match("POST", "/posts")[1]
+    assert status == 201 and body == b'{"id": 1, "title": "foo", "body": "bar", "userId": 1}'
+
+def test_generated_tests_against_stub():
+    with StubServer(SPEC) as stub:
+        api_forge = APIForge(stub.url)
+        results = api_forge.run_generated_tests(SPEC)
+        assert all("error" not in result for result in results)
+        assert stub.requests == {"GET /posts": 1, "POST /posts": 1, "PUT /posts/{id}": 1, "DELETE /posts/{id}": 1}
+        assert requests.get(f"{stub.url}/users").status_code == 404
+        api_forge.close()
+
+def test_injected_faults():
+    with StubServer(SPEC, faults=Faults(fail_first=2, retry_after=0, error_status=503)) as stub:
+        api_forge = APIForge(stub.url, retry_policy=RetryPolicy(max_attempts=3, base_delay=0))
+        assert api_forge.run_test("GET", "posts")[0]["title"] == "foo"
+        assert stub.requests["GET /posts"] == 3
+        api_forge.close()
+    with StubServer(SPEC, faults=Faults(latency=0.3)) as stub:
+        api_forge = APIForge(stub.url, read_timeout=0.05, retry_policy=RetryPolicy(max_attempts=1))
+        with pytest.raises(RuntimeError, match="timed out"): api_forge.run_test("GET", "posts")
+        api_forge.close()
+    faults = [Faults(error_rate=0.5, seed=3) for _ in range(2)]
+    assert [faults[0].should_fail("GET /posts") for _ in range(20)] == [faults[1].should_fail("GET /posts") for _ in range(20)]
@@ -0,0 +1,166 @@
+import asyncio
+import json
+import socket
+import ssl
+import threading
+import httpx
+import pytest
+import requests
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from h2.config import H2Configuration
+from h2.connection import H2Connection
+from h2.events import RequestReceived, DataReceived, StreamEnded, ConnectionTerminated
+from apiforge.config import ConfigParser
+from apiforge.core import APIForge
+from apiforge.retry import RetryPolicy
+from apiforge.stub import StubServer
+from apiforge.transport import _ssl_context
+
+POSTS = [{"id": 1, "title": "foo", "body": "bar", "userId": 1}]
+
+class H2CServer:
+    # Cleartext HTTP/2 server answering every stream after delay seconds, records connections and concurrent streams
+    def __init__(self, delay: float = 0.1):
+        self.delay = delay
+        self.connections = 0
+        self.max_streams = 0
+        self.paths = []
+        self._sock = socket.create_server(("127.0.0.1", 0))
+        self._lock = threading.Lock()
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._sock.getsockname()[1]}"
+
+    def _accept(self):
+        while True:
+            try: conn, _ = self._sock.accept()
+            except OSError: return
+            with self._lock: self.connections += 1
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _respond(self, conn, h2, lock, streams, stream_id, path):
+        status, body = (503, {"status": 503}) if path.startswith("/status/503") else (200, POSTS)
+        body = json.dumps(body).encode()
+        with lock:
+            streams.discard(stream_id)
+            h2.send_headers(stream_id, [(":status", str(status)), ("content-type", "application/json"), ("content-length", str(len(body)))])
+            h2.send_data(stream_id, body, end_stream=True)
+            conn.sendall(h2.data_to_send())
+
+    def _serve(self, conn):
+        h2 = H2Connection(H2Configuration(client_side=False, header_encoding="utf-8"))
+        lock = threading.Lock()
+        streams, paths = set(), {}
+        with lock:
+            h2.initiate_connection()
+            conn.sendall(h2.data_to_send())
+        while True:
+            data = conn.recv(65535)
+            if not data: break
+            with lock:
+                for event in h2.receive_data(data):
+                    if isinstance(event, RequestReceived):
+                        paths[event.stream_id] = dict(event.headers)[":path"]
+                        streams.add(event.stream_id)
+                        self.max_streams = max(self.max_streams, len(streams))
+                    elif isinstance(event, DataReceived):
+                        h2.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+                    elif isinstance(event, StreamEnded):
+                        self.paths.append(paths[event.stream_id])
+                        threading.Timer(self.delay, self._respond, (conn, h2, lock, streams, event.stream_id, paths[event.stream_id])).start()
+                    elif isinstance(event, ConnectionTerminated):
+                        conn.close()
+                        return
+                conn.sendall(h2.data_to_send())
+
+    def close(self):
+        self._sock.close()
+
+@pytest.fixture
+def h2c_server():
+    server = H2CServer()
+    yield server
+    server.close()
+
+def test_multiplexed(h2c_server):
+    api_forge = APIForge(h2c_server.url, max_workers=10, http2="prior_knowledge")
+    endpoints = [{"method": "GET", "path": "posts", "expected_status": 200, "expected_keys": ["id"], "params": {"page": index}} for index in range(20)]
+    results, successes = api_forge._execute(api_forge._compile_validators(endpoints), None)
+    assert all(successes) and results[0] == POSTS
+    assert h2c_server.connections == 1 and h2c_server.max_streams > 1
+    assert api_forge.connection_stats() == {"requests": 20, "connections_opened": 1, "connections_reused": 19}
+    api_forge.close()
+
+def test_same_semantics(h2c_server):
+    api_forge = APIForge(h2c_server.url, http2="prior_knowledge", retry_policy=RetryPolicy(max_attempts=2, base_delay=0))
+    assert api_forge.send_request(f"{h2c_server.url}/posts", "GET") == POSTS
+    assert api_forge.run_test("GET", "posts", stream=True)["items"] == 1
+    with pytest.raises(RuntimeError, match=r"API request failed after retries: Expected 200, got 503: \{\"status\": 503\}"):
+        api_forge.run_test("GET", "status/503")
+    assert h2c_server.paths.count("/status/503") == 2
+    api_forge.close()
+
+def test_async_multiplexed(h2c_server):
+    api_forge = APIForge(h2c_server.url, http2="prior_knowledge")
+
+    async def run():
+        async with httpx.AsyncClient(transport=api_forge.transport.async_transport(httpx.Limits(max_connections=10))) as client:
+            return await asyncio.gather(*(api_forge.run_test_async(client, "GET", "posts") for _ in range(10)))
+
+    assert asyncio.run(run()) == [POSTS] * 10
+    assert h2c_server.connections == 1 and h2c_server.max_streams > 1
+    api_forge.close()
+
+def test_http1_fallback_and_errors():
+    # Without prior knowledge HTTP/2 is only negotiated over TLS, plain http stays on HTTP/1.1
+    with StubServer("configs/open_api_config.yaml") as stub:
+        api_forge = APIForge(stub.url, http2=True)
+        assert api_forge.run_test("GET", "posts")[0]["title"] == "foo"
+        assert api_forge._session.get(f"{stub.url}/posts").http_version == "HTTP/1.1"
+        api_forge.close()
+    listener = socket.create_server(("127.0.0.1", 0))
+    port = listener.getsockname()[1]
+    listener.close()
+    api_forge = APIForge(f"http://127.0.0.1:{port}", http2=True, retry_policy=RetryPolicy(max_attempts=1))
+    with pytest.raises(requests.ConnectionError): api_forge._session.get(f"{api_forge.base_url}/posts")
+    api_forge.close()
+    with pytest.raises(RuntimeError, match="Unknown http2 setting"): APIForge("http://localhost", http2="h3")
+
+def test_http2_per_environment(tmp_path):
+    config = tmp_path / "config.yaml"
+    config.write_text("base_url: http://localhost\ntransport:\n  http2: true\n  environments:\n    staging:\n      http2: false\nendpoints: []\n")
+    assert ConfigParser.load_config(str(config), "prod")["transport"] == {"http2": True}
+    assert APIForge.from_config(str(config), "staging").http2 is False
+
+def test_verify_cert_and_proxies(monkeypatch):
+    # Proxies from the environment reach the HTTP/2 adapter through requests, like they do HTTP/1.1
+    class ProxyHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            proxied.append(self.path)
+            body = json.dumps(POSTS).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    proxied = []
+    proxy = ThreadingHTTPServer(("127.0.0.1", 0), ProxyHandler)
+    threading.Thread(target=proxy.serve_forever, daemon=True).start()
+    for name in ("NO_PROXY", "no_proxy", "ALL_PROXY", "all_proxy"): monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("HTTP_PROXY", f"http://127.0.0.1:{proxy.server_address[1]}")
+    api_forge = APIForge("http://api.example.invalid", http2=True, retry_policy=RetryPolicy(max_attempts=1))
+    assert api_forge.run_test("GET", "posts") == POSTS
+    assert proxied == ["http://api.example.invalid/posts"]
+    adapter = api_forge.transport.adapter
+    assert adapter._client(False, None, None) is adapter._client(False, None, None) is not adapter.client
+    assert _ssl_context(False, None).verify_mode == ssl.CERT_NONE and _ssl_context(True, None).verify_mode == ssl.CERT_REQUIRED
+    with pytest.raises(OSError, match="invalid path"): api_forge._session.get("https://api.example.invalid", verify="/missing/ca.pem")
+    api_forge.close()
+    proxy.shutdown()
+    proxy.server_close()
@@ -1,5 +1,5 @@
 import pytest
-from apiforge.utils import validate_response
+from apiforge.utils import validate_response, compile_expected_keys, schema_validator, ResponseValidator
 from apiforge.reporter import Reporter
 from .test_core import EXPECTED_KEYS, PAYLOAD
 
@@ -69,4 +69,34 @@ def test_tuple_and_list_edgecases():
     expected_keys_list = ["title",]
 
     assert validate_response(data, expected_keys=expecetd_keys_tuple) is True
-    assert validate_response(data, expected_keys=expected_keys_list) is True
\ No newline at end of file
+    assert validate_response(data, expected_keys=expected_keys_list) is True
+
+def test_compiled_expected_keys():
+    # Results of the validate_response before it was compiled, one per sample
+    samples = [{"title": "foo", "body": "bar"}, [{"title": "foo"}, {"title": "bar"}], [], {}, "foo", None, [{"title": "foo"}, 42]]
+    cases = [
+        (["title"], [True, True, False, False, False, False, False]),
+        (("title", "body"), [True, False, False, False, False, False, False]),
+        ([("title", str)], [True, True, False, False, False, False, False]),
+        ([("title", str, "foo")], [True, False, False, False, False, False, False]),
+        ([("title", int)], [False, False, False, False, False, False, False]),
+        (["title", ("body", str)], [False, False, False, False, False, False, False]),
+    ]
+    for expected_keys, expected in cases:
+        check = compile_expected_keys(expected_keys)
+        assert [check(data) for data in samples] == expected
+        assert [validate_response(data, expected_keys) for data in samples] == expected
+
+def test_response_validator_schema():
+    schema = {"type": "array", "items": {"type": "object", "required": ["id"], "properties": {"id": {"type": "integer"}, "note": {"type": "string", "nullable": True}}}}
+    validator = ResponseValidator(["id"], schema)
+    validator.validate([{"id": 1, "note": None}])
+    with pytest.raises(AssertionError, match="'1' is not of type 'integer' at 1/id"):
+        validator.validate([{"id": 1}, {"id": "1"}])
+    with pytest.raises(AssertionError, match="missing expected keys"):
+        validator.validate([{"other": 1}])
+    with pytest.raises(AssertionError, match="Response schema validation failed"):
+        validator.validate_item({"id": 1.5})
+    # Compiled schema validators are shared between endpoints with the same schema
+    assert ResponseValidator(schema=dict(schema)).schema is validator.schema
+    assert schema_validator({**schema, "$schema": "https://spec.openapis.org/oas/3.1/dialect/base"}) is not validator.schema